@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='preferred_language',
+            field=models.CharField(choices=[('english', 'English'), ('pidgin', 'Pidgin'), ('yoruba', 'Yoruba'), ('igbo', 'Igbo'), ('hausa', 'Hausa')], default='pidgin', max_length=20),
+        ),
+    ]
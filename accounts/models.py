@@ -20,6 +20,15 @@ class UserManager(BaseUserManager):
         return self.create_user(email, full_name, phone_number, password, **extra_fields)
 
 class User(AbstractBaseUser, PermissionsMixin):
+
+    LANGUAGE_CHOICES = [
+        ('english', 'English'),
+        ('pidgin', 'Pidgin'),
+        ('yoruba', 'Yoruba'),
+        ('igbo', 'Igbo'),
+        ('hausa', 'Hausa'),
+    ]
+
     full_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=15, unique=True)
@@ -29,6 +38,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_hospital = models.BooleanField(default=False)
     is_patient = models.BooleanField(default=False)
 
+    # Language of chatbot and WhatsApp replies (ai/messages/<language>.json)
+    preferred_language = models.CharField(max_length=20, choices=LANGUAGE_CHOICES, default='pidgin')
+
     date_joined = models.DateTimeField(auto_now_add=True)
 
     USERNAME_FIELD = 'email'
@@ -0,0 +1,322 @@
+# lifelynx/core/ai/artifact.py
+import json
+import os
+import re
+import shutil
+import time
+from collections import Counter
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARTIFACT_ROOT = os.path.join(os.path.dirname(__file__), 'lifelynx_model')
+CURRENT_FILE = 'CURRENT'
+META_FILE = 'meta.json'
+
+# Versions kept on disk after publishing a new one. Older directories are
+# removed; workers that still have them mapped keep their pages until they
+# reload.
+KEEP_VERSIONS = 3
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def current_pointer(root=ARTIFACT_ROOT):
+    """Path of the file naming the published version (watched for reloads)"""
+    return os.path.join(root, CURRENT_FILE)
+
+
+def current_version(root=ARTIFACT_ROOT):
+    try:
+        with open(current_pointer(root), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_artifact(arrays, meta, root=ARTIFACT_ROOT, publish=True, version=None):
+    """Write arrays + meta.json as a new version directory.
+
+    The directory is fully written under a temporary name and renamed into
+    place, and CURRENT is swapped with os.replace, so readers only ever see
+    complete versions.
+    """
+    os.makedirs(root, exist_ok=True)
+    version = version or f"v{int(time.time() * 1000)}-{os.getpid()}"
+    final_dir = os.path.join(root, version)
+    tmp_dir = f"{final_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    meta = dict(meta, format=FORMAT_VERSION, version=version, arrays=sorted(arrays), created_at=time.time())
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+
+    if publish:
+        publish_version(version, root)
+    return final_dir
+
+
+def publish_version(version, root=ARTIFACT_ROOT):
+    """Atomically point CURRENT at version and prune old versions"""
+    pointer = current_pointer(root)
+    tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp_pointer, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_pointer, pointer)
+    _prune(root, keep={version})
+
+
+def _prune(root, keep):
+    # Only published-style versions ('v...') are pruned; named directories
+    # such as training checkpoints are left alone.
+    versions = sorted(
+        (entry for entry in os.scandir(root)
+         if entry.is_dir() and entry.name.startswith('v') and not entry.name.endswith('.tmp')
+         and entry.name not in keep),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def read_artifact(root=ARTIFACT_ROOT, version=None):
+    """Return (meta, arrays) with every array memory-mapped read-only"""
+    version = version or current_version(root)
+    if not version:
+        raise ArtifactError(f"No published model artifact in {root}")
+
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact format {meta.get('format')}")
+
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+        for name in meta['arrays']
+    }
+    return meta, arrays
+
+
+def load_artifact(root=ARTIFACT_ROOT, version=None):
+    meta, arrays = read_artifact(root, version)
+    return CompactNBModel(meta, arrays)
+
+
+def export_pipeline(pipeline, root=ARTIFACT_ROOT, publish=True):
+    """Convert a fitted Pipeline(TfidfVectorizer, MultinomialNB) to an artifact"""
+    vectorizer = pipeline.steps[0][1]
+    classifier = pipeline.steps[-1][1]
+
+    if vectorizer.analyzer != 'word' or vectorizer.tokenizer or vectorizer.preprocessor or vectorizer.strip_accents:
+        raise ArtifactError("Only the default word analyzer can be exported")
+
+    vocabulary = vectorizer.vocabulary_
+    terms = sorted(vocabulary)
+    stop_words = vectorizer.get_stop_words()
+
+    arrays = {
+        'terms': np.array(terms, dtype=str),
+        'term_columns': np.array([vocabulary[term] for term in terms], dtype=np.int32),
+        'idf': np.asarray(vectorizer.idf_, dtype=np.float64),
+        'feature_log_prob': np.asarray(classifier.feature_log_prob_, dtype=np.float64),
+        'class_log_prior': np.asarray(classifier.class_log_prior_, dtype=np.float64),
+        'classes': np.array([str(c) for c in classifier.classes_], dtype=str),
+    }
+    meta = {
+        'kind': 'tfidf',
+        'lowercase': vectorizer.lowercase,
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'stop_words': sorted(stop_words) if stop_words else None,
+        'norm': vectorizer.norm,
+        'sublinear_tf': vectorizer.sublinear_tf,
+        'n_features': len(vocabulary),
+    }
+    return write_artifact(arrays, meta, root, publish)
+
+
+def murmurhash3_32(data, seed=0):
+    """Signed MurmurHash3 (x86, 32-bit) of bytes, as used by HashingVectorizer"""
+    mask = 0xffffffff
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+    length = len(data)
+    h = seed & mask
+    rounded_end = length & ~3
+
+    for i in range(0, rounded_end, 4):
+        k = data[i] | (data[i + 1] << 8) | (data[i + 2] << 16) | (data[i + 3] << 24)
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        k = (k * c2) & mask
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & mask
+        h = (h * 5 + 0xe6546b64) & mask
+
+    tail = length & 3
+    k = 0
+    if tail == 3:
+        k ^= data[rounded_end + 2] << 16
+    if tail >= 2:
+        k ^= data[rounded_end + 1] << 8
+    if tail >= 1:
+        k ^= data[rounded_end]
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        k = (k * c2) & mask
+        h ^= k
+
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & mask
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & mask
+    h ^= h >> 16
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def hashing_meta(vectorizer):
+    """Artifact meta for a HashingVectorizer (non-negative features only)"""
+    if vectorizer.alternate_sign:
+        raise ArtifactError("MultinomialNB needs alternate_sign=False")
+    if vectorizer.analyzer != 'word' or vectorizer.tokenizer or vectorizer.preprocessor or vectorizer.strip_accents:
+        raise ArtifactError("Only the default word analyzer can be exported")
+
+    stop_words = vectorizer.get_stop_words()
+    return {
+        'kind': 'hashing',
+        'lowercase': vectorizer.lowercase,
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'stop_words': sorted(stop_words) if stop_words else None,
+        'norm': vectorizer.norm,
+        'sublinear_tf': False,
+        'n_features': vectorizer.n_features,
+    }
+
+
+def export_hashing_nb(vectorizer, classifier, root=ARTIFACT_ROOT, publish=True, version=None, extra_meta=None):
+    """Write a HashingVectorizer + MultinomialNB model as an artifact.
+
+    The raw counts are stored too so training can resume from the artifact.
+    """
+    arrays = {
+        'feature_log_prob': np.asarray(classifier.feature_log_prob_, dtype=np.float64),
+        'class_log_prior': np.asarray(classifier.class_log_prior_, dtype=np.float64),
+        'classes': np.array([str(c) for c in classifier.classes_], dtype=str),
+        'feature_count': np.asarray(classifier.feature_count_, dtype=np.float64),
+        'class_count': np.asarray(classifier.class_count_, dtype=np.float64),
+    }
+    meta = dict(hashing_meta(vectorizer), alpha=classifier.alpha, **(extra_meta or {}))
+    return write_artifact(arrays, meta, root, publish, version)
+
+
+class CompactNBModel:
+    """Pure-NumPy Naive Bayes scorer over a memory-mapped artifact.
+
+    Exposes the parts of the sklearn Pipeline API the chatbot uses
+    (classes_, predict, predict_proba). Only the columns a message touches
+    are read from the mapped arrays.
+    """
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.version = meta['version']
+        self.classes_ = np.array(arrays['classes'])
+        self._kind = meta.get('kind', 'tfidf')
+        self._n_features = meta['n_features']
+        self._terms = arrays.get('terms')
+        self._term_columns = arrays.get('term_columns')
+        self._idf = arrays.get('idf')
+        self._feature_log_prob = arrays['feature_log_prob']
+        self._class_log_prior = np.array(arrays['class_log_prior'])
+
+        self._lowercase = meta.get('lowercase', True)
+        self._token_re = re.compile(meta['token_pattern'])
+        self._min_n, self._max_n = meta['ngram_range']
+        self._stop_words = frozenset(meta['stop_words'] or ())
+        self._norm = meta.get('norm')
+        self._sublinear_tf = meta.get('sublinear_tf', False)
+
+    def _analyze(self, text):
+        """Same n-grams TfidfVectorizer's word analyzer would produce"""
+        if self._lowercase:
+            text = text.lower()
+        tokens = [t for t in self._token_re.findall(text) if t not in self._stop_words]
+
+        grams = []
+        for n in range(self._min_n, self._max_n + 1):
+            grams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def _columns(self, grams):
+        """Map n-grams to feature columns; unknown n-grams are dropped"""
+        if self._kind == 'hashing':
+            return self._hashed_columns(grams)
+
+        if not grams or not len(self._terms):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        counts = Counter(grams)
+        keys = np.array(list(counts))
+        found = np.searchsorted(self._terms, keys)
+        found = np.minimum(found, len(self._terms) - 1)
+        known = self._terms[found] == keys
+
+        columns = self._term_columns[found[known]].astype(np.int64)
+        values = np.array(list(counts.values()), dtype=np.float64)[known]
+        return columns, values
+
+    def _hashed_columns(self, grams):
+        counts = Counter()
+        for gram in grams:
+            h = murmurhash3_32(gram.encode('utf-8'))
+            if h == -2147483648:
+                column = (2147483647 - (self._n_features - 1)) % self._n_features
+            else:
+                column = abs(h) % self._n_features
+            counts[column] += 1
+        return (
+            np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)),
+            np.fromiter(counts.values(), dtype=np.float64, count=len(counts)),
+        )
+
+    def _weights(self, columns, values):
+        if self._sublinear_tf:
+            values = np.log(values) + 1
+        if self._idf is not None:
+            values = values * self._idf[columns]
+        if self._norm == 'l2':
+            norm = np.sqrt(np.dot(values, values))
+        elif self._norm == 'l1':
+            norm = np.abs(values).sum()
+        else:
+            norm = 0
+        return values / norm if norm else values
+
+    def _joint_log_likelihood(self, texts):
+        jll = np.empty((len(texts), len(self.classes_)), dtype=np.float64)
+        for row, text in enumerate(texts):
+            columns, values = self._columns(self._analyze(text))
+            jll[row] = self._feature_log_prob[:, columns] @ self._weights(columns, values) + self._class_log_prior
+        return jll
+
+    def predict_proba(self, texts):
+        jll = self._joint_log_likelihood(texts)
+        jll -= jll.max(axis=1, keepdims=True)
+        probabilities = np.exp(jll)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def predict(self, texts):
+        return self.classes_[self._joint_log_likelihood(texts).argmax(axis=1)]
@@ -0,0 +1,189 @@
+# lifelynx/core/ai/benchmark.py
+import math
+import random
+import time
+import tracemalloc
+
+from ai.chatbot_simple import LifelynxAISimple
+
+LANGUAGES = ['english', 'pidgin', 'yoruba', 'igbo', 'hausa']
+
+# Number of symptom phrases and filler words per synthetic message
+LENGTHS = {
+    'short': (1, 3),
+    'medium': (3, 15),
+    'long': (6, 60),
+}
+
+# Neutral words mixed into messages so they look like real chat text
+FILLER_TEXT = {
+    'english': ['i', 'have', 'been', 'since', 'yesterday', 'and', 'really', 'today', 'my', 'the', 'night'],
+    'pidgin': ['abeg', 'since', 'yesterday', 'na', 'wetin', 'dey', 'happen', 'sha', 'o', 'today', 'e'],
+    'yoruba': ['jowo', 'lati', 'ana', 'mo', 'ni', 'o', 'se', 'loni', 'gan', 'ati'],
+    'igbo': ['biko', 'kemgbe', 'unyaahu', 'm', 'nwere', 'o', 'taa', 'na', 'kedu'],
+    'hausa': ['don', 'allah', 'tun', 'jiya', 'ina', 'da', 'yau', 'kuma', 'yaya'],
+}
+
+STAGES = ['preprocess_text', 'extract_symptoms', 'diagnose', 'check_emergency', 'format_response']
+
+
+def build_corpus(engine, size=500, seed=1234):
+    """Seeded synthetic multilingual corpus: list of (message, language, length)"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        language = LANGUAGES[i % len(LANGUAGES)]
+        length = rng.choice(list(LENGTHS))
+        n_symptoms, n_words = LENGTHS[length]
+
+        keywords = [
+            phrase
+            for mapping in engine.symptom_mapping.values()
+            for phrase in mapping.get(language, mapping['english'])
+        ]
+        parts = rng.sample(keywords, min(n_symptoms, len(keywords)))
+        parts += [rng.choice(FILLER_TEXT[language]) for _ in range(n_words)]
+        rng.shuffle(parts)
+        corpus.append((' '.join(parts), language, length))
+    return corpus
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered) / 100.0) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ns):
+    return {
+        'count': len(samples_ns),
+        'mean_us': round(sum(samples_ns) / len(samples_ns) / 1000.0, 3) if samples_ns else 0.0,
+        'p50_us': round(percentile(samples_ns, 50) / 1000.0, 3),
+        'p95_us': round(percentile(samples_ns, 95) / 1000.0, 3),
+        'p99_us': round(percentile(samples_ns, 99) / 1000.0, 3),
+    }
+
+
+def _stage_calls(engine, message, language):
+    """Run the pipeline stage by stage, yielding (stage, callable)"""
+    state = {}
+
+    def extract():
+        state['symptoms'] = engine.extract_symptoms(message, language)
+
+    def diagnose():
+        state['diagnosis'] = engine.diagnose(state['symptoms'], message)
+
+    def emergency():
+        state['is_emergency'] = engine.check_emergency(state['symptoms'], state['diagnosis'])
+
+    def format_response():
+        engine._format_response(state['diagnosis'], language, state['symptoms'], state['is_emergency'])
+
+    return [
+        ('preprocess_text', lambda: engine.preprocess_text(message, language)),
+        ('extract_symptoms', extract),
+        ('diagnose', diagnose),
+        ('check_emergency', emergency),
+        ('format_response', format_response),
+    ]
+
+
+def time_stages(engine, corpus, repeat=3):
+    """Per-stage latency samples, overall and per message length"""
+    samples = {stage: [] for stage in STAGES}
+    by_length = {length: {stage: [] for stage in STAGES} for length in LENGTHS}
+    for _ in range(repeat):
+        for message, language, length in corpus:
+            for stage, call in _stage_calls(engine, message, language):
+                start = time.perf_counter_ns()
+                call()
+                elapsed = time.perf_counter_ns() - start
+                samples[stage].append(elapsed)
+                by_length[length][stage].append(elapsed)
+
+    return {
+        'stages': {stage: summarize(values) for stage, values in samples.items()},
+        'by_length': {
+            length: {stage: summarize(values) for stage, values in stages.items()}
+            for length, stages in by_length.items()
+        },
+    }
+
+
+def measure_allocations(engine, corpus):
+    """Mean peak bytes allocated per call, per stage (run separately from timing)"""
+    peak_bytes = {stage: 0 for stage in STAGES}
+
+    tracemalloc.start()
+    try:
+        for message, language, _ in corpus:
+            for stage, call in _stage_calls(engine, message, language):
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                call()
+                _, peak = tracemalloc.get_traced_memory()
+                peak_bytes[stage] += peak - baseline
+    finally:
+        tracemalloc.stop()
+
+    return {
+        stage: {'mean_peak_bytes': round(peak_bytes[stage] / len(corpus), 1)}
+        for stage in STAGES
+    }
+
+
+def measure_construction(factory=LifelynxAISimple, warm_runs=5):
+    """Cold (first in process) vs warm LifelynxAISimple() construction time"""
+    start = time.perf_counter_ns()
+    factory()
+    cold = time.perf_counter_ns() - start
+
+    warm = []
+    for _ in range(warm_runs):
+        start = time.perf_counter_ns()
+        factory()
+        warm.append(time.perf_counter_ns() - start)
+
+    return {
+        'cold_ms': round(cold / 1e6, 3),
+        'warm_p50_ms': round(percentile(warm, 50) / 1e6, 3),
+        'warm_p95_ms': round(percentile(warm, 95) / 1e6, 3),
+    }
+
+
+def run(size=500, seed=1234, repeat=3, warm_runs=5):
+    construction = measure_construction(warm_runs=warm_runs)
+    engine = LifelynxAISimple()
+    corpus = build_corpus(engine, size, seed)
+
+    # Warm up caches and lazy paths before timing
+    for message, language, _ in corpus[:50]:
+        engine.generate_response(message, language)
+
+    report = time_stages(engine, corpus, repeat)
+    report['allocations'] = measure_allocations(engine, corpus)
+    report['construction'] = construction
+    report['meta'] = {'size': size, 'seed': seed, 'repeat': repeat}
+    return report
+
+
+def find_regressions(report, baseline, threshold=0.2, min_delta_us=5.0):
+    """Stages whose p95 grew more than threshold (and min_delta_us) over baseline"""
+    regressions = []
+    for stage, current in report['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous:
+            continue
+        limit = previous['p95_us'] * (1 + threshold)
+        if current['p95_us'] > limit and current['p95_us'] - previous['p95_us'] > min_delta_us:
+            regressions.append((stage, previous['p95_us'], current['p95_us']))
+
+    previous = baseline.get('construction', {}).get('warm_p50_ms')
+    current = report['construction']['warm_p50_ms']
+    if previous and current > previous * (1 + threshold) and (current - previous) * 1000 > min_delta_us:
+        regressions.append(('construction', previous * 1000, current * 1000))
+    return regressions
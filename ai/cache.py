@@ -0,0 +1,175 @@
+# lifelynx/core/ai/cache.py
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace so trivially different messages share a key"""
+    return ' '.join(text.lower().split())
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent (or expired). Returns True if stored."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                return False
+            self._data[key] = (now + ttl if ttl else None, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            'entries': len(self._data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class InferenceCache:
+    """Two-tier cache of generate_response results.
+
+    Keys are (normalized text, language, model version, prior session
+    symptoms), so a new model or knowledge base never serves results
+    computed by the old one. The local
+    tier is an in-process LRU; the optional shared tier is a Django cache
+    alias so workers can reuse each other's results.
+    """
+
+    def __init__(self, max_entries=1024, ttl=600, shared_backend=None, key_prefix='lifelynx:ai:'):
+        self.local = LRUCache(max_entries, ttl)
+        self.ttl = ttl
+        self.shared_backend = shared_backend
+        self.key_prefix = key_prefix
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    def make_key(self, text, language, version, prior_symptoms=()):
+        return (normalize_text(text), language, version, tuple(prior_symptoms))
+
+    def _shared(self):
+        if not self.shared_backend:
+            return None
+        from django.core.cache import caches
+        return caches[self.shared_backend]
+
+    def _shared_key(self, key):
+        return self.key_prefix + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        result = self.local.get(key)
+        if result is not None:
+            return copy.deepcopy(result)
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                result = shared.get(self._shared_key(key))
+            except Exception as e:
+                logger.warning(f"Shared inference cache read failed: {e}")
+                result = None
+            if result is not None:
+                self.shared_hits += 1
+                self.local.set(key, result)
+                return copy.deepcopy(result)
+            self.shared_misses += 1
+        return None
+
+    def set(self, key, result):
+        result = copy.deepcopy(result)
+        self.local.set(key, result)
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                shared.set(self._shared_key(key), result, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared inference cache write failed: {e}")
+
+    def clear_local(self):
+        self.local.clear()
+
+    def stats(self):
+        stats = self.local.stats()
+        stats.update({
+            'shared_hits': self.shared_hits,
+            'shared_misses': self.shared_misses,
+        })
+        return stats
+
+
+def get_result_cache():
+    """Build the inference cache from the LIFELYNX_AI_CACHE setting"""
+    try:
+        from django.conf import settings
+        options = getattr(settings, 'LIFELYNX_AI_CACHE', {})
+    except Exception:
+        options = {}
+
+    if not options.get('ENABLED', True):
+        return None
+    return InferenceCache(
+        max_entries=options.get('MAX_ENTRIES', 1024),
+        ttl=options.get('TTL', 600),
+        shared_backend=options.get('SHARED_BACKEND'),
+    )
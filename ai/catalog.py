@@ -0,0 +1,82 @@
+# lifelynx/core/ai/catalog.py
+import json
+import os
+import re
+import string
+import threading
+
+MESSAGES_DIR = os.path.join(os.path.dirname(__file__), 'messages')
+DEFAULT_LANGUAGE = 'english'
+
+_LANGUAGE_RE = re.compile(r'^[a-z_]+$')
+_formatter = string.Formatter()
+
+
+def _compile(template):
+    """Pre-parse a '{field}' template into (literal, field) segments"""
+    return tuple((literal, field) for literal, field, _, _ in _formatter.parse(template))
+
+
+def _render(segments, context):
+    parts = []
+    for literal, field in segments:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(context[field]))
+    return ''.join(parts)
+
+
+class MessageCatalog:
+    """User-facing messages, one JSON resource file per language.
+
+    A language's file is read and its templates pre-parsed the first time
+    that language is requested; rendering only touches the one template
+    needed. Adding a language means dropping in <language>.json.
+    """
+
+    def __init__(self, directory=MESSAGES_DIR, default_language=DEFAULT_LANGUAGE):
+        self.directory = directory
+        self.default_language = default_language
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def _load(self, language):
+        templates = self._templates.get(language, False)
+        if templates is not False:
+            return templates
+
+        with self._lock:
+            if language in self._templates:
+                return self._templates[language]
+
+            templates = None
+            # Language codes come from requests; never treat them as paths
+            if language and _LANGUAGE_RE.match(language):
+                path = os.path.join(self.directory, f"{language}.json")
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        templates = {key: _compile(value) for key, value in json.load(f).items()}
+            self._templates[language] = templates
+            return templates
+
+    def render(self, key, language, fallback=None, **context):
+        """Render key in language, falling back to fallback then the default language"""
+        for candidate in (language, fallback, self.default_language):
+            if not candidate:
+                continue
+            templates = self._load(candidate)
+            if templates and key in templates:
+                return _render(templates[key], context)
+        raise KeyError(f"No message '{key}' for language '{language}'")
+
+    def languages(self):
+        return sorted(
+            name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')
+        )
+
+
+catalog = MessageCatalog()
+
+
+def render(key, language, fallback=None, **context):
+    return catalog.render(key, language, fallback, **context)
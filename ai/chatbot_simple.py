@@ -7,14 +7,33 @@ from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 import joblib
 import os
+import hashlib
+import json
+import logging
+
+from ai.artifact import ARTIFACT_ROOT, current_version, load_artifact
+from ai.cache import normalize_text
+from ai.catalog import MESSAGES_DIR, render
+from ai.matcher import SymptomMatcher
+from ai.scoring import DiseaseScorer
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'lifelynx_model.joblib')
 
 class LifelynxAISimple:
-    def __init__(self):
+    def __init__(self, result_cache=None):
         self.disease_data = self._load_disease_data()
         self.symptom_mapping = self._load_symptom_mapping()
+        self.filler_words = self._load_filler_words()
+        self.matcher = SymptomMatcher(self.symptom_mapping, self.filler_words)
+        self.scorer = DiseaseScorer(self.disease_data)
         self.model = None
-        self.model_path = os.path.join(os.path.dirname(__file__), 'lifelynx_model.joblib')
+        self.model_path = MODEL_PATH
+        self.artifact_root = ARTIFACT_ROOT
         self._initialize_model()
+        self.version = self._compute_version()
+        self.result_cache = result_cache
         
     def _load_disease_data(self):
         """Load comprehensive disease database for Nigerian context"""
@@ -196,14 +215,44 @@ class LifelynxAISimple:
         
         return texts, labels
     
+    def _compute_version(self):
+        """Fingerprint of the knowledge base, model and reply templates, used in cache keys"""
+        digest = hashlib.sha1()
+        digest.update(json.dumps(
+            [self.disease_data, self.symptom_mapping, self.filler_words],
+            sort_keys=True
+        ).encode('utf-8'))
+        try:
+            stat = os.stat(self.model_path)
+            digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'))
+        except OSError:
+            digest.update(b'no-model')
+        digest.update((current_version(self.artifact_root) or 'no-artifact').encode('utf-8'))
+        
+        # Cached results include rendered replies, so template edits count too
+        for name in sorted(os.listdir(MESSAGES_DIR)):
+            stat = os.stat(os.path.join(MESSAGES_DIR, name))
+            digest.update(f"{name}:{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
     def _initialize_model(self):
         """Initialize or load the ML model"""
+        # Prefer the memory-mapped artifact: its arrays are shared between
+        # worker processes and don't depend on pickle compatibility.
+        if current_version(self.artifact_root):
+            try:
+                self.model = load_artifact(self.artifact_root)
+                logger.info(f"Loaded model artifact {self.model.version}")
+                return
+            except Exception as e:
+                logger.warning(f"Failed to load model artifact ({e}), falling back to joblib model")
+        
         if os.path.exists(self.model_path):
             try:
                 self.model = joblib.load(self.model_path)
-                print("Loaded trained model from disk")
+                logger.info("Loaded trained model from disk")
             except:
-                print("Failed to load model, training new one")
+                logger.warning("Failed to load model, training new one")
                 self._train_and_save_model()
         else:
             self._train_and_save_model()
@@ -219,28 +268,33 @@ class LifelynxAISimple:
             ])
             
             self.model.fit(texts, labels)
-            joblib.dump(self.model, self.model_path)
-            print("AI model trained and saved successfully")
+            
+            # Write to a temp file and swap it in so other processes
+            # watching the model file never load a half-written one
+            tmp_path = f"{self.model_path}.{os.getpid()}.tmp"
+            joblib.dump(self.model, tmp_path)
+            os.replace(tmp_path, self.model_path)
+            logger.info("AI model trained and saved successfully")
         except Exception as e:
-            print(f"Model training failed: {e}")
+            logger.error(f"Model training failed: {e}")
             self.model = None
     
-    def preprocess_text(self, text, language):
-        """Clean and preprocess input text"""
-        text = text.lower().strip()
-        
-        # Language-specific preprocessing
-        filler_words = {
+    def _load_filler_words(self):
+        """Filler words dropped from messages, per language"""
+        return {
             'pidgin': ['na wa o', 'eiyah', 'abeg', 'o', 'sha', 'please', 'help'],
             'yoruba': ['e ma binu', 'jowo', 'o', 'd', 'se'],
             'igbo': ['biko', 'o', 'nwannem', 'kedu'],
             'hausa': ['allah', 'don allah', 'yaya', 'kai'],
             'english': ['please', 'help', 'hello', 'hi', 'hey']
         }
+    
+    def preprocess_text(self, text, language):
+        """Clean and preprocess input text"""
+        text = text.lower().strip()
         
-        words = filler_words.get(language, [])
-        for word in words:
-            text = text.replace(word, '')
+        # Language-specific preprocessing (whole words only)
+        text = self.matcher.strip_fillers(text, language)
         
         # Remove extra spaces
         text = re.sub(r'\s+', ' ', text).strip()
@@ -249,68 +303,72 @@ class LifelynxAISimple:
     
     def extract_symptoms(self, text, language='english'):
         """Extract symptoms from user input using multi-language mapping"""
-        text = self.preprocess_text(text, language)
-        detected_symptoms = []
-        
-        for symptom, keywords in self.symptom_mapping.items():
-            lang_keywords = keywords.get(language, keywords['english'])
-            if any(keyword in text for keyword in lang_keywords):
-                detected_symptoms.append(symptom)
-        
-        return detected_symptoms
+        # Keywords are matched on word boundaries in a single scan. Filler
+        # words are not stripped first so that phrases which contain one
+        # (e.g. Hausa 'ciwon kai') still match.
+        return self.matcher.extract(text, language)
+    
+    def match_symptoms(self, text, language='english'):
+        """Return (symptom, start, end) spans for every keyword in text"""
+        return self.matcher.match(text, language)
+    
+    def _use_ml(self, text_input):
+        """Whether the ML model should be consulted for this text"""
+        return bool(self.model and text_input and len(text_input) > 10)
+    
+    def _predict_ml(self, texts):
+        """Return (label, probability) per text from one transform and one predict_proba"""
+        probabilities = self.model.predict_proba(texts)
+        classes = self.model.classes_
+        best = probabilities.argmax(axis=1)
+        return [(classes[col], probabilities[row, col]) for row, col in enumerate(best)]
     
-    def diagnose(self, symptoms, text_input):
-        """Generate diagnosis based on symptoms and text input"""
+    def diagnose(self, symptoms, text_input, top_k=None, ml_prediction=None):
+        """Generate diagnosis based on symptoms and text input.
+        
+        ml_prediction is an optional precomputed (label, probability) pair,
+        as produced in bulk by generate_response_batch.
+        """
         possible_diseases = []
         
         # Rule-based diagnosis first
-        for disease, data in self.disease_data.items():
-            disease_symptoms = data['symptoms']
-            matches = len(set(symptoms) & set(disease_symptoms))
-            total_symptoms = len(disease_symptoms)
-            
-            if total_symptoms > 0:
-                confidence = matches / total_symptoms
-                
-                # Boost confidence for key symptoms
-                key_symptoms = disease_symptoms[:3]  # First 3 symptoms are key
-                key_matches = len(set(symptoms) & set(key_symptoms))
-                if key_matches > 0:
-                    confidence += 0.3
-                
-                # Minimum 2 symptoms or key symptom for reliable diagnosis
-                if confidence > 0.3 and (matches >= 2 or key_matches > 0):
-                    possible_diseases.append({
-                        'disease': disease,
-                        'confidence': min(round(confidence, 2), 0.95),
-                        'emergency_level': data['emergency_level'],
-                        'treatment': data['treatment'],
-                        'recommended_drugs': data['drugs'],
-                        'description': data['description']
-                    })
+        for disease, confidence in self.scorer.score(symptoms, top_k):
+            data = self.disease_data[disease]
+            possible_diseases.append({
+                'disease': disease,
+                'confidence': confidence,
+                'emergency_level': data['emergency_level'],
+                'treatment': data['treatment'],
+                'recommended_drugs': data['drugs'],
+                'description': data['description']
+            })
         
         # Use ML model for additional insight
-        if self.model and text_input and len(text_input) > 10:
+        if ml_prediction is None and self._use_ml(text_input):
             try:
-                ml_prediction = self.model.predict([text_input])[0]
-                ml_prob = self.model.predict_proba([text_input]).max()
-                
-                # Only use ML if confidence is high and not already in list
-                if ml_prob > 0.7 and not any(d['disease'] == ml_prediction for d in possible_diseases):
-                    disease_data = self.disease_data.get(ml_prediction, {})
-                    possible_diseases.append({
-                        'disease': ml_prediction,
-                        'confidence': round(ml_prob, 2),
-                        'emergency_level': disease_data.get('emergency_level', 1),
-                        'treatment': disease_data.get('treatment', 'Consult doctor'),
-                        'recommended_drugs': disease_data.get('drugs', []),
-                        'description': disease_data.get('description', '')
-                    })
+                ml_prediction = self._predict_ml([text_input])[0]
             except Exception as e:
-                print(f"ML prediction error: {e}")
+                logger.warning(f"ML prediction error: {e}")
+        
+        if ml_prediction is not None:
+            ml_label, ml_prob = ml_prediction
+            
+            # Only use ML if confidence is high and not already in list
+            if ml_prob > 0.7 and not any(d['disease'] == ml_label for d in possible_diseases):
+                disease_data = self.disease_data.get(ml_label, {})
+                possible_diseases.append({
+                    'disease': ml_label,
+                    'confidence': round(ml_prob, 2),
+                    'emergency_level': disease_data.get('emergency_level', 1),
+                    'treatment': disease_data.get('treatment', 'Consult doctor'),
+                    'recommended_drugs': disease_data.get('drugs', []),
+                    'description': disease_data.get('description', '')
+                })
         
         # Sort by confidence and emergency level
         possible_diseases.sort(key=lambda x: (x['confidence'], -x['emergency_level']), reverse=True)
+        if top_k is not None:
+            possible_diseases = possible_diseases[:top_k]
         return possible_diseases
     
     def check_emergency(self, symptoms, diagnosis):
@@ -330,51 +388,105 @@ class LifelynxAISimple:
         
         return False
     
-    def generate_response(self, user_input, user_language='pidgin', user_context=None):
-        """Main method to process user input and generate response"""
+    def generate_response(self, user_input, user_language='pidgin', user_context=None, prior_symptoms=None):
+        """Main method to process user input and generate response
+        
+        prior_symptoms are symptoms reported earlier in the same session;
+        they are diagnosed together with the ones found in this message.
+        """
+        prior_symptoms = tuple(prior_symptoms or ())
         try:
-            # Extract symptoms
-            symptoms = self.extract_symptoms(user_input, user_language)
-            
-            # Generate diagnosis
-            diagnosis_results = self.diagnose(symptoms, user_input)
-            
-            # Check for emergency
-            is_emergency = self.check_emergency(symptoms, diagnosis_results)
+            if self.result_cache is None:
+                return self._run_pipeline(user_input, user_language, prior_symptoms=prior_symptoms)
             
-            # Format response based on language
-            response = self._format_response(
-                diagnosis_results, 
-                user_language, 
-                symptoms,
-                is_emergency
-            )
-            
-            return {
-                'symptoms_detected': symptoms,
-                'diagnosis': diagnosis_results,
-                'response': response,
-                'is_emergency': is_emergency
-            }
+            # Repeated phrases are served from the cache. The pipeline runs on
+            # the normalized text so the cached result depends only on the key.
+            key = self.result_cache.make_key(user_input, user_language, self.version, prior_symptoms)
+            result = self.result_cache.get(key)
+            if result is None:
+                result = self._run_pipeline(normalize_text(user_input), user_language, prior_symptoms=prior_symptoms)
+                self.result_cache.set(key, result)
+            return result
         except Exception as e:
-            print(f"Error generating response: {e}")
-            return {
-                'symptoms_detected': [],
-                'diagnosis': [],
-                'response': self._get_error_message(user_language),
-                'is_emergency': False
-            }
+            logger.error(f"Error generating response: {e}")
+            return self._error_result(user_language)
+    
+    def generate_response_batch(self, messages, languages='pidgin'):
+        """Process many messages at once.
+        
+        languages is either one language for every message or a list aligned
+        with messages. All ML-eligible messages go through a single TF-IDF
+        transform and a single predict_proba call.
+        """
+        if isinstance(languages, str):
+            languages = [languages] * len(messages)
+        
+        # No ML insight unless the batch prediction below provides one
+        ml_predictions = [(None, 0.0)] * len(messages)
+        eligible = [i for i, message in enumerate(messages) if self._use_ml(message)]
+        if eligible:
+            try:
+                predictions = self._predict_ml([messages[i] for i in eligible])
+                for i, prediction in zip(eligible, predictions):
+                    ml_predictions[i] = prediction
+            except Exception as e:
+                logger.warning(f"ML prediction error: {e}")
+        
+        results = []
+        for message, language, ml_prediction in zip(messages, languages, ml_predictions):
+            try:
+                results.append(self._run_pipeline(message, language, ml_prediction))
+            except Exception as e:
+                logger.error(f"Error generating response: {e}")
+                results.append(self._error_result(language))
+        return results
+    
+    def _run_pipeline(self, user_input, user_language, ml_prediction=None, prior_symptoms=()):
+        """Extract, diagnose and format the reply for one message"""
+        # Extract symptoms
+        symptoms = self.extract_symptoms(user_input, user_language)
+        
+        # Once this message reports symptoms, diagnose them together with
+        # the ones from earlier turns of the session
+        session_symptoms = symptoms
+        if symptoms and prior_symptoms:
+            known = set(prior_symptoms)
+            session_symptoms = list(prior_symptoms) + [s for s in symptoms if s not in known]
+        
+        # Generate diagnosis
+        diagnosis_results = self.diagnose(session_symptoms, user_input, ml_prediction=ml_prediction)
+        
+        # Check for emergency
+        is_emergency = self.check_emergency(session_symptoms, diagnosis_results)
+        
+        # Format response based on language
+        response = self._format_response(
+            diagnosis_results, 
+            user_language, 
+            symptoms,
+            is_emergency
+        )
+        
+        return {
+            'symptoms_detected': symptoms,
+            'session_symptoms': session_symptoms,
+            'diagnosis': diagnosis_results,
+            'response': response,
+            'is_emergency': is_emergency
+        }
+    
+    def _error_result(self, language):
+        return {
+            'symptoms_detected': [],
+            'session_symptoms': [],
+            'diagnosis': [],
+            'response': self._get_error_message(language),
+            'is_emergency': False
+        }
     
     def _get_error_message(self, language):
         """Get error message in appropriate language"""
-        messages = {
-            'pidgin': "System dey busy now. Try again small time.",
-            'english': "System is busy right now. Please try again later.",
-            'yoruba': "Sistemi wa ni isisẹ bayi. Jowo gbiyanju lẹẹkansi.",
-            'igbo': "Sistemu nọ n'ọrụ ugbu a. Biko nwaa ọzọ.",
-            'hausa': "Tsarin yana aiki yanzu. Don Allah a sake ƙoƙari."
-        }
-        return messages.get(language, messages['english'])
+        return render('error', language)
     
     def _format_response(self, diagnosis, language, symptoms, is_emergency):
         """Format response in user's preferred language"""
@@ -389,34 +501,13 @@ class LifelynxAISimple:
     
     def _format_emergency_response(self, language):
         """Format emergency response"""
-        messages = {
-            'pidgin': "🚨 EMERGENCY! This one serious o! Make you go hospital NOW NOW! I don alert emergency services. Type OKADA make we book bike for you quick quick!",
-            'english': "🚨 EMERGENCY! This is serious! Please go to the hospital IMMEDIATELY! I've alerted emergency services. Type OKADA to book immediate transportation!",
-            'yoruba': "🚨 IJAMBA! Eleyi ko duro! Jowo lọ si ile iwosan NI KIAKIA! Mo ti fi ijiyan sile. Tẹ OKADA lati fi okada sakoko!",
-            'igbo': "🚨 IHE MKPA! Nke a dị oke egwu! Biko gaa ụlọ ọgwụ NGWA NGWA! Emeela m ndị ọrụ mberede. Pịa OKADA iji nye ụgbọ ala ọkwa ngwa ngwa!",
-            'hausa': "🚨 GAGGAVA! Wannan yana da muhimmanci! Don Allah a je asibiti YANZU! Na gargaɗi ayyukan gaggawa. Danna OKADA don yin aikin motar da sauri!"
-        }
-        return messages.get(language, messages['english'])
+        return render('emergency', language)
     
     def _get_no_diagnosis_message(self, language, symptoms):
         """Message when no diagnosis can be made"""
         if symptoms:
-            messages = {
-                'pidgin': f"No worry, I dey your back. From your symptoms ({', '.join(symptoms)}), make you rest well and drink plenty water. If you no better in 24 hours, type OKADA make we find hospital for you.",
-                'english': f"Don't worry, I'm here to help. Based on your symptoms ({', '.join(symptoms)}), please rest well and drink plenty of water. If you don't feel better in 24 hours, type OKADA to find a hospital.",
-                'yoruba': f"Ma binu, mo wa nibi lati ran yin lowo. Lati inu awọn aami rẹ ({', '.join(symptoms)}), jowo sinmi daradara ki o mu omi pupo. Ti o ko ba gba ni wakati 24, tẹ OKADA lati wa ile iwosan.",
-                'igbo': f"Echegbula, anọ m ebe a iji nyere gị aka. Dabere na ihe mgbaàmà gị ({', '.join(symptoms)}), biko zuru ike ma ṅụọ mmiri. Ọ bụrụ na ị naghị enwe mma n'ime awa 24, pịa OKADA iji chọta ụlọ ọgwụ.",
-                'hausa': f"Kada ku damu, ina nan don taimakon ku. Daga alamun ku ({', '.join(symptoms)}), don Allah a huta da kyau, ku sha ruwa da yawa. Idan ba ku ji dadi a cikin sa'o'i 24, danna OKADA don nemo asibiti."
-            }
-        else:
-            messages = {
-                'pidgin': "No worry, I dey your back. But from wetin you talk, I no too sure wetin dey. Make you try explain am better or go see doctor.",
-                'english': "Don't worry, I'm here to help. But from what you described, I'm not sure what's wrong. Please try to explain better or see a doctor.",
-                'yoruba': "Ma binu, mo wa nibi lati ran yin lowo. Sugbon nipa ohun ti o so, mi o da loruko ohun ti o n sele. Jowo gbiyanju lati salaye si daradara tabi lo si dokita.",
-                'igbo': "Echegbula, anọ m ebe a iji nyere gị aka. Mana site n'ihe ị kọwara, amaghị m ihe na-eme. Biko nwaa ịkọwa nke ọma ma ọ bụ gaa dọkịta.",
-                'hausa': "Kada ku damu, ina nan don taimakon ku. Amma daga abin da kuka bayyana, ban san abin da ke faruwa ba. Don Allah a yi ƙoƙari ku bayyana da kyau ko ku je likita."
-            }
-        return messages.get(language, messages['english'])
+            return render('no_diagnosis_symptoms', language, symptoms=', '.join(symptoms))
+        return render('no_diagnosis', language)
     
     def _format_diagnosis_response(self, diagnosis, language):
         """Format diagnosis response"""
@@ -428,28 +519,10 @@ class LifelynxAISimple:
         drug_text = drugs[0] if drugs else "appropriate medication"
         
         if confidence > 0.7:
-            templates = {
-                'pidgin': f"Eiyah sorry o! You fit get {disease}. {description} Make you go PHC wey get {drug_text} now now! Type OKADA make driver come your side.",
-                'english': f"I'm sorry! You might have {disease}. {description} Please visit a PHC that has {drug_text}. Type OKADA to book transportation.",
-                'yoruba': f"E ma binu! O le ni {disease}. {description} Jowo lo si PHC ti o ni {drug_text}. Teko OKADA lati fi okada sakoko.",
-                'igbo': f"Ndo! I nwere ike inwe {disease}. {description} Biko gaa PHC nwere {drug_text}. Pịa OKADA iji nye ụgbọ ala ọkwa.",
-                'hausa': f"Yi hakuri! Kuna iya samun {disease}. {description} Don Allah a ziyarci PHC wanda yake da {drug_text}. Latsa OKADA don yin aikin motar."
-            }
+            key = 'diagnosis_high'
         elif confidence > 0.5:
-            templates = {
-                'pidgin': f"No worry, but you fit get {disease}. {description} Make you rest well, drink plenty water. If you no better, type OKADA make we help you find PHC wey get {drug_text}.",
-                'english': f"Don't worry, but you might have {disease}. {description} Please rest well and drink plenty of water. If you don't feel better, type OKADA to find a PHC with {drug_text}.",
-                'yoruba': f"Ma binu, sugbon o le ni {disease}. {description} Jowo sun won, mu omi pupo. Ti o ko ba gba, te OKADA lati wa PHC ti o ni {drug_text}.",
-                'igbo': f"Echegbula, mana i nwere ike inwe {disease}. {description} Biko zuru ike ma ṅụọ mmiri. Ọ bụrụ na ị naghị enwe mma, pịa OKADA iji chọta PHC nwere {drug_text}.",
-                'hausa': f"Kada ku damu, amma kuna iya samun {disease}. {description} Don Allah a huta da kyau, ku sha ruwa da yawa. Idan ba ku ji dadi ba, danna OKADA don nemo PHC mai {drug_text}."
-            }
+            key = 'diagnosis_medium'
         else:
-            templates = {
-                'pidgin': f"Small small, you fit get {disease}. {description} Make you observe your body well. If e worse or you no better tomorrow, type OKADA make we book bike for you.",
-                'english': f"There's a slight chance you might have {disease}. {description} Please monitor your symptoms. If they worsen or you don't feel better tomorrow, type OKADA.",
-                'yoruba': f"Kekere, o le ni {disease}. {description} Jowo wo awọn aami ara rẹ daradara. Ti o ba buru tabi o ko ba gba ni ola, te OKADA.",
-                'igbo': f"O nwere ohere pere mpe na ị nwere ike inwe {disease}. {description} Biko nyochaa ihe mgbaàmà gị. Ọ bụrụ na ha akawanye njọ ma ọ bụ na ị naghị enwe mma echi, pịa OKADA.",
-                'hausa': f"Akwai ɗan dama kuna iya samun {disease}. {description} Don Allah a lura da alamun ku. Idan sun yi muni ko ba ku ji dadi gobe, danna OKADA."
-            }
+            key = 'diagnosis_low'
         
-        return templates.get(language, templates['english'])
\ No newline at end of file
+        return render(key, language, disease=disease, description=description, drug=drug_text)
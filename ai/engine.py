@@ -0,0 +1,129 @@
+# lifelynx/core/ai/engine.py
+import logging
+import os
+import threading
+import time
+
+from ai.artifact import ARTIFACT_ROOT, current_pointer
+from ai.cache import get_result_cache
+from ai.chatbot_simple import LifelynxAISimple, MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+# How often (in seconds) the model file is stat'ed for changes
+CHECK_INTERVAL = 2.0
+
+
+class EngineRegistry:
+    """Process-wide holder for the shared LifelynxAISimple instance.
+
+    The engine is built once and handed to every caller. Apart from its
+    result cache, which is thread-safe and owned by that engine alone, it
+    is read-only after construction, so concurrent requests can share it
+    without locking. When one of the watched model files changes on disk a
+    fresh engine with a fresh cache is built and swapped in; callers
+    holding the old one keep using it, and its cache, until they return.
+    """
+
+    def __init__(self, factory=LifelynxAISimple, watch_paths=None, check_interval=CHECK_INTERVAL):
+        self._factory = factory
+        self._watch_paths = list(watch_paths or [MODEL_PATH, current_pointer(ARTIFACT_ROOT)])
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._engine = None
+        self._fingerprint = None
+        self._next_check = 0.0
+
+    def _current_fingerprint(self):
+        stamps = []
+        for path in self._watch_paths:
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def get(self):
+        """Return the shared engine, reloading it if the model changed"""
+        engine = self._engine
+        now = time.monotonic()
+        if engine is not None:
+            if now < self._next_check:
+                return engine
+            if self._current_fingerprint() == self._fingerprint:
+                self._next_check = now + self._check_interval
+                return engine
+
+        with self._lock:
+            if self._engine is None or self._current_fingerprint() != self._fingerprint:
+                self._load()
+            self._next_check = time.monotonic() + self._check_interval
+            return self._engine
+
+    def current(self):
+        """The loaded engine, or None; never loads one"""
+        return self._engine
+
+    def reload(self):
+        """Force a rebuild of the shared engine"""
+        with self._lock:
+            self._load()
+            self._next_check = time.monotonic() + self._check_interval
+            return self._engine
+
+    def _load(self):
+        try:
+            engine = self._factory()
+        except Exception as e:
+            if self._engine is None:
+                raise
+            logger.error(f"AI engine reload failed, keeping previous engine: {e}")
+            # Don't retry on every request until the file changes again
+            self._fingerprint = self._current_fingerprint()
+            return
+
+        # Fingerprint after construction: the engine may have trained and
+        # written a fresh model file while loading.
+        self._engine = engine
+        self._fingerprint = self._current_fingerprint()
+        logger.info("AI engine loaded")
+
+
+def _build_engine():
+    # A cache per engine: results of a replaced model go away with it
+    return LifelynxAISimple(result_cache=get_result_cache())
+
+
+_registry = EngineRegistry(factory=_build_engine)
+
+
+def get_engine():
+    """Shared LifelynxAISimple instance for the current process"""
+    return _registry.get()
+
+
+def cache_stats():
+    """Hit/miss/eviction counters of the current engine's inference cache"""
+    cache = getattr(_registry.current(), 'result_cache', None)
+    return cache.stats() if cache is not None else {}
+
+
+def reload_engine():
+    return _registry.reload()
+
+
+def warm_up():
+    """Load the engine ahead of the first request, if LIFELYNX_AI_WARMUP is on.
+
+    Called from the WSGI/ASGI entrypoints and Celery's worker_process_init,
+    never from AppConfig.ready(), so migrate, shell and other management
+    commands don't load (or train) the model.
+    """
+    from django.conf import settings
+    if not getattr(settings, 'LIFELYNX_AI_WARMUP', True):
+        return
+    try:
+        get_engine()
+    except Exception as e:
+        logger.error(f"AI engine warmup failed: {e}")
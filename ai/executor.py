@@ -0,0 +1,38 @@
+# lifelynx/core/ai/executor.py
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _max_workers():
+    try:
+        from django.conf import settings
+        workers = getattr(settings, 'LIFELYNX_AI_THREADS', None)
+    except Exception:
+        workers = None
+    return workers or os.cpu_count() or 1
+
+
+def get_inference_executor():
+    """Process-wide thread pool that async views run inference on.
+
+    Bounded so a burst of requests queues for a worker thread instead of
+    oversubscribing the CPU; the event loop stays free to serve the many
+    connections that are only waiting on the network.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix='lifelynx-ai')
+        return _executor
+
+
+async def run_inference(func, *args, **kwargs):
+    """Await func(*args, **kwargs) on the inference pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_inference_executor(), functools.partial(func, *args, **kwargs))
@@ -0,0 +1,121 @@
+# lifelynx/core/ai/matcher.py
+import re
+from collections import deque
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into (token, start, end) word tokens, lowercased"""
+    return [(m.group().lower(), m.start(), m.end()) for m in TOKEN_RE.finditer(text)]
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over word tokens.
+
+    Phrases are matched on whole words only, so 'o' never matches inside
+    'body'. A scan is one pass over the message tokens and its cost does
+    not depend on how many phrases were compiled in.
+    """
+
+    def __init__(self, phrases):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for phrase, value in phrases:
+            self._add(phrase, value)
+        self._link()
+
+    def _add(self, phrase, value):
+        tokens = [token for token, _, _ in tokenize(phrase)]
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[node][token] = child
+            node = child
+        self._out[node] = self._out[node] + ((value, len(tokens)),)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, tokens):
+        """Yield (value, start, end) for every phrase found in tokens"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, (token, _, end) in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for value, length in out[node]:
+                yield value, tokens[i - length + 1][1], end
+
+
+class SymptomMatcher:
+    """Per-language symptom and filler-word automata, compiled once"""
+
+    def __init__(self, symptom_mapping, filler_words, default_language='english'):
+        self.symptoms = list(symptom_mapping)
+        self.default_language = default_language
+
+        languages = {lang for keywords in symptom_mapping.values() for lang in keywords}
+        self._symptom_automata = {}
+        for language in languages | {default_language}:
+            phrases = []
+            for index, (symptom, keywords) in enumerate(symptom_mapping.items()):
+                lang_keywords = keywords.get(language, keywords.get(default_language, []))
+                phrases.extend((keyword, index) for keyword in lang_keywords)
+            self._symptom_automata[language] = PhraseAutomaton(phrases)
+
+        self._filler_automata = {
+            language: PhraseAutomaton((word, None) for word in words)
+            for language, words in filler_words.items()
+        }
+
+    def match(self, text, language):
+        """Return (symptom, start, end) for every keyword match in text"""
+        automaton = self._symptom_automata.get(language) or self._symptom_automata[self.default_language]
+        return [
+            (self.symptoms[index], start, end)
+            for index, start, end in automaton.scan(tokenize(text))
+        ]
+
+    def extract(self, text, language):
+        """Return the distinct symptoms found in text, in mapping order"""
+        automaton = self._symptom_automata.get(language) or self._symptom_automata[self.default_language]
+        found = {index for index, _, _ in automaton.scan(tokenize(text))}
+        return [self.symptoms[index] for index in sorted(found)]
+
+    def strip_fillers(self, text, language):
+        """Remove filler words and phrases from text on word boundaries"""
+        automaton = self._filler_automata.get(language)
+        if automaton is None:
+            return text
+
+        spans = sorted((start, end) for _, start, end in automaton.scan(tokenize(text)))
+        if not spans:
+            return text
+
+        parts = []
+        position = 0
+        for start, end in spans:
+            if start > position:
+                parts.append(text[position:start])
+            position = max(position, end)
+        parts.append(text[position:])
+        return ' '.join(parts)
@@ -0,0 +1,77 @@
+# lifelynx/core/ai/scoring.py
+import numpy as np
+
+# The first symptoms listed for a disease are its key symptoms
+KEY_SYMPTOM_COUNT = 3
+KEY_SYMPTOM_BOOST = 0.3
+MIN_CONFIDENCE = 0.3
+MAX_CONFIDENCE = 0.95
+
+
+class DiseaseScorer:
+    """Rule-based disease scoring over a precompiled incidence matrix.
+
+    The knowledge base is compiled once into a disease x symptom matrix and
+    a key-symptom mask of the same shape. Scoring a message is a column
+    gather and a row sum over those matrices instead of building sets for
+    every disease on every call.
+    """
+
+    def __init__(self, disease_data):
+        self.diseases = list(disease_data)
+
+        self.symptom_index = {}
+        for data in disease_data.values():
+            for symptom in data['symptoms']:
+                self.symptom_index.setdefault(symptom, len(self.symptom_index))
+
+        shape = (len(self.diseases), len(self.symptom_index))
+        self.incidence = np.zeros(shape, dtype=np.uint8)
+        self.key_mask = np.zeros(shape, dtype=np.uint8)
+        self.totals = np.zeros(len(self.diseases), dtype=np.float64)
+        self.emergency_levels = np.zeros(len(self.diseases), dtype=np.int64)
+
+        for row, data in enumerate(disease_data.values()):
+            columns = [self.symptom_index[symptom] for symptom in data['symptoms']]
+            self.incidence[row, columns] = 1
+            self.key_mask[row, columns[:KEY_SYMPTOM_COUNT]] = 1
+            self.totals[row] = len(data['symptoms'])
+            self.emergency_levels[row] = data['emergency_level']
+
+        self._rows = np.arange(len(self.diseases))
+
+    def score(self, symptoms, top_k=None):
+        """Return [(disease, confidence), ...] best first.
+
+        Ordering matches the original rule engine: confidence descending,
+        then emergency level ascending, then knowledge-base order.
+        """
+        columns = sorted({self.symptom_index[s] for s in symptoms if s in self.symptom_index})
+        if not columns or not len(self.diseases):
+            return []
+
+        matches = self.incidence[:, columns].sum(axis=1, dtype=np.int64)
+        key_matches = self.key_mask[:, columns].sum(axis=1, dtype=np.int64)
+
+        confidence = np.divide(matches, self.totals, out=np.zeros_like(self.totals), where=self.totals > 0)
+        confidence += np.where(key_matches > 0, KEY_SYMPTOM_BOOST, 0.0)
+
+        eligible = (self.totals > 0) & (confidence > MIN_CONFIDENCE) & ((matches >= 2) | (key_matches > 0))
+        candidates = self._rows[eligible]
+        if not len(candidates):
+            return []
+
+        capped = np.minimum(confidence[candidates], MAX_CONFIDENCE)
+        if top_k is not None and top_k < len(candidates):
+            # Keep everything that could still round into the top k
+            threshold = -np.partition(-capped, top_k - 1)[top_k - 1]
+            keep = capped >= threshold - 0.01
+            candidates, capped = candidates[keep], capped[keep]
+
+        # Round with Python's round() so values match the original exactly
+        rounded = np.array([min(round(float(c), 2), MAX_CONFIDENCE) for c in capped])
+        order = np.lexsort((candidates, self.emergency_levels[candidates], -rounded))
+        if top_k is not None:
+            order = order[:top_k]
+
+        return [(self.diseases[candidates[i]], float(rounded[i])) for i in order]
@@ -0,0 +1,131 @@
+# lifelynx/core/ai/session_state.py
+import hashlib
+import logging
+import threading
+
+from ai.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# How many diagnoses of the last turn are remembered
+LAST_DIAGNOSIS_SIZE = 3
+
+# Seconds a process trusts its local copy when a shared tier holds the truth
+SHARED_LOCAL_TTL = 5
+
+
+class SessionStateStore:
+    """Running symptom set and last diagnosis per chat session.
+
+    Each message only adds its own symptoms to the stored state, so the
+    cost per turn doesn't grow with the length of the conversation and
+    the history is never re-read. The local tier is an in-process LRU;
+    the optional shared tier is a Django cache alias so web and Celery
+    processes see the same state. With a shared tier the local copy is
+    only trusted for local_ttl seconds, a few by default.
+
+    update() is a read-modify-write, and the last writer wins: if two
+    turns of one session are processed at the same moment in different
+    processes, the symptoms of one of them can be dropped from the state.
+    A session's turns normally arrive one at a time, so nothing
+    stronger than that is attempted.
+    """
+
+    def __init__(self, max_entries=4096, ttl=86400, local_ttl=None, shared_backend=None,
+                 key_prefix='lifelynx:session:'):
+        self.ttl = ttl
+        self.shared_backend = shared_backend
+        self.key_prefix = key_prefix
+        if local_ttl is None:
+            local_ttl = SHARED_LOCAL_TTL if shared_backend else ttl
+        self.local = LRUCache(max_entries, local_ttl)
+
+    def _shared(self):
+        if not self.shared_backend:
+            return None
+        from django.core.cache import caches
+        return caches[self.shared_backend]
+
+    def _shared_key(self, session_id):
+        return self.key_prefix + hashlib.sha1(str(session_id).encode('utf-8')).hexdigest()
+
+    def get(self, session_id):
+        state = self.local.get(session_id)
+        if state is not None:
+            return state
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                state = shared.get(self._shared_key(session_id))
+            except Exception as e:
+                logger.warning(f"Shared session state read failed: {e}")
+                state = None
+            if state is not None:
+                self.local.set(session_id, state)
+        return state
+
+    def symptoms(self, session_id):
+        state = self.get(session_id)
+        return state['symptoms'] if state else []
+
+    def update(self, session_id, result):
+        """Fold one engine result into the session's state"""
+        new_symptoms = result.get('symptoms_detected') or []
+        if not new_symptoms:
+            return self.get(session_id)
+
+        state = self.get(session_id) or {'symptoms': [], 'last_diagnosis': [], 'turns': 0}
+        known = set(state['symptoms'])
+        state = {
+            'symptoms': state['symptoms'] + [s for s in new_symptoms if s not in known],
+            'last_diagnosis': [
+                {'disease': d['disease'], 'confidence': d['confidence']}
+                for d in result.get('diagnosis', [])[:LAST_DIAGNOSIS_SIZE]
+            ],
+            'turns': state['turns'] + 1,
+        }
+        self.set(session_id, state)
+        return state
+
+    def set(self, session_id, state):
+        self.local.set(session_id, state)
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                shared.set(self._shared_key(session_id), state, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared session state write failed: {e}")
+
+
+def build_session_state():
+    """Build the session state store from the LIFELYNX_AI_SESSION_STATE setting"""
+    try:
+        from django.conf import settings
+        options = getattr(settings, 'LIFELYNX_AI_SESSION_STATE', {})
+    except Exception:
+        options = {}
+
+    if not options.get('ENABLED', True):
+        return None
+    return SessionStateStore(
+        max_entries=options.get('MAX_ENTRIES', 4096),
+        ttl=options.get('TTL', 86400),
+        local_ttl=options.get('LOCAL_TTL'),
+        shared_backend=options.get('SHARED_BACKEND'),
+    )
+
+
+_UNSET = object()
+_store = _UNSET
+_store_lock = threading.Lock()
+
+
+def get_session_state():
+    """Process-wide SessionStateStore, or None when disabled"""
+    global _store
+    with _store_lock:
+        if _store is _UNSET:
+            _store = build_session_state()
+        return _store
@@ -0,0 +1,106 @@
+import json
+import zlib
+from datetime import datetime
+
+from django.db import transaction
+
+from .models import ChatMessage, ChatSession, ChatSessionArchive
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def compress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd archives need the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd archives need the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def pack_messages(messages, codec='zlib'):
+    rows = [
+        {
+            'id': m.id,
+            'sender': m.sender,
+            'message': m.message,
+            'created_at': m.created_at.isoformat(),
+        }
+        for m in messages
+    ]
+    return compress(json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), codec)
+
+
+def unpack_archive(archive):
+    """Archived messages as unsaved ChatMessage instances, oldest first"""
+    rows = json.loads(decompress(bytes(archive.payload), archive.codec))
+    return [
+        ChatMessage(
+            id=row['id'],
+            session_id=archive.session_id,
+            sender=row['sender'],
+            message=row['message'],
+            created_at=datetime.fromisoformat(row['created_at']),
+        )
+        for row in rows
+    ]
+
+
+def session_messages(session):
+    """
+    A session's messages for reading: the hot queryset, or, for archived
+    sessions, archived and hot messages merged into one list.
+    """
+    if not session.is_archived:
+        return session.messages.all()
+
+    archive = ChatSessionArchive.objects.filter(session=session).first()
+    archived = unpack_archive(archive) if archive else []
+    archived_ids = {m.id for m in archived}
+    # Hot rows already in the archive are left over from an interrupted run
+    hot = [m for m in session.messages.all() if m.id not in archived_ids]
+    return archived + hot
+
+
+def archive_session(session, codec='zlib', delete_chunk_size=500):
+    """
+    Pack all hot messages of a session into its archive row, then delete
+    the hot rows in small chunks. Returns the number of messages archived.
+    """
+    with transaction.atomic():
+        archive = ChatSessionArchive.objects.select_for_update().filter(session=session).first()
+        hot = list(session.messages.order_by('created_at', 'id'))
+        if not hot:
+            return 0
+
+        previous = unpack_archive(archive) if archive else []
+        previous_ids = {m.id for m in previous}
+        messages = previous + [m for m in hot if m.id not in previous_ids]
+
+        if archive is None:
+            archive = ChatSessionArchive(session=session)
+        archive.codec = codec
+        archive.payload = pack_messages(messages, codec)
+        archive.message_count = len(messages)
+        archive.save()
+
+        # update() rather than save() so last_activity isn't touched
+        ChatSession.objects.filter(pk=session.pk).update(is_archived=True)
+
+    # The archive is committed; reads merge and de-duplicate, so the hot
+    # rows can go in short transactions that don't hold long locks.
+    hot_ids = [m.id for m in hot]
+    for start in range(0, len(hot_ids), delete_chunk_size):
+        ChatMessage.objects.filter(id__in=hot_ids[start:start + delete_chunk_size]).delete()
+
+    return len(hot)
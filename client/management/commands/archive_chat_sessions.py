@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from client.archive import archive_session, zstandard
+from client.models import ChatMessage, ChatSession
+
+
+class Command(BaseCommand):
+    help = "Move messages of sessions inactive for N days into compressed per-session archives"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Archive sessions idle for this many days")
+        parser.add_argument('--codec', choices=['zlib', 'zstd'], default='zlib')
+        parser.add_argument('--chunk-size', type=int, default=500, help="Hot rows deleted per statement")
+        parser.add_argument('--limit', type=int, help="Stop after this many sessions")
+
+    def handle(self, *args, **options):
+        if options['codec'] == 'zstd' and zstandard is None:
+            raise CommandError("The zstd codec needs the 'zstandard' package")
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        has_hot_messages = Exists(ChatMessage.objects.filter(session=OuterRef('pk')))
+        candidates = ChatSession.objects.filter(last_activity__lt=cutoff).filter(has_hot_messages).order_by('id')
+
+        last_id = 0
+        sessions = 0
+        messages = 0
+        while options['limit'] is None or sessions < options['limit']:
+            session = candidates.filter(id__gt=last_id).first()
+            if session is None:
+                break
+            last_id = session.id
+            messages += archive_session(session, options['codec'], options['chunk_size'])
+            sessions += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {messages} messages from {sessions} sessions"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+
+from client.models import ChatMessage, ChatSession
+
+
+class Command(BaseCommand):
+    help = "Recompute ChatSession message_count / last_message_* from ChatMessage rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        latest = ChatMessage.objects.filter(session=OuterRef('pk')).order_by('-created_at', '-id')
+
+        last_id = 0
+        total = 0
+        while True:
+            sessions = list(
+                ChatSession.objects.filter(id__gt=last_id).order_by('id').annotate(
+                    counted=Count('messages'),
+                    latest_message=Subquery(latest.values('message')[:1]),
+                    latest_at=Subquery(latest.values('created_at')[:1]),
+                ).only('id')[:chunk_size]
+            )
+            if not sessions:
+                break
+
+            for session in sessions:
+                session.message_count = session.counted
+                session.last_message_preview = (session.latest_message or '')[:ChatSession.PREVIEW_LENGTH]
+                session.last_message_at = session.latest_at
+
+            ChatSession.objects.bulk_update(
+                sessions, ['message_count', 'last_message_preview', 'last_message_at']
+            )
+            last_id = sessions[-1].id
+            total += len(sessions)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled counters for {total} chat sessions"))
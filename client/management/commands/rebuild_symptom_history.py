@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+
+from accounts.models import User
+from client.models import ChatSession, HealthReport, SymptomHistory
+
+
+class Command(BaseCommand):
+    help = "Recompute SymptomHistory totals and ChatSession.first_symptoms_reported from existing rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        sessions = self._rebuild_sessions(chunk_size)
+        users = self._rebuild_users(chunk_size)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt symptom history for {users} users and {sessions} chat sessions"))
+
+    def _rebuild_sessions(self, chunk_size):
+        first_report = HealthReport.objects.filter(session=OuterRef('pk')).order_by('id')
+
+        last_id = 0
+        total = 0
+        while True:
+            sessions = list(
+                ChatSession.objects.filter(id__gt=last_id).order_by('id').annotate(
+                    first_symptoms=Subquery(first_report.values('symptoms_reported')[:1]),
+                ).only('id')[:chunk_size]
+            )
+            if not sessions:
+                return total
+
+            for session in sessions:
+                session.first_symptoms_reported = session.first_symptoms or ''
+
+            ChatSession.objects.bulk_update(sessions, ['first_symptoms_reported'])
+            last_id = sessions[-1].id
+            total += len(sessions)
+
+    def _rebuild_users(self, chunk_size):
+        last_id = 0
+        total = 0
+        while True:
+            users = list(
+                User.objects.filter(id__gt=last_id).order_by('id').annotate(
+                    session_total=Count('chat_sessions', distinct=True),
+                    report_total=Count('health_reports', distinct=True),
+                ).only('id')[:chunk_size]
+            )
+            if not users:
+                return total
+
+            SymptomHistory.objects.bulk_create(
+                [
+                    SymptomHistory(user=user, total_sessions=user.session_total, total_reports=user.report_total)
+                    for user in users
+                ],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['total_sessions', 'total_reports', 'updated_at']
+            )
+            last_id = users[-1].id
+            total += len(users)
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0002_delete_appointment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
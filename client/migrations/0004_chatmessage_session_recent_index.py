@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0003_chatsession_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['session', '-created_at', '-id'], name='chatmessage_session_recent'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0004_chatmessage_session_recent_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ChatSessionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(choices=[('zlib', 'zlib'), ('zstd', 'zstd')], default='zlib', max_length=10)),
+                ('payload', models.BinaryField()),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='client.chatsession')),
+            ],
+        ),
+    ]
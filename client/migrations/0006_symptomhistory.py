@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0005_chatsessionarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='first_symptoms_reported',
+            field=models.TextField(blank=True),
+        ),
+        migrations.CreateModel(
+            name='SymptomHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_sessions', models.PositiveIntegerField(default=0)),
+                ('total_reports', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='symptom_history', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    ChatSession = apps.get_model('client', 'ChatSession')
+    HealthReport = apps.get_model('client', 'HealthReport')
+    SymptomHistory = apps.get_model('client', 'SymptomHistory')
+
+    first_report = HealthReport.objects.filter(session=OuterRef('pk')).order_by('id')
+    ChatSession.objects.update(
+        first_symptoms_reported=Coalesce(Subquery(first_report.values('symptoms_reported')[:1]), Value('', output_field=TextField()))
+    )
+
+    totals = defaultdict(lambda: {'total_sessions': 0, 'total_reports': 0})
+    for row in ChatSession.objects.order_by().values('user_id').annotate(count=Count('id')):
+        totals[row['user_id']]['total_sessions'] = row['count']
+    for row in HealthReport.objects.order_by().values('user_id').annotate(count=Count('id')):
+        totals[row['user_id']]['total_reports'] = row['count']
+
+    SymptomHistory.objects.bulk_create(
+        [SymptomHistory(user_id=user_id, **counts) for user_id, counts in totals.items()],
+        batch_size=500,
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0006_symptomhistory'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0007_backfill_symptom_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PHC',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('address', models.TextField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('phone_number', models.CharField(max_length=15)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DrugInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('drug_name', models.CharField(max_length=100)),
+                ('quantity', models.IntegerField(default=0)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('phc', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='client.phc')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EmergencyAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location_lat', models.FloatField()),
+                ('location_lng', models.FloatField()),
+                ('emergency_services_contacted', models.BooleanField(default=False)),
+                ('family_notified', models.BooleanField(default=False)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('chat_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='client.chatsession')),
+                ('health_record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='client.healthprofile')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OkadaBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('driver_name', models.CharField(max_length=100)),
+                ('driver_phone', models.CharField(max_length=15)),
+                ('vehicle_plate', models.CharField(max_length=20)),
+                ('fare', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('arrived', 'Arrived'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('estimated_arrival', models.IntegerField(help_text='Estimated arrival in minutes')),
+                ('chat_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='client.chatsession')),
+                ('phc', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='client.phc')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
 
 from accounts.models import User
 
@@ -73,6 +75,23 @@ class HealthMetric(models.Model):
                 return "High"
         return None
 
+class ChatSessionQuerySet(models.QuerySet):
+
+    def close(self):
+        """Mark the open sessions in the queryset inactive with one UPDATE.
+
+        update() sends no post_save, so sessions_closed is sent instead with
+        the owners' ids for caches keyed on a user's active session.
+        """
+        from .signals import sessions_closed
+
+        open_sessions = self.filter(is_active=True)
+        user_ids = set(open_sessions.values_list('user_id', flat=True))
+        closed = open_sessions.update(is_active=False)
+        if closed:
+            sessions_closed.send(sender=ChatSession, user_ids=user_ids)
+        return closed
+
 class ChatSession(models.Model):
     user = models.ForeignKey(
         User, 
@@ -84,9 +103,45 @@ class ChatSession(models.Model):
     last_activity = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    # Denormalized from ChatMessage so listing sessions needs no per-row queries
+    message_count = models.PositiveIntegerField(default=0)
+    last_message_preview = models.CharField(max_length=255, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
+    # Older messages live compressed in ChatSessionArchive
+    is_archived = models.BooleanField(default=False)
+
+    # Symptoms of the session's first HealthReport, copied when it's created
+    first_symptoms_reported = models.TextField(blank=True)
+
+    objects = ChatSessionQuerySet.as_manager()
+
+    PREVIEW_LENGTH = 255
+
     def __str__(self):
         return f"ChatSession ({self.user.username}) - {self.title or self.started_at.strftime('%Y-%m-%d %H:%M')}"
 
+    @classmethod
+    def record_messages(cls, session_id, count, last_message, **extra_updates):
+        """Bump the counters for count new messages in one UPDATE.
+
+        The preview only moves forward: a slower writer holding an older
+        message never overwrites a newer preview.
+        """
+        is_newer = Q(last_message_at__isnull=True) | Q(last_message_at__lte=last_message.created_at)
+        return cls.objects.filter(pk=session_id).update(
+            message_count=F('message_count') + count,
+            last_message_preview=Case(
+                When(is_newer, then=Value(last_message.message[:cls.PREVIEW_LENGTH])),
+                default=F('last_message_preview'),
+            ),
+            last_message_at=Case(
+                When(is_newer, then=Value(last_message.created_at)),
+                default=F('last_message_at'),
+            ),
+            **extra_updates
+        )
+
 class ChatMessage(models.Model):
     
     SENDER_CHOICES = [
@@ -105,10 +160,68 @@ class ChatMessage(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset paging of a session's history, newest first
+            models.Index(fields=['session', '-created_at', '-id'], name='chatmessage_session_recent'),
+        ]
 
     def __str__(self):
         return f"{self.sender.capitalize()} Message ({self.created_at.strftime('%H:%M:%S')})"
 
+class ChatSessionArchive(models.Model):
+    """Messages of an inactive session packed into one compressed JSON blob"""
+
+    CODEC_CHOICES = [
+        ('zlib', 'zlib'),
+        ('zstd', 'zstd'),
+    ]
+
+    session = models.OneToOneField(ChatSession, on_delete=models.CASCADE, related_name="archive")
+    codec = models.CharField(max_length=10, choices=CODEC_CHOICES, default='zlib')
+    payload = models.BinaryField()
+    message_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Archive of session {self.session_id} ({self.message_count} messages)"
+
+class SymptomHistory(models.Model):
+    """Per-user totals behind SymptomHistoryView, maintained by signals"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="symptom_history")
+    total_sessions = models.PositiveIntegerField(default=0)
+    total_reports = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Symptom history - {self.user.full_name}"
+
+    @classmethod
+    def bump(cls, user_id, sessions=0, reports=0):
+        """Adjust the user's totals in one UPDATE, creating the row on first use"""
+        changes = {
+            'total_sessions': F('total_sessions') + sessions,
+            'total_reports': F('total_reports') + reports,
+            'updated_at': timezone.now(),
+        }
+        updated = cls.objects.filter(user_id=user_id).update(**changes)
+        if updated or sessions < 0 or reports < 0:
+            # Deletes never create a row: the user may be going away too
+            return
+        cls.objects.bulk_create([cls(user_id=user_id)], ignore_conflicts=True)
+        cls.objects.filter(user_id=user_id).update(**changes)
+
+    @classmethod
+    def for_user(cls, user_id):
+        """The user's row, created from live counts if it doesn't exist yet"""
+        history = cls.objects.filter(user_id=user_id).first()
+        if history is None:
+            history, _ = cls.objects.get_or_create(user_id=user_id, defaults={
+                'total_sessions': ChatSession.objects.filter(user_id=user_id).count(),
+                'total_reports': HealthReport.objects.filter(user_id=user_id).count(),
+            })
+        return history
+
 class HealthReport(models.Model):
     session = models.ForeignKey(
         ChatSession,
@@ -72,7 +72,4 @@ class ChatSessionSummarySerializer(serializers.ModelSerializer):
         ]
 
     def get_symptoms_reported(self, obj):
-        report = getattr(obj, "report", None)
-        if report and report.exists():
-            return report.first().symptoms_reported
-        return None
+        return obj.first_symptoms_reported or None
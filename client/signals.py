@@ -0,0 +1,45 @@
+from django.db.models import Case, F, TextField, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import ChatMessage, ChatSession, HealthReport, SymptomHistory
+
+# Sent by ChatSession.objects...close() with user_ids, the owners of the
+# sessions it closed
+sessions_closed = Signal()
+
+
+@receiver(post_save, sender=ChatMessage)
+def update_session_counters(sender, instance, created, **kwargs):
+    if created:
+        ChatSession.record_messages(instance.session_id, 1, instance)
+
+
+@receiver(post_save, sender=ChatSession)
+def count_new_session(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        SymptomHistory.bump(instance.user_id, sessions=1)
+
+
+@receiver(post_delete, sender=ChatSession)
+def uncount_session(sender, instance, **kwargs):
+    SymptomHistory.bump(instance.user_id, sessions=-1)
+
+
+@receiver(post_save, sender=HealthReport)
+def record_new_report(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    SymptomHistory.bump(instance.user_id, reports=1)
+    # Only the first report of a session sets its symptoms
+    ChatSession.objects.filter(pk=instance.session_id).update(
+        first_symptoms_reported=Case(
+            When(first_symptoms_reported='', then=Value(instance.symptoms_reported, output_field=TextField())),
+            default=F('first_symptoms_reported'),
+        )
+    )
+
+
+@receiver(post_delete, sender=HealthReport)
+def uncount_report(sender, instance, **kwargs):
+    SymptomHistory.bump(instance.user_id, reports=-1)
@@ -1,3 +1,95 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from .archive import archive_session, session_messages
+from .models import ChatMessage, ChatSession, ChatSessionArchive, HealthReport, SymptomHistory
+
+
+def make_user(email='patient@example.com', phone_number='+2348000000100'):
+    return User.objects.create_user(email, 'Test Patient', phone_number, is_active=True)
+
+
+class SymptomHistoryTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def history(self):
+        return SymptomHistory.objects.get(user=self.user)
+
+    def test_totals_follow_sessions_and_reports(self):
+        first = ChatSession.objects.create(user=self.user)
+        second = ChatSession.objects.create(user=self.user)
+        HealthReport.objects.create(session=first, user=self.user, symptoms_reported='fever')
+        HealthReport.objects.create(session=first, user=self.user, symptoms_reported='cough')
+        self.assertEqual((self.history().total_sessions, self.history().total_reports), (2, 2))
+
+        second.delete()
+        self.assertEqual((self.history().total_sessions, self.history().total_reports), (1, 2))
+
+        first.refresh_from_db()
+        self.assertEqual(first.first_symptoms_reported, 'fever')
+
+    def test_view_summarizes_history(self):
+        chat_session = ChatSession.objects.create(user=self.user)
+        HealthReport.objects.create(session=chat_session, user=self.user, symptoms_reported='fever')
+
+        response = self.client.get('/api/client/symptom_history/')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results['summary'], {'total_sessions': 1, 'total_reports': 1})
+        self.assertEqual(len(results['sessions']), 1)
+
+    def test_missing_row_is_rebuilt_from_live_counts(self):
+        ChatSession.objects.create(user=self.user)
+        SymptomHistory.objects.filter(user=self.user).delete()
+
+        response = self.client.get('/api/client/symptom_history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results']['summary']['total_sessions'], 1)
+        self.assertEqual(self.history().total_sessions, 1)
+
+    def test_no_sessions_is_not_found(self):
+        self.assertEqual(self.client.get('/api/client/symptom_history/').status_code, 404)
+
+
+class ArchiveSessionTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('archive@example.com', '+2348000000101')
+        self.chat_session = ChatSession.objects.create(user=self.user)
+        self.add_messages(['I get fever', 'Na malaria be this', 'Ọ̀fọ́ dey worry me'])
+
+    def add_messages(self, texts):
+        for i, text in enumerate(texts):
+            ChatMessage.objects.create(session=self.chat_session, sender='user' if i % 2 == 0 else 'ai', message=text)
+
+    def read(self):
+        self.chat_session.refresh_from_db()
+        return [(m.sender, m.message) for m in session_messages(self.chat_session)]
+
+    def test_archived_messages_read_the_same(self):
+        before = self.read()
+
+        self.assertEqual(archive_session(self.chat_session, delete_chunk_size=2), 3)
+
+        self.assertFalse(ChatMessage.objects.filter(session=self.chat_session).exists())
+        self.assertEqual(self.read(), before)
+        self.assertTrue(self.chat_session.is_archived)
+        self.assertEqual(self.chat_session.message_count, 3)
+
+    def test_archiving_again_merges_new_messages(self):
+        archive_session(self.chat_session)
+        self.add_messages(['Thank you'])
+        self.assertEqual(len(self.read()), 4)
+
+        self.assertEqual(archive_session(self.chat_session), 1)
+
+        self.assertEqual(ChatSessionArchive.objects.get(session=self.chat_session).message_count, 4)
+        self.assertEqual([message for _, message in self.read()][-1], 'Thank you')
+        self.assertEqual(archive_session(self.chat_session), 0)
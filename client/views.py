@@ -2,16 +2,17 @@ from django.shortcuts import render
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
-from .models import HealthProfile, HealthMetric, ChatSession, HealthReport
+from .models import HealthProfile, HealthMetric, ChatSession, SymptomHistory
 from .serializers import HealthProfileSerializer, HealthMetricSerializer, NearbyHospitalSerializer, ChatSessionSummarySerializer
 from hospital.models import Hospital
+from hospital.spatial import nearby_hospitals
 from core.serializers import AppointmentSerializer
-from core.pagination import StandardResultsSetPagination
-from core.utils import geocode_address, haversine_distance
+from core.pagination import StandardResultsSetPagination, PrecountedResultsSetPagination
+from core.utils import geocode_address
 from core.models import Appointment, Notification
 
 # Create your views here.
@@ -203,6 +204,9 @@ class NearbyHospitalsView(generics.ListAPIView):
     serializer_class = NearbyHospitalSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
     def get_queryset(self):
         user = self.request.user
 
@@ -216,51 +220,43 @@ class NearbyHospitalsView(generics.ListAPIView):
         if not user_lat or not user_lon:
             return Hospital.objects.none()
 
-        hospitals = Hospital.objects.filter(verified=True, approved_by_admin=True, latitude__isnull=False, longitude__isnull=False)
-
-        hospital_list = []
-        for hospital in hospitals:
-            distance = haversine_distance(user_lat, user_lon, float(hospital.latitude), float(hospital.longitude))
-            hospital.distance_km = round(distance, 2)
-            hospital_list.append(hospital)
+        try:
+            limit = int(self.request.query_params.get('limit', self.DEFAULT_LIMIT))
+            radius_km = self.request.query_params.get('radius_km')
+            radius_km = float(radius_km) if radius_km else None
+        except ValueError:
+            raise ValidationError({'detail': 'limit must be an integer and radius_km a number.'})
+        if limit < 1 or (radius_km is not None and radius_km <= 0):
+            raise ValidationError({'detail': 'limit and radius_km must be positive.'})
 
-        hospital_list.sort(key=lambda x: x.distance_km)
-        return hospital_list
+        return nearby_hospitals(float(user_lat), float(user_lon), min(limit, self.MAX_LIMIT), radius_km)
 
 class SymptomHistoryView(generics.GenericAPIView):
     serializer_class = ChatSessionSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = PrecountedResultsSetPagination
 
     def get(self, request, *args, **kwargs):
         user = request.user
 
-        sessions = ChatSession.objects.filter(user=user).order_by("-last_activity")
-        session_count = sessions.count()
-        report_count = HealthReport.objects.filter(user=user).count()
-
-        if not sessions.exists():
+        # Totals come from the materialized SymptomHistory row, so the page
+        # of sessions is the only other query once the row exists
+        history = SymptomHistory.for_user(user.id)
+        if history.total_sessions == 0:
             return Response(
                 {"message": "No chat sessions found."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        page = self.paginate_queryset(sessions)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response({
-                "summary": {
-                    "total_sessions": session_count,
-                    "total_reports": report_count,
-                },
-                "sessions": serializer.data
-            })
-
-        serializer = self.get_serializer(sessions, many=True)
-        return Response({
-            "summary": {
-                "total_sessions": session_count,
-                "total_reports": report_count,
-            },
+        summary = {
+            "total_sessions": history.total_sessions,
+            "total_reports": history.total_reports,
+        }
+        sessions = ChatSession.objects.filter(user=user).order_by("-last_activity")
+
+        page = self.paginator.paginate_queryset(sessions, request, view=self, count=history.total_sessions)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response({
+            "summary": summary,
             "sessions": serializer.data
-        }, status=status.HTTP_200_OK)
+        })
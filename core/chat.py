@@ -0,0 +1,113 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from ai.engine import get_engine
+from ai.session_state import get_session_state
+from client.models import ChatMessage, ChatSession, HealthProfile, HealthReport
+from .search import index_messages
+
+logger = logging.getLogger(__name__)
+
+
+def build_user_context(user_id):
+    """Health context passed to the AI engine, from the user's latest HealthProfile"""
+    profile = (
+        HealthProfile.objects.filter(user_id=user_id).order_by('-updated_at')
+        .values('blood_type', 'allergies', 'medications').first()
+    )
+    return profile or {}
+
+
+def generate_reply(session_id, user_id, message_text, language):
+    """
+    Run the AI engine on one message of a session. Symptoms from earlier
+    turns come from the session state store, so multi-turn diagnosis needs
+    no history reads; this turn's symptoms are folded back in afterwards.
+    """
+    state = get_session_state()
+    prior_symptoms = state.symptoms(session_id) if state else []
+    result = get_engine().generate_response(
+        message_text,
+        language,
+        build_user_context(user_id),
+        prior_symptoms=prior_symptoms
+    )
+    if state:
+        state.update(session_id, result)
+    return result
+
+
+def session_title(message_text):
+    return message_text[:50] + "..." if len(message_text) > 50 else message_text
+
+
+def record_chat_turn(session_id, user_id, message_text, result):
+    """
+    Persist a whole chat turn in one transaction: both messages in one
+    INSERT and session title/activity/counters in one UPDATE. The health
+    report for detected symptoms is written afterwards, so a failure there
+    never loses the turn. Returns (user_message, ai_message).
+    """
+    with transaction.atomic():
+        user_message, ai_message = ChatMessage.objects.bulk_create([
+            ChatMessage(session_id=session_id, sender='user', message=message_text),
+            ChatMessage(session_id=session_id, sender='ai', message=result['response']),
+        ])
+        _finish_turn(session_id, message_text, 2, ai_message)
+        index_messages([user_message, ai_message], user_id)
+    record_health_report(session_id, user_id, result)
+    return user_message, ai_message
+
+
+def save_ai_reply(session_id, user_id, message_text, result):
+    """
+    Persist the AI side of a turn whose user message is already saved
+    (async mode, WebSockets). Same single-transaction write path as
+    record_chat_turn. Returns the AI ChatMessage.
+    """
+    with transaction.atomic():
+        ai_message, = ChatMessage.objects.bulk_create([
+            ChatMessage(session_id=session_id, sender='ai', message=result['response']),
+        ])
+        _finish_turn(session_id, message_text, 1, ai_message)
+        index_messages([ai_message], user_id)
+    record_health_report(session_id, user_id, result)
+    return ai_message
+
+
+def _finish_turn(session_id, message_text, message_count, last_message):
+    # bulk_create skips the post_save counter handler, so the counters are
+    # bumped here together with the title and activity in one UPDATE.
+    # The title is only set if the session doesn't have one yet.
+    title = session_title(message_text)
+    ChatSession.record_messages(
+        session_id,
+        message_count,
+        last_message,
+        title=Case(When(title='', then=Value(title)), default=F('title')),
+        last_activity=timezone.now()
+    )
+
+
+def record_health_report(session_id, user_id, result):
+    """Save a HealthReport for a turn that detected symptoms; returns it, or None"""
+    if not result['symptoms_detected']:
+        return None
+    diagnosis = result['diagnosis']
+    try:
+        # Savepoint, so a failure here can't break a surrounding transaction
+        with transaction.atomic():
+            return HealthReport.objects.create(
+                session_id=session_id,
+                user_id=user_id,
+                symptoms_reported=', '.join(result['symptoms_detected']),
+                severity='emergency' if result['is_emergency'] else '',
+                ai_analysis=', '.join(f"{d['disease']} ({d['confidence']:.0%})" for d in diagnosis),
+                recommendations=', '.join(diagnosis[0]['recommended_drugs']) if diagnosis else ''
+            )
+    except Exception as e:
+        logger.error(f"Health report not saved for session {session_id}: {e}")
+        return None
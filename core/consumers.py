@@ -0,0 +1,129 @@
+import logging
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.layers import get_channel_layer
+
+from ai.catalog import render
+from client.models import ChatMessage, ChatSession
+from .chat import generate_reply, save_ai_reply
+from .ratelimit import get_rate_limiter, retry_after_seconds
+from .serializers import ChatMessageSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def session_group(session_id):
+    return f"chat_session_{session_id}"
+
+
+def broadcast_reply(session_id, ai_message, result):
+    """Push an AI reply written outside a consumer (e.g. by a worker) to open sockets"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(session_group(session_id), {
+            'type': 'chat.reply',
+            'message': ai_message,
+            'is_emergency': result['is_emergency'],
+            'health_data': result
+        })
+    except Exception as e:
+        logger.warning(f"Chat broadcast failed: {e}")
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Real-time chat for one ChatSession: ws/chat/<session_id>/
+
+    Client sends {"message": "..."}; every socket on the session receives
+    {"type": "message", ...} for the user message and {"type": "reply", ...}
+    with the AI ChatMessage and emergency flag. A sender over the
+    send_message rate limit gets {"type": "rate_limited", ...} instead.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        session_id = self.scope['url_route']['kwargs']['session_id']
+        self.chat_session = await database_sync_to_async(
+            ChatSession.objects.filter(pk=session_id, user=user).first
+        )()
+        if self.chat_session is None:
+            await self.close(code=4404)
+            return
+
+        self.group_name = session_group(session_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if getattr(self, 'group_name', None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        message_text = str(content.get('message', '')).strip()
+        if not message_text:
+            await self.send_json({'type': 'error', 'error': 'Message cannot be empty'})
+            return
+
+        user = self.scope['user']
+        # Same buckets as the send_message endpoint, so the socket is no way around them
+        decision = await sync_to_async(get_rate_limiter().check, thread_sensitive=False)('send_message', user.id)
+        if not decision.allowed:
+            seconds = retry_after_seconds(decision)
+            await self.send_json({
+                'type': 'rate_limited',
+                'error': render('rate_limited', user.preferred_language, seconds=seconds),
+                'retry_after': seconds
+            })
+            return
+
+        user_message = await database_sync_to_async(ChatMessage.objects.create)(
+            session=self.chat_session,
+            sender='user',
+            message=message_text
+        )
+        await self.channel_layer.group_send(self.group_name, {
+            'type': 'chat.message',
+            'message': ChatMessageSerializer(user_message).data
+        })
+
+        try:
+            # Inference is CPU-bound; keep it off the event loop
+            result = await sync_to_async(generate_reply, thread_sensitive=False)(
+                self.chat_session.id,
+                user.id,
+                message_text,
+                user.preferred_language
+            )
+            ai_message = await database_sync_to_async(save_ai_reply)(
+                self.chat_session.id, user.id, message_text, result
+            )
+        except Exception as e:
+            logger.error(f"WebSocket chat error: {str(e)}")
+            await self.send_json({'type': 'error', 'error': render('error', getattr(user, 'preferred_language', None))})
+            return
+
+        await self.channel_layer.group_send(self.group_name, {
+            'type': 'chat.reply',
+            'message': ChatMessageSerializer(ai_message).data,
+            'is_emergency': result['is_emergency'],
+            'health_data': result
+        })
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
+
+    async def chat_reply(self, event):
+        await self.send_json({
+            'type': 'reply',
+            'message': event['message'],
+            'is_emergency': event['is_emergency'],
+            'health_data': event['health_data']
+        })
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# For radii up to a few hundred km the equirectangular approximation is
+# within about a percent of the great-circle distance; the prefilter widens
+# the radius by this factor so it never drops a point the exact check keeps.
+PREFILTER_MARGIN = 1.05
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between two points given in degrees"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    return c * EARTH_RADIUS_KM
+
+
+def as_points(points):
+    """(N, 2) float array of (lat, lon) degrees from any sequence of pairs"""
+    points = np.asarray(points, dtype=np.float64)
+    return points.reshape(-1, 2)
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    # All arguments in radians; broadcasts
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_many(origin, points):
+    """Distances in km from one (lat, lon) origin to each of N points"""
+    lat, lon = np.radians(origin)
+    points = np.radians(as_points(points))
+    return _haversine(lat, lon, points[:, 0], points[:, 1])
+
+
+def haversine_matrix(origins, points):
+    """(M, N) distances in km between M origins and N points"""
+    origins = np.radians(as_points(origins))
+    points = np.radians(as_points(points))
+    return _haversine(origins[:, 0, None], origins[:, 1, None], points[None, :, 0], points[None, :, 1])
+
+
+def equirectangular_many(origin, points):
+    """Approximate distances in km from origin to N points; cheaper than haversine"""
+    lat, lon = np.radians(origin)
+    points = np.radians(as_points(points))
+    # Wrap longitude differences into [-pi, pi)
+    dlon = (points[:, 1] - lon + np.pi) % (2 * np.pi) - np.pi
+    x = dlon * np.cos((points[:, 0] + lat) / 2)
+    y = points[:, 0] - lat
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+def within_radius(origin, points, radius_km):
+    """
+    (indices, distances) of the points within radius_km of origin, nearest
+    first. The equirectangular prefilter discards most points before the
+    exact haversine distance is computed.
+    """
+    points = as_points(points)
+    candidates = np.flatnonzero(equirectangular_many(origin, points) <= radius_km * PREFILTER_MARGIN)
+    distances = haversine_many(origin, points[candidates])
+    keep = distances <= radius_km
+    candidates, distances = candidates[keep], distances[keep]
+    order = np.argsort(distances, kind='stable')
+    return candidates[order], distances[order]
+
+
+def k_nearest(origin, points, k, radius_km=None):
+    """(indices, distances) of the k points nearest to origin, nearest first"""
+    if radius_km is not None:
+        indices, distances = within_radius(origin, points, radius_km)
+        return indices[:k], distances[:k]
+
+    distances = haversine_many(origin, points)
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    # Partial selection, then sort only the k winners
+    nearest = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+    order = np.argsort(distances[nearest], kind='stable')
+    nearest = nearest[order]
+    return nearest, distances[nearest]
@@ -0,0 +1,264 @@
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import path
+
+from ai.benchmark import build_corpus, summarize
+
+GREETINGS = ['HI', 'Hi', 'hello', 'HELLO', 'Hello o']
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+
+@contextlib.contextmanager
+def temporary_database(file_backed=False):
+    """Run the block against a freshly migrated throwaway test database.
+
+    file_backed puts an SQLite test database in a temporary file instead of
+    memory, so every server thread gets its own connection.
+    """
+    setup_test_environment()
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    previous_name = test_settings.get('NAME')
+    tmpdir = None
+    if file_backed and connection.vendor == 'sqlite':
+        tmpdir = tempfile.mkdtemp(prefix='lifelynx-loadtest-')
+        test_settings['NAME'] = os.path.join(tmpdir, 'db.sqlite3')
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = previous_name
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def celery_settings(**options):
+    """
+    Temporarily change Celery settings, given by their lowercase names.
+    project.celery reads them from Django settings with the CELERY
+    namespace, where the CELERY_* keys win over the plain names, so those
+    are the keys changed. The broker pool and result backend are dropped on
+    the way in and out so neither outlives the settings it was built from.
+    """
+    from project.celery import app
+
+    keys = {f'CELERY_{name.upper()}': value for name, value in options.items()}
+    previous = {key: app.conf.get(key) for key in keys}
+
+    def reset():
+        app.close()
+        app._local.__dict__.pop('backend', None)
+
+    app.conf.update(keys)
+    reset()
+    try:
+        yield
+    finally:
+        app.conf.update(previous)
+        reset()
+
+
+def memory_broker():
+    """Publish Celery tasks to an in-memory broker nobody consumes, so only
+    the cost of enqueueing is measured and no Redis is needed"""
+    return celery_settings(broker_url='memory://', result_backend='cache+memory://', task_always_eager=False)
+
+
+def eager_tasks():
+    """Run Celery tasks inline where they're enqueued, without storing their
+    results, so neither a broker nor a result backend is needed"""
+    return celery_settings(task_always_eager=True, task_eager_propagates=False, task_store_eager_result=False)
+
+
+class URLConf:
+    """Minimal ROOT_URLCONF routing a single view at /bench/"""
+
+    def __init__(self, view):
+        self.urlpatterns = [path('bench/', view)]
+
+
+def whatsapp_payloads(seed=0):
+    """Endless unique webhook deliveries from a small pool of senders"""
+    for i in itertools.count():
+        yield {
+            'MessageSid': f"SMbench{seed}x{i:08d}",
+            'From': f"whatsapp:+23480{(seed * 7919 + i) % 1000:08d}",
+            'Body': ['I get fever and headache', 'my belle dey pain me', 'hello'][i % 3],
+        }
+
+
+def whatsapp_traffic(engine, count, seed=1234, senders=200, greeting_ratio=0.08, okada_ratio=0.03):
+    """
+    Seeded, realistic webhook deliveries in the Twilio form format: mostly
+    multilingual symptom messages from the benchmark corpus, plus greetings
+    and OKADA commands, spread over a pool of Nigerian numbers.
+    Returns a list of (kind, payload).
+    """
+    rng = random.Random(seed)
+    corpus = build_corpus(engine, size=min(count, 1000), seed=seed)
+    numbers = [f"+234{rng.choice(['70', '80', '81', '90', '91'])}{rng.randrange(10 ** 8):08d}" for _ in range(senders)]
+
+    traffic = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < okada_ratio:
+            kind, body = 'okada', rng.choice(['OKADA', 'okada', 'Okada'])
+        elif roll < okada_ratio + greeting_ratio:
+            kind, body = 'greeting', rng.choice(GREETINGS)
+        else:
+            kind, body = 'symptoms', corpus[i % len(corpus)][0]
+        traffic.append((kind, {
+            'MessageSid': 'SM' + ''.join(rng.choice('0123456789abcdef') for _ in range(32)),
+            'SmsMessageSid': '',
+            'AccountSid': 'AC' + '0' * 32,
+            'From': f"whatsapp:{rng.choice(numbers)}",
+            'To': 'whatsapp:+14155238886',
+            'Body': body,
+            'NumMedia': '0',
+        }))
+    return traffic
+
+
+class QueryCountingHandler(WSGIHandler):
+    """WSGI handler that reports the number of SQL queries each request ran
+    in an X-Query-Count response header"""
+
+    def __call__(self, environ, start_response):
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        def counted_start_response(status, headers, *args):
+            return start_response(status, list(headers) + [(QUERY_COUNT_HEADER, str(queries[0]))], *args)
+
+        with connection.execute_wrapper(count):
+            return super().__call__(environ, counted_start_response)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def live_server(handler=None):
+    """
+    Serve the project on a random local port from a background thread, the
+    way LiveServerTestCase does. Yields the base URL.
+    """
+    # In-memory SQLite test databases only exist on this connection. Server
+    # threads then share it, and per-request query counts become unreliable;
+    # use temporary_database(file_backed=True) when they matter.
+    shared = {
+        conn.alias: conn for conn in connections.all()
+        if conn.vendor == 'sqlite' and conn.is_in_memory_db()
+    }
+    for conn in shared.values():
+        conn.inc_thread_sharing()
+
+    httpd = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, connections_override=shared)
+    httpd.set_app(handler or QueryCountingHandler())
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join()
+        for conn in shared.values():
+            conn.dec_thread_sharing()
+
+
+def _report(samples_ns, statuses, elapsed):
+    report = summarize(samples_ns)
+    report['requests_per_second'] = round(len(samples_ns) / elapsed, 1) if elapsed else 0.0
+    report['statuses'] = dict(statuses)
+    return report
+
+
+def run_sync(view, payloads, requests, concurrency, client_delay, headers=None):
+    """Drive a view through the WSGI handler with a fixed pool of threads.
+
+    Every request holds its thread for client_delay seconds first, the way
+    a WSGI worker thread is held while a slow client sends its body.
+    """
+    samples, statuses = [], Counter()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(payload):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client(headers=headers)
+        start = time.perf_counter_ns()
+        if client_delay:
+            time.sleep(client_delay)
+        response = client.post('/bench/', json.dumps(payload), content_type='application/json')
+        elapsed = time.perf_counter_ns() - start
+        with lock:
+            samples.append(elapsed)
+            statuses[response.status_code] += 1
+
+    with override_settings(ROOT_URLCONF=URLConf(view)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, itertools.islice(payloads, requests)))
+        elapsed = time.perf_counter() - start
+    return _report(samples, statuses, elapsed)
+
+
+def run_async(view, payloads, requests, concurrency, client_delay, headers=None):
+    """Drive a view through the ASGI handler from one event loop.
+
+    client_delay is awaited instead of slept, so slow clients cost no
+    threads; concurrency bounds the requests in flight.
+    """
+    samples, statuses = [], Counter()
+
+    async def main():
+        # Headers are passed per request: AsyncClient(headers=...) files them
+        # under their WSGI names, so they'd reach the view as HTTP_HTTP_*
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(payload):
+            async with gate:
+                start = time.perf_counter_ns()
+                if client_delay:
+                    await asyncio.sleep(client_delay)
+                response = await client.post(
+                    '/bench/', json.dumps(payload), content_type='application/json', headers=headers
+                )
+                samples.append(time.perf_counter_ns() - start)
+                statuses[response.status_code] += 1
+
+        await asyncio.gather(*(one(payload) for payload in itertools.islice(payloads, requests)))
+
+    with override_settings(ROOT_URLCONF=URLConf(view)):
+        start = time.perf_counter()
+        asyncio.run(main())
+        elapsed = time.perf_counter() - start
+    return _report(samples, statuses, elapsed)
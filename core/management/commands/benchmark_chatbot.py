@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai import benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark each stage of the chatbot pipeline on a seeded multilingual corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=500, help="Messages in the synthetic corpus")
+        parser.add_argument('--seed', type=int, default=1234)
+        parser.add_argument('--repeat', type=int, default=3, help="Timing passes over the corpus")
+        parser.add_argument('--output', help="Write the JSON report to this file")
+        parser.add_argument('--baseline', help="Previous JSON report to compare against")
+        parser.add_argument('--threshold', type=float, default=0.2, help="Allowed p95 growth (0.2 = 20%%)")
+        parser.add_argument('--min-delta-us', type=float, default=5.0, help="Ignore regressions smaller than this")
+
+    def handle(self, *args, **options):
+        report = benchmark.run(options['size'], options['seed'], options['repeat'])
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+        for stage, stats in report['stages'].items():
+            self.stderr.write(
+                f"{stage:<18} p50 {stats['p50_us']:>9.1f}us  p95 {stats['p95_us']:>9.1f}us  "
+                f"p99 {stats['p99_us']:>9.1f}us  peak {report['allocations'][stage]['mean_peak_bytes']:>9.0f}B"
+            )
+        construction = report['construction']
+        self.stderr.write(
+            f"construction       cold {construction['cold_ms']:.1f}ms  warm p50 {construction['warm_p50_ms']:.1f}ms"
+        )
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = benchmark.find_regressions(
+                report, baseline, options['threshold'], options['min_delta_us']
+            )
+            if regressions:
+                details = ', '.join(f"{stage} {old:.1f}us -> {new:.1f}us" for stage, old, new in regressions)
+                raise CommandError(f"Latency regression: {details}")
+            self.stderr.write(self.style.SUCCESS("No regressions against baseline"))
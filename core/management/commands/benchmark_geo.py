@@ -0,0 +1,97 @@
+import json
+import math
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from core import geo
+
+# Roughly Nigeria
+LAT_RANGE = (4.0, 14.0)
+LON_RANGE = (2.5, 14.7)
+
+
+def _best_ms(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+class Command(BaseCommand):
+    help = "Compare the row-by-row haversine loop with the vectorized core.geo functions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--radius-km', type=float, default=50.0)
+        parser.add_argument('--origins', type=int, default=20, help="Origins for the many-to-many case")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1234)
+        parser.add_argument('--output', help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        origin = (rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE))
+        k, radius_km, repeat = options['k'], options['radius_km'], options['repeat']
+
+        report = {'k': k, 'radius_km': radius_km, 'sizes': {}}
+        for size in options['sizes']:
+            pairs = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(size)]
+            points = geo.as_points(pairs)
+            origins = geo.as_points(pairs[:options['origins']])
+
+            def loop_all():
+                return [geo.haversine_distance(origin[0], origin[1], lat, lon) for lat, lon in pairs]
+
+            def loop_k_nearest():
+                return sorted(range(size), key=lambda i: geo.haversine_distance(origin[0], origin[1], *pairs[i]))[:k]
+
+            def loop_radius():
+                return [i for i, (lat, lon) in enumerate(pairs)
+                        if geo.haversine_distance(origin[0], origin[1], lat, lon) <= radius_km]
+
+            def loop_matrix():
+                return [[geo.haversine_distance(a, b, lat, lon) for lat, lon in pairs] for a, b in origins]
+
+            # The vectorized results must match the loop before timing means anything
+            if not np.allclose(geo.haversine_many(origin, points), loop_all()):
+                raise CommandError("haversine_many disagrees with haversine_distance")
+            if list(geo.k_nearest(origin, points, k)[0]) != loop_k_nearest():
+                raise CommandError("k_nearest disagrees with a full sort")
+
+            cases = {
+                'one_to_many': (loop_all, lambda: geo.haversine_many(origin, points)),
+                'k_nearest': (loop_k_nearest, lambda: geo.k_nearest(origin, points, k)),
+                'within_radius': (loop_radius, lambda: geo.within_radius(origin, points, radius_km)),
+                'many_to_many': (loop_matrix, lambda: geo.haversine_matrix(origins, points)),
+                'equirectangular': (None, lambda: geo.equirectangular_many(origin, points)),
+            }
+
+            results = {}
+            for name, (loop, vectorized) in cases.items():
+                # The Python matrix loop is slow; time it once
+                loop_ms = _best_ms(loop, 1 if name == 'many_to_many' else repeat) if loop else None
+                vector_ms = _best_ms(vectorized, repeat)
+                results[name] = {
+                    'loop_ms': loop_ms,
+                    'vectorized_ms': vector_ms,
+                    'speedup': round(loop_ms / vector_ms, 1) if loop_ms and vector_ms else None,
+                }
+                self.stderr.write(
+                    f"{size:>7} {name:<16} loop {loop_ms if loop_ms is not None else math.nan:>10.2f}ms  "
+                    f"numpy {vector_ms:>8.2f}ms  x{results[name]['speedup']}"
+                )
+            report['sizes'][str(size)] = results
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
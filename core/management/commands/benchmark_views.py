@@ -0,0 +1,106 @@
+import contextlib
+import itertools
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from accounts.models import User
+from core import loadtest
+from core.ratelimit import get_rate_limiter
+from core.views import AsyncQuickChatView, QuickChatView
+from whatsapp.views import AsyncWhatsAppWebhook, WhatsAppWebhook
+
+VIEWS = {
+    'whatsapp': (WhatsAppWebhook, AsyncWhatsAppWebhook),
+    'quick_chat': (QuickChatView, AsyncQuickChatView),
+}
+
+QUICK_CHAT_MESSAGES = ['I get fever and headache', 'my belle dey pain me', 'body dey hot and I dey cough']
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sync (WSGI handler, thread pool) and async (ASGI handler, one event loop) "
+        "throughput of the WhatsApp webhook and quick-chat views on a throwaway database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(VIEWS), action='append', help="Views to run (default: all)")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per run")
+        parser.add_argument('--concurrency', type=int, action='append', help="Requests in flight (repeatable; default 8, 64)")
+        parser.add_argument('--client-delay-ms', type=float, default=50.0, help="Simulated slow-client time per request")
+        parser.add_argument('--output', help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        targets = options['target'] or sorted(VIEWS)
+        levels = options['concurrency'] or [8, 64]
+        delay = options['client_delay_ms'] / 1000.0
+
+        limiter = get_rate_limiter()
+        limits_enabled, limiter.enabled = limiter.enabled, False
+        report = {'requests': options['requests'], 'client_delay_ms': options['client_delay_ms'], 'results': {}}
+        try:
+            with loadtest.temporary_database(), loadtest.memory_broker():
+                headers = self._auth_headers()
+                seeds = itertools.count()
+                for target in targets:
+                    sync_view, async_view = VIEWS[target]
+                    report['results'][target] = {}
+                    with self._target_settings(target):
+                        for concurrency in levels:
+                            runs = {}
+                            for mode, view, runner in [
+                                ('sync_wsgi', sync_view, loadtest.run_sync),
+                                ('async_asgi', async_view, loadtest.run_async),
+                            ]:
+                                self._preflight(target, mode, view, runner, headers, next(seeds))
+                                runs[mode] = runner(
+                                    view.as_view(), self._payloads(target, next(seeds)),
+                                    options['requests'], concurrency, delay, headers
+                                )
+                                self.stderr.write(
+                                    f"{target:<11} {mode:<10} c={concurrency:<5} "
+                                    f"{runs[mode]['requests_per_second']:>8.1f} req/s  "
+                                    f"p95 {runs[mode]['p95_us'] / 1000:>8.1f}ms  {runs[mode]['statuses']}"
+                                )
+                            report['results'][target][str(concurrency)] = runs
+        finally:
+            limiter.enabled = limits_enabled
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _target_settings(self, target):
+        if target == 'whatsapp':
+            # Time the acknowledgement path: the webhook only enqueues
+            return override_settings(LIFELYNX_AI_ASYNC=True)
+        return contextlib.nullcontext()
+
+    def _preflight(self, target, mode, view, runner, headers, seed):
+        """One untimed request that has to succeed, so a broken view can't be
+        reported as fast error responses"""
+        statuses = runner(view.as_view(), self._payloads(target, seed), 1, 1, 0, headers)['statuses']
+        if set(statuses) - {200, 202}:
+            raise CommandError(f"{target} ({mode}) answered {statuses}; not benchmarking a failing view")
+
+    def _auth_headers(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user = User.objects.create_user(
+            email='bench@lifelynx.test',
+            full_name='Benchmark User',
+            phone_number='+2348000000000',
+            password=None,
+            is_active=True
+        )
+        return {'Authorization': f"Bearer {AccessToken.for_user(user)}"}
+
+    def _payloads(self, target, seed):
+        if target == 'whatsapp':
+            return loadtest.whatsapp_payloads(seed)
+        return ({'message': message, 'language': 'pidgin'} for message in itertools.cycle(QUICK_CHAT_MESSAGES))
@@ -0,0 +1,27 @@
+import joblib
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.artifact import ARTIFACT_ROOT, export_pipeline
+from ai.chatbot_simple import MODEL_PATH
+
+
+class Command(BaseCommand):
+    help = "Convert the pickled joblib model into the memory-mappable model artifact"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=MODEL_PATH, help="joblib file to convert")
+        parser.add_argument('--output', default=ARTIFACT_ROOT, help="Artifact root directory")
+        parser.add_argument('--no-publish', action='store_true', help="Write the version without making it current")
+
+    def handle(self, *args, **options):
+        try:
+            pipeline = joblib.load(options['source'])
+        except Exception as e:
+            raise CommandError(f"Could not load {options['source']}: {e}")
+
+        try:
+            directory = export_pipeline(pipeline, options['output'], publish=not options['no_publish'])
+        except Exception as e:
+            raise CommandError(f"Conversion failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Model artifact written to {directory}"))
@@ -0,0 +1,153 @@
+import contextlib
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from ai.benchmark import summarize
+from ai.engine import get_engine
+from core import loadtest
+from core.ratelimit import get_rate_limiter
+
+WEBHOOK_PATH = '/api/whatsapp/webhook/'
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay seeded synthetic WhatsApp webhook traffic against a local server on a temporary "
+        "database and report throughput, latency, errors and queries per message"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=1234)
+        parser.add_argument('--senders', type=int, default=200, help="Distinct phone numbers")
+        parser.add_argument('--rate', type=float, default=0.0, help="Target messages/second (0 = as fast as possible)")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight")
+        parser.add_argument(
+            '--mode', choices=['inline', 'ack'], default='inline',
+            help="inline: process each message inside the request (eager Celery); "
+                 "ack: only acknowledge, tasks go to an in-memory broker"
+        )
+        parser.add_argument('--retry-threshold-ms', type=float, default=15000.0,
+                            help="Responses slower than this would make the provider retry")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Client timeout in seconds")
+        parser.add_argument('--output', help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        traffic = loadtest.whatsapp_traffic(
+            get_engine(), options['messages'], options['seed'], options['senders']
+        )
+
+        limiter = get_rate_limiter()
+        limits_enabled, limiter.enabled = limiter.enabled, False
+        try:
+            with loadtest.temporary_database(file_backed=True), self._processing(options['mode']):
+                with loadtest.live_server() as base_url:
+                    results, elapsed = self._replay(base_url + WEBHOOK_PATH, traffic, options)
+        finally:
+            limiter.enabled = limits_enabled
+
+        report = self._report(results, elapsed, options)
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+        overall = report['overall']
+        self.stderr.write(
+            f"{overall['messages_per_second']:.1f} msg/s  p50 {overall['latency']['p50_us'] / 1000:.1f}ms  "
+            f"p95 {overall['latency']['p95_us'] / 1000:.1f}ms  p99 {overall['latency']['p99_us'] / 1000:.1f}ms  "
+            f"errors {overall['error_rate']:.2%}  queries/msg {overall['queries']['mean']:.1f}"
+        )
+
+    def _processing(self, mode):
+        if mode == 'ack':
+            stack = contextlib.ExitStack()
+            stack.enter_context(override_settings(LIFELYNX_AI_ASYNC=True))
+            stack.enter_context(loadtest.memory_broker())
+            return stack
+        # Run the worker's processing inside the request, so latency and query
+        # counts cover the whole message
+        return loadtest.eager_tasks()
+
+    def _replay(self, url, traffic, options):
+        results = []
+        lock = threading.Lock()
+        interval = 1.0 / options['rate'] if options['rate'] else 0.0
+
+        def send(index):
+            kind, payload = traffic[index]
+            if interval:
+                # Open-loop schedule: message i goes out at start + i / rate
+                delay = start + index * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            request = urllib.request.Request(url, data=urllib.parse.urlencode(payload).encode('utf-8'))
+            sent = time.perf_counter_ns()
+            status, queries = None, None
+            try:
+                with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                    response.read()
+                    status = response.status
+                    queries = response.headers.get(loadtest.QUERY_COUNT_HEADER)
+            except urllib.error.HTTPError as e:
+                status = e.code
+                queries = e.headers.get(loadtest.QUERY_COUNT_HEADER)
+            except Exception as e:
+                status = type(e).__name__
+            latency = time.perf_counter_ns() - sent
+
+            with lock:
+                results.append((kind, status, latency, int(queries) if queries is not None else None))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(send, range(len(traffic))))
+        return results, time.perf_counter() - start
+
+    def _report(self, results, elapsed, options):
+        def section(rows):
+            latencies = [latency for _, _, latency, _ in rows]
+            queries = [q for _, _, _, q in rows if q is not None]
+            statuses = Counter(str(status) for _, status, _, _ in rows)
+            errors = sum(1 for _, status, _, _ in rows if not (isinstance(status, int) and status < 400))
+            threshold_ns = options['retry_threshold_ms'] * 1e6
+            return {
+                'messages': len(rows),
+                'latency': summarize(latencies),
+                'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+                'statuses': dict(statuses),
+                'over_retry_threshold': sum(1 for latency in latencies if latency > threshold_ns),
+                'queries': {
+                    'total': sum(queries),
+                    'mean': round(sum(queries) / len(queries), 2) if queries else 0.0,
+                    'max': max(queries) if queries else 0,
+                },
+            }
+
+        by_kind = defaultdict(list)
+        for row in results:
+            by_kind[row[0]].append(row)
+
+        overall = section(results)
+        overall['messages_per_second'] = round(len(results) / elapsed, 1) if elapsed else 0.0
+        return {
+            'config': {
+                key: options[key]
+                for key in ['messages', 'seed', 'senders', 'rate', 'concurrency', 'mode', 'retry_threshold_ms']
+            },
+            'elapsed_s': round(elapsed, 3),
+            'overall': overall,
+            'by_kind': {kind: section(rows) for kind, rows in sorted(by_kind.items())},
+        }
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from client.models import ChatMessage, HealthReport
+from core.search import index_messages, index_reports
+
+
+class Command(BaseCommand):
+    help = "Index existing chat messages and health reports for full-text search"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        messages = self._reindex(
+            ChatMessage.objects.select_related('session').only('id', 'message', 'created_at', 'session__user_id'),
+            index_messages,
+            chunk_size
+        )
+        reports = self._reindex(
+            HealthReport.objects.only('id', 'user_id', 'session_id', 'symptoms_reported', 'ai_analysis', 'generated_at'),
+            index_reports,
+            chunk_size
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {messages} chat messages and {reports} health reports"))
+
+    def _reindex(self, queryset, index, chunk_size):
+        last_id = 0
+        total = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not rows:
+                return total
+            index(rows)
+            last_id = rows[-1].id
+            total += len(rows)
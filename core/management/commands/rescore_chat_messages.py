@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ai.engine import get_engine
+from client.models import ChatMessage
+
+
+class Command(BaseCommand):
+    help = "Re-score historical user chat messages with the current AI model, in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Messages scored per batch")
+        parser.add_argument('--language', default='pidgin', help="Language used for symptom extraction")
+        parser.add_argument('--since-id', type=int, default=0, help="Only re-score messages with a larger id")
+        parser.add_argument('--output', help="Write JSON lines to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        language = options['language']
+        engine = get_engine()
+
+        out = open(options['output'], 'w', encoding='utf-8') if options['output'] else self.stdout
+        queryset = ChatMessage.objects.filter(sender='user').order_by('id')
+
+        # Keyset pagination on id: each chunk is one indexed range query and
+        # only chunk_size rows are held in memory at a time.
+        last_id = options['since_id']
+        total = 0
+        try:
+            while True:
+                rows = list(
+                    queryset.filter(id__gt=last_id).values_list('id', 'session_id', 'message')[:chunk_size]
+                )
+                if not rows:
+                    break
+
+                results = engine.generate_response_batch([message for _, _, message in rows], language)
+                for (message_id, session_id, _), result in zip(rows, results):
+                    out.write(json.dumps({
+                        'message_id': message_id,
+                        'session_id': session_id,
+                        'symptoms_detected': result['symptoms_detected'],
+                        'diagnosis': [
+                            {'disease': d['disease'], 'confidence': d['confidence']}
+                            for d in result['diagnosis']
+                        ],
+                        'is_emergency': result['is_emergency'],
+                    }, ensure_ascii=False) + '\n')
+
+                last_id = rows[-1][0]
+                total += len(rows)
+        finally:
+            if out is not self.stdout:
+                out.close()
+
+        self.stderr.write(self.style.SUCCESS(f"Re-scored {total} messages (last id {last_id})"))
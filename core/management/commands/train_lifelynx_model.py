@@ -0,0 +1,137 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from ai.artifact import ARTIFACT_ROOT, export_hashing_nb, read_artifact
+from ai.chatbot_simple import LifelynxAISimple
+from client.models import ChatMessage, HealthReport
+
+CHECKPOINT_VERSION = 'checkpoint'
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the chatbot model from HealthReport/ChatMessage data, streaming rows in chunks "
+        "through HashingVectorizer + MultinomialNB.partial_fit. Labels are the first disease "
+        "named in each report's ai_analysis, which the chatbot itself writes, so unless reports "
+        "are reviewed or written by clinicians this reinforces the model's own diagnoses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Reports per training step")
+        parser.add_argument('--checkpoint-every', type=int, default=10, help="Write a checkpoint every N chunks")
+        parser.add_argument('--n-features', type=int, default=2 ** 16, help="Hashing space size")
+        parser.add_argument('--alpha', type=float, default=0.1, help="MultinomialNB smoothing")
+        parser.add_argument('--output', default=ARTIFACT_ROOT, help="Artifact root directory")
+        parser.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        root = options['output']
+
+        # Only the knowledge base is needed here; don't load or train a model
+        knowledge = LifelynxAISimple.__new__(LifelynxAISimple)
+        disease_data = knowledge._load_disease_data()
+        classes = np.array(sorted(disease_data), dtype=str)
+        label_re = re.compile(
+            r'\b(' + '|'.join(re.escape(d) for d in sorted(disease_data, key=len, reverse=True)) + r')\b',
+            re.IGNORECASE
+        )
+
+        vectorizer = HashingVectorizer(
+            n_features=options['n_features'],
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=False,
+            norm='l2'
+        )
+
+        if options['resume']:
+            classifier, last_id = self._resume(root, vectorizer, classes, options['alpha'])
+        else:
+            classifier = MultinomialNB(alpha=options['alpha'])
+            # Seed with the built-in examples so every class has data
+            texts, labels = knowledge._create_training_data()
+            classifier.partial_fit(vectorizer.transform(texts), labels, classes=classes)
+            last_id = 0
+
+        chunks = 0
+        trained = 0
+        while True:
+            # Keyset pagination on id keeps every query and every chunk bounded
+            reports = list(
+                HealthReport.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'session_id', 'symptoms_reported', 'ai_analysis')[:chunk_size]
+            )
+            if not reports:
+                break
+            last_id = reports[-1][0]
+
+            texts, labels = self._labelled_texts(reports, label_re)
+            if texts:
+                classifier.partial_fit(vectorizer.transform(texts), labels)
+                trained += len(texts)
+
+            chunks += 1
+            if chunks % options['checkpoint_every'] == 0:
+                export_hashing_nb(
+                    vectorizer, classifier, root, publish=False, version=CHECKPOINT_VERSION,
+                    extra_meta={'last_report_id': last_id}
+                )
+                self.stdout.write(f"Checkpoint at report {last_id} ({trained} examples)")
+
+        # Publishing swaps the CURRENT pointer atomically; running workers
+        # pick the new version up on their next file check.
+        directory = export_hashing_nb(vectorizer, classifier, root, extra_meta={'last_report_id': last_id})
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained on {trained} labelled reports; published {directory}"
+        ))
+
+    def _labelled_texts(self, reports, label_re):
+        """Build (text, label) pairs for a chunk with one ChatMessage query"""
+        session_ids = {session_id for _, session_id, _, _ in reports}
+        messages = defaultdict(list)
+        for session_id, message in (
+            ChatMessage.objects.filter(session_id__in=session_ids, sender='user')
+            .order_by('session_id', 'id').values_list('session_id', 'message')
+        ):
+            messages[session_id].append(message)
+
+        texts, labels = [], []
+        for _, session_id, symptoms_reported, ai_analysis in reports:
+            # The label is the first known disease named in the AI analysis
+            match = label_re.search(ai_analysis or '')
+            if not match:
+                continue
+            text = ' '.join(messages.get(session_id, []) + [symptoms_reported or '']).strip()
+            if text:
+                texts.append(text)
+                labels.append(match.group(1).lower())
+        return texts, labels
+
+    def _resume(self, root, vectorizer, classes, alpha):
+        try:
+            meta, arrays = read_artifact(root, CHECKPOINT_VERSION)
+        except Exception as e:
+            raise CommandError(f"No checkpoint to resume from: {e}")
+
+        if meta.get('kind') != 'hashing' or meta['n_features'] != vectorizer.n_features:
+            raise CommandError("Checkpoint was trained with a different vectorizer")
+        if list(arrays['classes']) != list(classes):
+            raise CommandError("Checkpoint classes don't match the knowledge base")
+
+        classifier = MultinomialNB(alpha=alpha)
+        classifier.classes_ = np.array(arrays['classes'])
+        classifier.feature_count_ = np.array(arrays['feature_count'])
+        classifier.class_count_ = np.array(arrays['class_count'])
+        classifier.n_features_in_ = vectorizer.n_features
+        # Derive the log probabilities from the counts, as partial_fit does,
+        # so the model can be exported even if there's nothing new to learn
+        classifier._update_feature_log_prob(alpha)
+        classifier._update_class_log_prior()
+        self.stdout.write(f"Resuming after report {meta['last_report_id']}")
+        return classifier, meta['last_report_id']
@@ -0,0 +1,44 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    """The active user an access token belongs to, or AnonymousUser.
+
+    Mirrors JWTAuthentication: tokens of unverified or disabled accounts
+    don't authenticate.
+    """
+    try:
+        token = AccessToken(raw_token)
+        user = User.objects.get(pk=token['user_id'])
+    except (TokenError, KeyError, User.DoesNotExist):
+        return AnonymousUser()
+    if not user.is_active:
+        return AnonymousUser()
+    return user
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticate WebSocket connections with the same access tokens as the API,
+    passed as ?token=<access> or an 'Authorization: Bearer <access>' header.
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+        if not token:
+            headers = dict(scope.get('headers', []))
+            auth = headers.get(b'authorization', b'').decode()
+            if auth.startswith('Bearer '):
+                token = auth[len('Bearer '):]
+
+        scope['user'] = await get_user_for_token(token) if token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,104 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        body,
+        content='core_searchdocument',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_au AFTER UPDATE OF body ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_au",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ai",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+
+# 'simple' configuration: transcripts mix English, Pidgin, Yoruba, Igbo and
+# Hausa, so language-specific stemming would do more harm than good.
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_searchdocument
+    ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED
+    """,
+    "CREATE INDEX core_searchdocument_vector ON core_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_searchdocument_vector",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_appointment'),
+        ('client', '0005_chatsessionarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('chat_message', 'Chat message'), ('health_report', 'Health report')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='client.chatsession')),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+                'indexes': [models.Index(fields=['owner', '-created_at'], name='searchdoc_owner_recent')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
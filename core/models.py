@@ -64,3 +64,31 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"Notification to {self.recipient.full_name}: {self.title}"
+
+class SearchDocument(models.Model):
+    """
+    Searchable copy of a chat message or health report. The full-text
+    index itself (FTS5 table on SQLite, tsvector column on PostgreSQL)
+    is created in the migration and maintained by the database.
+    """
+
+    KIND_CHOICES = [
+        ('chat_message', 'Chat message'),
+        ('health_report', 'Health report'),
+    ]
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_documents')
+    session = models.ForeignKey('client.ChatSession', on_delete=models.CASCADE, null=True, blank=True, related_name='search_documents')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    body = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        indexes = [
+            models.Index(fields=['owner', '-created_at'], name='searchdoc_owner_recent'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
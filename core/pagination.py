@@ -1,6 +1,91 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+from datetime import datetime
+from functools import partial
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
+
+class PrecountedPaginator(Paginator):
+    """Django paginator that uses a count it's given instead of running COUNT(*)"""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.__dict__['count'] = count
+
+class PrecountedResultsSetPagination(StandardResultsSetPagination):
+    """StandardResultsSetPagination for callers that already keep a row count"""
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        self.django_paginator_class = partial(PrecountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+def encode_cursor(created_at, pk):
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{pk}".encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeError):
+        raise ValidationError({'before': 'Invalid cursor.'})
+
+def message_window(messages, limit, before=None):
+    """
+    Latest `limit` rows older than the `before` cursor, walking
+    (created_at, id) backwards so every page is one indexed range scan.
+    `messages` is a queryset, or a list for archived sessions.
+    Returns (rows oldest-first, cursor for the next older page or None).
+    """
+    if isinstance(messages, list):
+        rows = sorted(messages, key=lambda m: (m.created_at, m.id), reverse=True)
+        if before:
+            position = decode_cursor(before)
+            rows = [m for m in rows if (m.created_at, m.id) < position]
+        rows = rows[:limit + 1]
+    else:
+        queryset = messages
+        if before:
+            created_at, pk = decode_cursor(before)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        rows = list(queryset.order_by('-created_at', '-id')[:limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more and rows else None
+    rows.reverse()
+    return rows, cursor
+
+class MessageKeysetPagination(BasePagination):
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    cursor_query_param = 'before'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows, self.next_cursor = message_window(
+            queryset,
+            self.get_page_size(request),
+            request.query_params.get(self.cursor_query_param)
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next_cursor': self.next_cursor,
+            'results': data
+        })
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.conf import settings
+
+from ai.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+Decision = namedtuple('Decision', ['allowed', 'retry_after'])
+
+
+def _take(bucket, capacity, refill_per_second, now, cost):
+    """Refill a (tokens, updated_at) bucket up to now and try to take cost tokens.
+
+    Returns (new bucket, Decision).
+    """
+    if bucket is None:
+        tokens = float(capacity)
+    else:
+        tokens, updated_at = bucket
+        tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+
+    if tokens >= cost:
+        return (tokens - cost, now), Decision(True, 0)
+
+    wait = (cost - tokens) / refill_per_second if refill_per_second else None
+    return (tokens, now), Decision(False, wait)
+
+
+class LocalBucketStore:
+    """Token buckets in a bounded in-process LRU. Each worker limits on its own."""
+
+    def __init__(self, max_entries=10000):
+        self.buckets = LRUCache(max_entries)
+        self.notices = LRUCache(max_entries)
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_per_second, cost=1):
+        with self._lock:
+            bucket, decision = _take(self.buckets.get(key), capacity, refill_per_second, time.time(), cost)
+            self.buckets.set(key, bucket)
+        return decision
+
+    def notify_once(self, key, ttl):
+        """True the first time key is asked for within ttl seconds"""
+        return self.notices.add(key, True, ttl)
+
+
+class CacheBucketStore:
+    """Token buckets in a Django cache alias shared between workers.
+
+    The read-modify-write isn't atomic, so concurrent requests for the same
+    key on different workers can each spend the same token. That makes the
+    limit approximate under races, never stricter than configured. If the
+    cache is down requests are allowed through.
+    """
+
+    def __init__(self, alias, key_prefix='lifelynx:rl:'):
+        self.alias = alias
+        self.key_prefix = key_prefix
+
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def consume(self, key, capacity, refill_per_second, cost=1):
+        cache_key = self.key_prefix + key
+        try:
+            cache = self._cache()
+            bucket, decision = _take(cache.get(cache_key), capacity, refill_per_second, time.time(), cost)
+            # Keep the bucket only as long as it takes to refill completely
+            ttl = int(capacity / refill_per_second) + 1 if refill_per_second else None
+            cache.set(cache_key, bucket, ttl)
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable: {e}")
+            return Decision(True, 0)
+        return decision
+
+    def notify_once(self, key, ttl):
+        """True the first time key is asked for within ttl seconds, on any worker"""
+        try:
+            return self._cache().add(self.key_prefix + 'notice:' + key, True, ttl)
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable: {e}")
+            return True
+
+
+class RateLimiter:
+    """Per-sender token buckets with one (burst, refill) rule per scope.
+
+    Scopes are the AI endpoints named in LIFELYNX_RATE_LIMITS['RULES'];
+    scopes without a rule are never limited. Allowed and shed requests are
+    counted per scope.
+    """
+
+    def __init__(self, store, rules, enabled=True):
+        self.store = store
+        self.rules = rules
+        self.enabled = enabled
+        self.allowed = Counter()
+        self.shed = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, scope, identity):
+        rule = self.rules.get(scope)
+        if not self.enabled or rule is None or identity is None:
+            return Decision(True, 0)
+
+        decision = self.store.consume(
+            f"{scope}:{identity}",
+            rule['BURST'],
+            rule['REFILL_PER_MINUTE'] / 60.0
+        )
+        with self._lock:
+            if decision.allowed:
+                self.allowed[scope] += 1
+            else:
+                self.shed[scope] += 1
+        if not decision.allowed:
+            logger.info(f"Rate limited {scope} for {identity}")
+        return decision
+
+    def first_denial(self, scope, identity, decision):
+        """Whether this denial is the first one for identity since it was
+        last told to slow down. Channels that can't show an error inline
+        (WhatsApp) send one notice per retry window and drop the rest."""
+        return self.store.notify_once(f"{scope}:{identity}", retry_after_seconds(decision))
+
+    def stats(self):
+        with self._lock:
+            return {
+                scope: {'allowed': self.allowed[scope], 'shed': self.shed[scope]}
+                for scope in sorted(set(self.rules) | set(self.allowed) | set(self.shed))
+            }
+
+
+def build_rate_limiter():
+    """Build the limiter from the LIFELYNX_RATE_LIMITS setting"""
+    options = getattr(settings, 'LIFELYNX_RATE_LIMITS', {})
+    if options.get('SHARED_BACKEND'):
+        store = CacheBucketStore(options['SHARED_BACKEND'])
+    else:
+        store = LocalBucketStore(options.get('MAX_ENTRIES', 10000))
+    return RateLimiter(store, options.get('RULES', {}), options.get('ENABLED', True))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide RateLimiter"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = build_rate_limiter()
+        return _limiter
+
+
+def retry_after_seconds(decision):
+    """Whole seconds to put in a Retry-After header / reply"""
+    if decision.retry_after is None:
+        return 60
+    return max(1, int(decision.retry_after + 0.999))
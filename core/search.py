@@ -0,0 +1,152 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+TERM_RE = re.compile(r'\w+')
+
+FTS_TABLE = 'core_searchdocument_fts'
+
+
+def message_document(message, owner_id=None):
+    return SearchDocument(
+        owner_id=owner_id or message.session.user_id,
+        session_id=message.session_id,
+        kind='chat_message',
+        object_id=message.id,
+        body=message.message,
+        created_at=message.created_at
+    )
+
+
+def report_document(report):
+    body = '\n'.join(part for part in [report.symptoms_reported, report.ai_analysis] if part)
+    return SearchDocument(
+        owner_id=report.user_id,
+        session_id=report.session_id,
+        kind='health_report',
+        object_id=report.id,
+        body=body,
+        created_at=report.generated_at
+    )
+
+
+def index_documents(documents):
+    """
+    Insert or refresh search documents in one statement. The database
+    keeps the full-text index in step (FTS5 triggers / generated column).
+    """
+    documents = [doc for doc in documents if doc.object_id is not None]
+    if not documents:
+        return
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['owner', 'session', 'body', 'created_at']
+    )
+
+
+def index_messages(messages, owner_id=None):
+    index_documents([message_document(m, owner_id) for m in messages])
+
+
+def index_reports(reports):
+    index_documents([report_document(r) for r in reports])
+
+
+def unindex_message(message):
+    # Messages moved into a session archive stay searchable; only rows of
+    # sessions that aren't archived are really gone
+    SearchDocument.objects.filter(
+        kind='chat_message', object_id=message.id
+    ).exclude(session__is_archived=True).delete()
+
+
+def unindex_report(report):
+    SearchDocument.objects.filter(kind='health_report', object_id=report.id).delete()
+
+
+def search_terms(query):
+    return TERM_RE.findall((query or '').lower())
+
+
+def search(user, query, kind=None):
+    """
+    Rank the user's documents against `query`. Returns something the
+    standard paginators can slice and count: a queryset, or on SQLite a
+    lazy FTS5 result set. Every document carries a `rank` attribute where
+    higher is better.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return SearchDocument.objects.none()
+
+    if connection.vendor == 'sqlite':
+        return FTS5Results(user.id, terms, kind)
+
+    queryset = SearchDocument.objects.filter(owner=user)
+    if kind:
+        queryset = queryset.filter(kind=kind)
+
+    if connection.vendor == 'postgresql':
+        text = ' '.join(terms)
+        return queryset.filter(
+            RawSQL("search_vector @@ plainto_tsquery('simple', %s)", [text], output_field=BooleanField())
+        ).annotate(
+            rank=RawSQL("ts_rank(search_vector, plainto_tsquery('simple', %s))", [text], output_field=FloatField())
+        ).order_by('-rank', '-created_at')
+
+    # No full-text index on this backend
+    condition = Q()
+    for term in terms:
+        condition &= Q(body__icontains=term)
+    return queryset.filter(condition).annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).order_by('-created_at')
+
+
+class FTS5Results:
+    """Lazy, sliceable FTS5 match ordered by bm25, scoped to one owner"""
+
+    def __init__(self, owner_id, terms, kind=None):
+        # Quoting every term keeps user input out of the FTS5 query syntax
+        self.match = ' '.join(f'"{term}"' for term in terms)
+        self.where = f"{FTS_TABLE} MATCH %s AND d.owner_id = %s"
+        self.params = [self.match, owner_id]
+        if kind:
+            self.where += " AND d.kind = %s"
+            self.params.append(kind)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM {FTS_TABLE} JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid "
+                    f"WHERE {self.where}",
+                    self.params
+                )
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else self.count()
+        if stop <= start:
+            return []
+        # bm25() is lower-is-better; negate it so rank matches the other backends
+        return list(SearchDocument.objects.raw(
+            f"SELECT d.*, -bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} "
+            f"JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {self.where} ORDER BY rank DESC, d.created_at DESC LIMIT %s OFFSET %s",
+            self.params + [stop - start, start]
+        ))
@@ -2,7 +2,9 @@ from rest_framework import serializers
 from django.utils import timezone
 import datetime
 from client.models import ChatSession, ChatMessage
-from .models import Appointment, Notification
+from client.archive import session_messages
+from .models import Appointment, Notification, SearchDocument
+from .pagination import message_window
 
 class AppointmentSerializer(serializers.ModelSerializer):
     hospital_name = serializers.ReadOnlyField(source='hospital.name')
@@ -29,6 +31,20 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = ['id', 'title', 'message', 'is_read', 'created_at']
 
+class SearchResultSerializer(serializers.ModelSerializer):
+    SNIPPET_LENGTH = 200
+
+    snippet = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = ['id', 'kind', 'object_id', 'session', 'snippet', 'created_at', 'rank']
+
+    def get_snippet(self, obj):
+        body = obj.body
+        return body[:self.SNIPPET_LENGTH] + "..." if len(body) > self.SNIPPET_LENGTH else body
+
 class HospitalAppointmentSerializer(serializers.ModelSerializer):
     patient_name = serializers.ReadOnlyField(source='patient.full_name')
 
@@ -47,16 +63,34 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         model = ChatMessage
         fields = ['id', 'sender', 'message', 'created_at']
 
+def _message_count(obj):
+    # Annotated by the view when the denormalized counters are disabled
+    count = getattr(obj, 'annotated_message_count', None)
+    return obj.message_count if count is None else count
+
 class ChatSessionSerializer(serializers.ModelSerializer):
-    messages = ChatMessageSerializer(many=True, read_only=True)
     message_count = serializers.SerializerMethodField()
     
+    # Only the latest messages are embedded; older ones are paged through
+    # chat-sessions/{id}/messages/?before=<messages_cursor>
+    MESSAGE_WINDOW = 20
+    
     class Meta:
         model = ChatSession
-        fields = ['id', 'title', 'started_at', 'last_activity', 'is_active', 'messages', 'message_count']
+        fields = ['id', 'title', 'started_at', 'last_activity', 'is_active', 'message_count']
     
     def get_message_count(self, obj):
-        return obj.messages.count()
+        return _message_count(obj)
+    
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        if obj.pk is None:
+            data['messages'], data['messages_cursor'] = [], None
+            return data
+        messages, cursor = message_window(session_messages(obj), self.MESSAGE_WINDOW)
+        data['messages'] = ChatMessageSerializer(messages, many=True).data
+        data['messages_cursor'] = cursor
+        return data
 
 class ChatSessionListSerializer(serializers.ModelSerializer):
     last_message = serializers.SerializerMethodField()
@@ -67,8 +101,9 @@ class ChatSessionListSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'started_at', 'last_activity', 'is_active', 'last_message', 'message_count']
     
     def get_last_message(self, obj):
-        last_msg = obj.messages.last()
-        return last_msg.message if last_msg else None
+        if hasattr(obj, 'annotated_last_message'):
+            return obj.annotated_last_message
+        return obj.last_message_preview or None
     
     def get_message_count(self, obj):
-        return obj.messages.count()
\ No newline at end of file
+        return _message_count(obj)
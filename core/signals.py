@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from client.models import ChatMessage, HealthReport
+from .search import index_messages, index_reports, unindex_message, unindex_report
+
+
+# bulk_create paths (core.chat) index their rows explicitly
+@receiver(post_save, sender=ChatMessage)
+def index_chat_message(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_messages([instance])
+
+
+@receiver(post_save, sender=HealthReport)
+def index_health_report(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_reports([instance])
+
+
+@receiver(post_delete, sender=ChatMessage)
+def unindex_chat_message(sender, instance, **kwargs):
+    unindex_message(instance)
+
+
+@receiver(post_delete, sender=HealthReport)
+def unindex_health_report(sender, instance, **kwargs):
+    unindex_report(instance)
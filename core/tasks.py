@@ -0,0 +1,38 @@
+from celery import shared_task
+
+from ai.engine import get_engine
+from client.models import ChatMessage
+from .chat import build_user_context, generate_reply, save_ai_reply
+from .consumers import broadcast_reply
+from .serializers import ChatMessageSerializer
+
+
+@shared_task
+def run_chat_inference(user_message_id, language):
+    """Run the AI pipeline for a saved user message and write the AI reply"""
+    user_message = ChatMessage.objects.select_related('session').get(pk=user_message_id)
+    session_id, user_id = user_message.session_id, user_message.session.user_id
+
+    result = generate_reply(session_id, user_id, user_message.message, language)
+    ai_message = save_ai_reply(session_id, user_id, user_message.message, result)
+    ai_response = ChatMessageSerializer(ai_message).data
+
+    # Deliver to any WebSocket open on this session
+    broadcast_reply(session_id, ai_response, result)
+
+    return {
+        'user_id': user_id,
+        'session_id': session_id,
+        'ai_response': ai_response,
+        'health_data': result
+    }
+
+
+@shared_task
+def run_quick_chat_inference(user_id, message, language):
+    """Quick chat counterpart of run_chat_inference (no session)"""
+    result = get_engine().generate_response(message, language, build_user_context(user_id))
+    return {
+        'user_id': user_id,
+        'health_data': result
+    }
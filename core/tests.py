@@ -1,3 +1,788 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from ai.artifact import (
+    KEEP_VERSIONS, CompactNBModel, current_version, export_hashing_nb, export_pipeline,
+    load_artifact, murmurhash3_32, publish_version, read_artifact, write_artifact,
+)
+from ai.benchmark import percentile, summarize
+from ai.engine import EngineRegistry
+from ai.catalog import MESSAGES_DIR, MessageCatalog
+from ai.chatbot_simple import LifelynxAISimple
+from ai.matcher import PhraseAutomaton, SymptomMatcher, tokenize
+from ai.scoring import DiseaseScorer
+from ai.session_state import SHARED_LOCAL_TTL, SessionStateStore
+from client.archive import archive_session
+from client.models import ChatMessage, ChatSession, HealthReport
+from . import loadtest
+from .chat import record_chat_turn
+from .geo import (
+    equirectangular_many, haversine_distance, haversine_many, haversine_matrix, k_nearest, within_radius,
+)
+from .models import SearchDocument
+from .search import search
+from .middleware import JWTAuthMiddleware
+from .ratelimit import Decision, LocalBucketStore, RateLimiter
+from .routing import websocket_urlpatterns
+from .views import AsyncQuickChatView
+
+
+class ChatSocketAuthTests(TransactionTestCase):
+
+    def setUp(self):
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    async def connect(self, user, session):
+        token = str(AccessToken.for_user(user))
+        communicator = WebsocketCommunicator(self.application, f"/ws/chat/{session.id}/?token={token}")
+        return communicator, await communicator.connect()
+
+    async def test_active_user_connects(self):
+        user = await User.objects.acreate(email='a@example.com', full_name='A', phone_number='+2348000000002', is_active=True)
+        session = await ChatSession.objects.acreate(user=user)
+
+        communicator, (connected, _) = await self.connect(user, session)
+        self.assertTrue(connected)
+        await communicator.disconnect()
+
+    async def test_inactive_user_is_rejected(self):
+        user = await User.objects.acreate(email='b@example.com', full_name='B', phone_number='+2348000000003', is_active=False)
+        session = await ChatSession.objects.acreate(user=user)
+
+        communicator, (connected, code) = await self.connect(user, session)
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_rate_limited_sender_gets_a_rate_limited_frame(self):
+        user = await User.objects.acreate(email='c@example.com', full_name='C', phone_number='+2348000000004', is_active=True)
+        session = await ChatSession.objects.acreate(user=user)
+        limiter = mock.Mock()
+        limiter.check.return_value = Decision(False, 30)
+
+        communicator, _ = await self.connect(user, session)
+        with mock.patch('core.consumers.get_rate_limiter', return_value=limiter):
+            await communicator.send_json_to({'message': 'I get fever'})
+            frame = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(frame['type'], 'rate_limited')
+        self.assertEqual(frame['retry_after'], 30)
+        limiter.check.assert_called_once_with('send_message', user.id)
+        self.assertFalse(await ChatMessage.objects.filter(session=session).aexists())
+
+    async def test_invalid_token_is_rejected(self):
+        communicator = WebsocketCommunicator(self.application, "/ws/chat/1/?token=not-a-token")
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+
+def engine_result(symptoms=('fever',), diagnosis=None, is_emergency=False):
+    if diagnosis is None:
+        diagnosis = [{'disease': 'malaria', 'confidence': 0.8, 'emergency_level': 2, 'recommended_drugs': ['Coartem']}]
+    return {
+        'symptoms_detected': list(symptoms),
+        'session_symptoms': list(symptoms),
+        'diagnosis': diagnosis,
+        'response': 'Na malaria be this',
+        'is_emergency': is_emergency,
+    }
+
+
+class RecordChatTurnTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('turn@example.com', 'Turn User', '+2348000000010', is_active=True)
+        self.chat_session = ChatSession.objects.create(user=self.user)
+
+    def test_saves_messages_counters_and_report(self):
+        user_message, ai_message = record_chat_turn(self.chat_session.id, self.user.id, 'I get fever', engine_result())
+
+        self.assertEqual([user_message.sender, ai_message.sender], ['user', 'ai'])
+        self.chat_session.refresh_from_db()
+        self.assertEqual(self.chat_session.message_count, 2)
+        self.assertEqual(self.chat_session.title, 'I get fever')
+
+        report = HealthReport.objects.get(session=self.chat_session)
+        self.assertEqual(report.symptoms_reported, 'fever')
+        self.assertEqual(report.ai_analysis, 'malaria (80%)')
+        self.assertEqual(report.recommendations, 'Coartem')
+
+    def test_no_report_without_symptoms(self):
+        record_chat_turn(self.chat_session.id, self.user.id, 'hello', engine_result(symptoms=(), diagnosis=[]))
+        self.assertFalse(HealthReport.objects.exists())
+
+    def test_report_failure_keeps_the_turn(self):
+        with mock.patch.object(HealthReport.objects, 'create', side_effect=ValueError('boom')):
+            record_chat_turn(self.chat_session.id, self.user.id, 'I get fever', engine_result())
+
+        self.assertEqual(ChatMessage.objects.filter(session=self.chat_session).count(), 2)
+        self.assertFalse(HealthReport.objects.exists())
+
+
+@override_settings(ROOT_URLCONF=loadtest.URLConf(AsyncQuickChatView.as_view()), LIFELYNX_AI_ASYNC=False)
+class AsyncQuickChatViewTests(TransactionTestCase):
+
+    async def post(self, user, body):
+        return await AsyncClient().post(
+            '/bench/', body, content_type='application/json',
+            headers={'Authorization': f"Bearer {AccessToken.for_user(user)}"}
+        )
+
+    async def test_active_user_gets_a_diagnosis(self):
+        user = await User.objects.acreate(email='q@example.com', full_name='Q', phone_number='+2348000000020', is_active=True)
+        engine = mock.Mock()
+        engine.generate_response.return_value = engine_result()
+
+        with mock.patch('core.views.get_engine', return_value=engine):
+            response = await self.post(user, {'message': 'I get fever'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['diagnosis'][0]['disease'], 'malaria')
+        self.assertEqual(engine.generate_response.call_args.args[1], 'pidgin')
+
+    async def test_inactive_user_is_rejected(self):
+        user = await User.objects.acreate(email='r@example.com', full_name='R', phone_number='+2348000000021', is_active=False)
+        response = await self.post(user, {'message': 'I get fever'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_rate_limited_user_gets_429(self):
+        user = await User.objects.acreate(email='s@example.com', full_name='S', phone_number='+2348000000022', is_active=True)
+        limiter = mock.Mock()
+        limiter.check.return_value = Decision(False, 12.5)
+
+        with mock.patch('core.views.get_rate_limiter', return_value=limiter):
+            response = await self.post(user, {'message': 'I get fever'})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '13')
+
+
+class RateLimiterTests(TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(LocalBucketStore(), {'chat': {'BURST': 2, 'REFILL_PER_MINUTE': 60}})
+
+    def test_burst_then_shed(self):
+        with mock.patch('core.ratelimit.time.time', return_value=1000.0):
+            decisions = [self.limiter.check('chat', 1) for _ in range(3)]
+
+        self.assertEqual([d.allowed for d in decisions], [True, True, False])
+        self.assertAlmostEqual(decisions[2].retry_after, 1.0)
+        self.assertEqual(self.limiter.stats()['chat'], {'allowed': 2, 'shed': 1})
+
+    def test_tokens_refill_over_time(self):
+        with mock.patch('core.ratelimit.time.time', return_value=1000.0):
+            self.limiter.check('chat', 1)
+            self.limiter.check('chat', 1)
+        with mock.patch('core.ratelimit.time.time', return_value=1001.0):
+            self.assertTrue(self.limiter.check('chat', 1).allowed)
+            self.assertFalse(self.limiter.check('chat', 1).allowed)
+
+    def test_senders_and_unknown_scopes_are_independent(self):
+        with mock.patch('core.ratelimit.time.time', return_value=1000.0):
+            self.limiter.check('chat', 1)
+            self.limiter.check('chat', 1)
+            self.assertTrue(self.limiter.check('chat', 2).allowed)
+            self.assertTrue(all(self.limiter.check('other', 1).allowed for _ in range(10)))
+
+    def test_disabled_limiter_allows_everything(self):
+        self.limiter.enabled = False
+        self.assertTrue(all(self.limiter.check('chat', 1).allowed for _ in range(10)))
+
+    def test_one_notice_per_window(self):
+        decision = Decision(False, 30)
+        self.assertTrue(self.limiter.first_denial('chat', 1, decision))
+        self.assertFalse(self.limiter.first_denial('chat', 1, decision))
+        self.assertTrue(self.limiter.first_denial('chat', 2, decision))
+
+
+class EngineRegistryTests(TestCase):
+
+    def setUp(self):
+        fd, self.model_path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.model_path)
+        self.built = []
+
+    def factory(self):
+        engine = mock.Mock(result_cache=mock.Mock())
+        self.built.append(engine)
+        return engine
+
+    def registry(self, factory=None):
+        return EngineRegistry(factory=factory or self.factory, watch_paths=[self.model_path], check_interval=0)
+
+    def touch(self):
+        with open(self.model_path, 'a') as f:
+            f.write('x')
+
+    def test_builds_once_and_shares(self):
+        registry = self.registry()
+        self.assertIsNone(registry.current())
+        self.assertIs(registry.get(), registry.get())
+        self.assertEqual(len(self.built), 1)
+
+    def test_model_change_swaps_in_a_new_engine_with_its_own_cache(self):
+        registry = self.registry()
+        old = registry.get()
+        self.touch()
+        new = registry.get()
+
+        self.assertIsNot(new, old)
+        self.assertIsNot(new.result_cache, old.result_cache)
+        old.result_cache.clear_local.assert_not_called()
+
+    def test_failed_reload_keeps_the_previous_engine(self):
+        engines = [mock.Mock(), RuntimeError('bad model')]
+
+        def factory():
+            engine = engines.pop(0)
+            if isinstance(engine, Exception):
+                raise engine
+            return engine
+
+        registry = self.registry(factory)
+        old = registry.get()
+        self.touch()
+        self.assertIs(registry.get(), old)
+
+    @override_settings(LIFELYNX_AI_WARMUP=True)
+    def test_app_loading_does_not_warm_up(self):
+        # ready() has run for every app by now; warm-up is left to the entrypoints
+        from ai import engine
+        with mock.patch.object(engine, 'warm_up') as warm_up:
+            from django.apps import apps
+            apps.get_app_config('core').ready()
+        warm_up.assert_not_called()
+
+
+class SessionStateStoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_symptoms_accumulate_across_turns(self):
+        store = SessionStateStore()
+        store.update(1, engine_result(symptoms=('fever', 'headache')))
+        store.update(1, engine_result(symptoms=('headache', 'vomiting')))
+        store.update(1, engine_result(symptoms=()))
+
+        state = store.get(1)
+        self.assertEqual(state['symptoms'], ['fever', 'headache', 'vomiting'])
+        self.assertEqual(state['turns'], 2)
+        self.assertEqual(state['last_diagnosis'], [{'disease': 'malaria', 'confidence': 0.8}])
+        self.assertEqual(store.symptoms(2), [])
+
+    def test_local_copy_is_short_lived_with_a_shared_backend(self):
+        self.assertEqual(SessionStateStore(ttl=86400, shared_backend='default').local.ttl, SHARED_LOCAL_TTL)
+        self.assertEqual(SessionStateStore(ttl=86400).local.ttl, 86400)
+
+    def test_other_processes_writes_are_seen_once_the_local_copy_expires(self):
+        web = SessionStateStore(shared_backend='default')
+        worker = SessionStateStore(shared_backend='default')
+        web.update(1, engine_result(symptoms=('fever',)))
+        self.assertEqual(worker.symptoms(1), ['fever'])
+
+        web.update(1, engine_result(symptoms=('cough',)))
+        worker.local.clear()  # as if SHARED_LOCAL_TTL had passed
+        self.assertEqual(worker.symptoms(1), ['fever', 'cough'])
+
+
+class TrainModelCommandTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        user = User.objects.create_user('train@example.com', 'Train', '+2348000000030')
+        chat_session = ChatSession.objects.create(user=user)
+        ChatMessage.objects.create(session=chat_session, sender='user', message='body dey hot, I dey shiver')
+        HealthReport.objects.create(session=chat_session, user=user, symptoms_reported='fever, chills',
+                                    ai_analysis='malaria (80%)')
+
+    def train(self, *args):
+        call_command('train_lifelynx_model', '--output', self.root, '--checkpoint-every', '1',
+                     '--n-features', '1024', *args, stdout=io.StringIO())
+
+    def test_resume_with_nothing_new_publishes_the_checkpoint(self):
+        self.train()
+        meta, arrays = read_artifact(self.root, 'checkpoint')
+
+        self.train('--resume')
+        resumed_meta, resumed = read_artifact(self.root)
+
+        self.assertEqual(resumed_meta['last_report_id'], meta['last_report_id'])
+        self.assertTrue((resumed['feature_log_prob'] == arrays['feature_log_prob']).all())
+        model = CompactNBModel(resumed_meta, resumed)
+        self.assertIn(model.predict(['body dey hot'])[0], list(model.classes_))
+
+
+class PercentileTests(TestCase):
+
+    def test_nearest_rank(self):
+        values = list(range(100, 0, -1))
+        self.assertEqual([percentile(values, q) for q in (1, 50, 95, 99, 100)], [1, 50, 95, 99, 100])
+
+    def test_small_samples(self):
+        self.assertEqual(percentile([], 95), 0.0)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([1, 2, 3], 50), 2)
+
+    def test_summarize_reports_microseconds(self):
+        summary = summarize([1000 * i for i in range(1, 101)])
+        self.assertEqual((summary['p50_us'], summary['p95_us'], summary['p99_us']), (50.0, 95.0, 99.0))
+
+
+class AICacheStatsViewTests(TestCase):
+
+    def test_admin_only(self):
+        user = User.objects.create_user('plain@example.com', 'Plain', '+2348000000040', is_active=True)
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/ai-cache/').status_code, 403)
+
+    def test_reports_the_engine_cache_counters(self):
+        admin = User.objects.create_superuser('admin@example.com', 'Admin', '+2348000000041', password='x')
+        client = APIClient()
+        client.force_authenticate(admin)
+        stats = {'entries': 3, 'hits': 10, 'misses': 4, 'evictions': 1, 'shared_hits': 0, 'shared_misses': 0}
+
+        with mock.patch('core.views.cache_stats', return_value=stats):
+            response = client.get('/api/ai-cache/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), stats)
+
+
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('search@example.com', 'Search', '+2348000000050')
+        self.chat_session = ChatSession.objects.create(user=self.user)
+
+    def found(self, query):
+        return [(doc.kind, doc.object_id) for doc in search(self.user, query)]
+
+    def test_saved_messages_and_reports_are_searchable(self):
+        message = ChatMessage.objects.create(session=self.chat_session, sender='user', message='my belle dey pain me')
+        report = HealthReport.objects.create(session=self.chat_session, user=self.user, symptoms_reported='stomach pain')
+
+        self.assertEqual(self.found('belle'), [('chat_message', message.id)])
+        self.assertEqual(self.found('stomach'), [('health_report', report.id)])
+
+    def test_other_users_documents_are_not_found(self):
+        other = User.objects.create_user('other@example.com', 'Other', '+2348000000051')
+        ChatMessage.objects.create(session=ChatSession.objects.create(user=other), sender='user', message='malaria')
+        self.assertEqual(self.found('malaria'), [])
+
+    def test_deleted_content_is_unindexed(self):
+        message = ChatMessage.objects.create(session=self.chat_session, sender='user', message='fever since monday')
+        report = HealthReport.objects.create(session=self.chat_session, user=self.user, symptoms_reported='fever')
+
+        message.delete()
+        report.delete()
+
+        self.assertEqual(self.found('fever'), [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_archived_messages_stay_searchable(self):
+        message = ChatMessage.objects.create(session=self.chat_session, sender='user', message='typhoid test result')
+
+        archive_session(self.chat_session)
+
+        self.assertFalse(ChatMessage.objects.exists())
+        self.assertEqual(self.found('typhoid'), [('chat_message', message.id)])
+
+    def test_deleting_the_session_drops_its_documents(self):
+        ChatMessage.objects.create(session=self.chat_session, sender='user', message='cough')
+        self.chat_session.delete()
+        self.assertFalse(SearchDocument.objects.exists())
+
+
+class SymptomMatcherTests(TestCase):
+
+    SYMPTOMS = {
+        'fever': {'english': ['fever', 'hot body'], 'pidgin': ['body dey hot', 'hot']},
+        'headache': {'english': ['headache', 'head pain'], 'pidgin': ['head dey pain me']},
+        'pain': {'english': ['pain']},
+        'chills': {'english': ['o']},
+    }
+    FILLERS = {'english': ['please', 'i think'], 'pidgin': ['abeg', 'na']}
+
+    def setUp(self):
+        self.matcher = SymptomMatcher(self.SYMPTOMS, self.FILLERS)
+
+    def test_whole_words_only(self):
+        self.assertEqual(self.matcher.extract("My body is so feverish", 'english'), [])
+        self.assertEqual(self.matcher.extract("o, my body", 'english'), ['chills'])
+
+    def test_overlapping_phrases_all_match(self):
+        text = "I have head pain"
+        self.assertEqual(
+            self.matcher.match(text, 'english'),
+            [('headache', 7, 16), ('pain', 12, 16)]
+        )
+        self.assertEqual(self.matcher.extract(text, 'english'), ['headache', 'pain'])
+
+    def test_language_falls_back_to_default_keywords(self):
+        # 'pain' has no pidgin keywords, so the english ones apply
+        self.assertEqual(self.matcher.extract("Abeg my body dey hot, pain everywhere", 'pidgin'), ['fever', 'pain'])
+        self.assertEqual(self.matcher.extract("headache", 'hausa'), ['headache'])
+
+    def test_strip_fillers_on_word_boundaries(self):
+        self.assertEqual(self.matcher.strip_fillers("abeg na fever", 'pidgin').split(), ['fever'])
+        self.assertEqual(self.matcher.strip_fillers("banana", 'pidgin'), "banana")
+        self.assertEqual(self.matcher.strip_fillers("please help", 'yoruba'), "please help")
+
+    def test_scan_matches_brute_force(self):
+        import random
+        rng = random.Random(7)
+        vocabulary = ['a', 'b', 'c', 'd']
+        phrases = {' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))) for _ in range(12)}
+        automaton = PhraseAutomaton((phrase, phrase) for phrase in phrases)
+
+        for _ in range(50):
+            tokens = tokenize(' '.join(rng.choices(vocabulary, k=rng.randint(0, 12))))
+            words = [token for token, _, _ in tokens]
+            expected = set()
+            for phrase in phrases:
+                target = phrase.split()
+                for i in range(len(words) - len(target) + 1):
+                    if words[i:i + len(target)] == target:
+                        expected.add((phrase, tokens[i][1], tokens[i + len(target) - 1][2]))
+            self.assertEqual(set(automaton.scan(tokens)), expected)
+
+
+def rule_engine_scores(disease_data, symptoms):
+    """The original per-disease set loop DiseaseScorer replaces"""
+    found = []
+    for disease, data in disease_data.items():
+        matches = len(set(symptoms) & set(data['symptoms']))
+        confidence = matches / len(data['symptoms'])
+        key_matches = len(set(symptoms) & set(data['symptoms'][:3]))
+        if key_matches > 0:
+            confidence += 0.3
+        if confidence > 0.3 and (matches >= 2 or key_matches > 0):
+            found.append((disease, min(round(confidence, 2), 0.95), data['emergency_level']))
+    found.sort(key=lambda x: (x[1], -x[2]), reverse=True)
+    return [(disease, confidence) for disease, confidence, _ in found]
+
+
+class DiseaseScorerTests(TestCase):
+
+    def setUp(self):
+        knowledge = LifelynxAISimple.__new__(LifelynxAISimple)
+        self.disease_data = knowledge._load_disease_data()
+        self.scorer = DiseaseScorer(self.disease_data)
+        self.symptoms = sorted({s for data in self.disease_data.values() for s in data['symptoms']})
+
+    def test_matches_the_rule_engine(self):
+        import random
+        rng = random.Random(3)
+        cases = [[s] for s in self.symptoms] + [rng.sample(self.symptoms, rng.randint(2, 6)) for _ in range(300)]
+        for symptoms in cases:
+            self.assertEqual(self.scorer.score(symptoms), rule_engine_scores(self.disease_data, symptoms), symptoms)
+
+    def test_top_k_is_a_prefix(self):
+        import random
+        rng = random.Random(5)
+        for _ in range(100):
+            symptoms = rng.sample(self.symptoms, rng.randint(1, 6))
+            full = self.scorer.score(symptoms)
+            for k in range(1, 4):
+                self.assertEqual(self.scorer.score(symptoms, top_k=k), full[:k])
+
+    def test_unknown_symptoms_score_nothing(self):
+        self.assertEqual(self.scorer.score([]), [])
+        self.assertEqual(self.scorer.score(['itchy elbow']), [])
+
+
+class CompactNBModelTests(TestCase):
+    """The artifact scorer must agree with the sklearn model it was exported from"""
+
+    TEXTS = [
+        'body dey hot and my head dey pain me',
+        'I have fever, chills and joint pain',
+        'belle dey run and I dey vomit',
+        'cough cough chest pain',
+        'nothing matches this at all',
+        '',
+    ]
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        knowledge = LifelynxAISimple.__new__(LifelynxAISimple)
+        self.texts, self.labels = knowledge._create_training_data()
+
+    def assert_same_predictions(self, model, predict, predict_proba):
+        import numpy as np
+        self.assertTrue(np.allclose(model.predict_proba(self.TEXTS), predict_proba(self.TEXTS)))
+        self.assertEqual(list(model.predict(self.TEXTS)), list(predict(self.TEXTS)))
+
+    def test_tfidf_pipeline_parity(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import Pipeline
+
+        pipeline = Pipeline([
+            ('tfidf', TfidfVectorizer(ngram_range=(1, 2), stop_words='english', sublinear_tf=True)),
+            ('classifier', MultinomialNB(alpha=0.1)),
+        ]).fit(self.texts, self.labels)
+        export_pipeline(pipeline, self.root)
+
+        self.assert_same_predictions(load_artifact(self.root), pipeline.predict, pipeline.predict_proba)
+
+    def test_hashing_parity(self):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+
+        vectorizer = HashingVectorizer(n_features=2 ** 12, ngram_range=(1, 2), stop_words='english',
+                                       alternate_sign=False, norm='l2')
+        classifier = MultinomialNB(alpha=0.1).fit(vectorizer.transform(self.texts), self.labels)
+        export_hashing_nb(vectorizer, classifier, self.root)
+
+        self.assert_same_predictions(
+            load_artifact(self.root),
+            lambda texts: classifier.predict(vectorizer.transform(texts)),
+            lambda texts: classifier.predict_proba(vectorizer.transform(texts))
+        )
+
+    def test_murmurhash_matches_sklearn(self):
+        from sklearn.utils import murmurhash3_32 as sklearn_murmurhash
+
+        for text in ['', 'a', 'ab', 'abc', 'fever', 'head dey pain me', 'ọ̀fọ́ àìsàn', 'x' * 101]:
+            self.assertEqual(murmurhash3_32(text.encode('utf-8')), sklearn_murmurhash(text, positive=False))
+
+    def test_publish_swaps_current_and_prunes(self):
+        import numpy as np
+        versions = [f'v{i}' for i in range(KEEP_VERSIONS + 2)]
+        for age, version in enumerate(versions):
+            write_artifact({'classes': np.array(['a'])}, {}, self.root, publish=False, version=version)
+            # Pruning goes by modification time
+            os.utime(os.path.join(self.root, version), (1000 + age, 1000 + age))
+            publish_version(version, self.root)
+
+        self.assertEqual(current_version(self.root), versions[-1])
+        kept = sorted(entry for entry in os.listdir(self.root) if entry.startswith('v'))
+        self.assertEqual(kept, versions[-KEEP_VERSIONS:])
+
+
+class MessagePaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('pages@example.com', 'Pages', '+2348000000050', is_active=True)
+        self.chat_session = ChatSession.objects.create(user=self.user)
+        for i in range(25):
+            ChatMessage.objects.create(session=self.chat_session, sender='user', message=f'message {i}')
+        # Several rows sharing a timestamp must still page without gaps or repeats
+        tied = ChatMessage.objects.filter(session=self.chat_session).order_by('id')[5:10]
+        ChatMessage.objects.filter(id__in=[m.id for m in tied]).update(created_at=tied[0].created_at)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, limit):
+        pages = []
+        params = {'limit': limit}
+        while True:
+            response = self.client.get(f'/api/chat-sessions/{self.chat_session.id}/messages/', params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([m['message'] for m in response.json()['results']])
+            cursor = response.json()['next_cursor']
+            if cursor is None:
+                return pages
+            params['before'] = cursor
+
+    def expected(self):
+        return [
+            m.message for m in ChatMessage.objects.filter(session=self.chat_session).order_by('created_at', 'id')
+        ]
+
+    def test_pages_cover_every_message_once(self):
+        expected = self.expected()
+        pages = self.walk(7)
+
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 4])
+        # Each page is oldest-first; pages go backwards in time
+        self.assertEqual([m for page in reversed(pages) for m in page], expected)
+
+    def test_archived_session_pages_the_same(self):
+        expected = self.expected()
+        archive_session(self.chat_session)
+        ChatMessage.objects.create(session=self.chat_session, sender='ai', message='after archiving')
+
+        pages = self.walk(6)
+
+        self.assertEqual([m for page in reversed(pages) for m in page], expected + ['after archiving'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'/api/chat-sessions/{self.chat_session.id}/messages/', {'before': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+
+
+class GeoTests(TestCase):
+
+    def setUp(self):
+        import random
+        rng = random.Random(11)
+        self.origin = (6.5244, 3.3792)
+        # Scattered over a few degrees around Lagos, plus both sides of the antimeridian
+        self.points = [(6.5244 + rng.uniform(-3, 3), 3.3792 + rng.uniform(-3, 3)) for _ in range(200)]
+        self.points += [(0.0, 179.9), (0.0, -179.9)]
+
+    def test_vectorized_distances_match_scalar(self):
+        import numpy as np
+        expected = [haversine_distance(*self.origin, lat, lon) for lat, lon in self.points]
+        self.assertTrue(np.allclose(haversine_many(self.origin, self.points), expected))
+        matrix = haversine_matrix([self.origin, self.points[0]], self.points)
+        self.assertEqual(matrix.shape, (2, len(self.points)))
+        self.assertTrue(np.allclose(matrix[0], expected))
+
+    def test_known_distance(self):
+        # Lagos to Abuja is about 525 km as the crow flies
+        self.assertAlmostEqual(haversine_distance(6.5244, 3.3792, 9.0765, 7.3986), 525, delta=5)
+
+    def test_equirectangular_wraps_the_antimeridian(self):
+        distance, = equirectangular_many((0.0, 179.9), [(0.0, -179.9)])
+        self.assertAlmostEqual(distance, haversine_distance(0.0, 179.9, 0.0, -179.9), delta=0.1)
+
+    def test_within_radius_matches_brute_force(self):
+        for radius_km in [0, 50, 150, 400]:
+            expected = sorted(
+                (haversine_distance(*self.origin, lat, lon), i) for i, (lat, lon) in enumerate(self.points)
+                if haversine_distance(*self.origin, lat, lon) <= radius_km
+            )
+            indices, distances = within_radius(self.origin, self.points, radius_km)
+            self.assertEqual(list(indices), [i for _, i in expected])
+
+    def test_k_nearest_matches_brute_force(self):
+        ranked = sorted(range(len(self.points)), key=lambda i: haversine_distance(*self.origin, *self.points[i]))
+        for k in [1, 5, len(self.points), len(self.points) + 10]:
+            indices, distances = k_nearest(self.origin, self.points, k)
+            self.assertEqual(list(indices), ranked[:k])
+            self.assertTrue((distances[:-1] <= distances[1:]).all())
+        indices, _ = k_nearest(self.origin, self.points, 3, radius_km=100)
+        self.assertEqual(list(indices), [i for i in ranked[:3]
+                                         if haversine_distance(*self.origin, *self.points[i]) <= 100])
+
+    def test_no_points(self):
+        self.assertEqual(len(k_nearest(self.origin, [], 3)[0]), 0)
+        self.assertEqual(len(within_radius(self.origin, [], 10)[0]), 0)
+
+
+@override_settings(LIFELYNX_AI_ASYNC=True)
+class ChatTaskModeTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('tasks@example.com', 'Tasks', '+2348000000060', is_active=True)
+        self.chat_session = ChatSession.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/chat-sessions/{self.chat_session.id}/send_message/'
+
+    def test_enqueue_only_with_the_memory_broker(self):
+        with loadtest.memory_broker():
+            response = self.client.post(self.url, {'message': 'I get fever'}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()['task_id'])
+        # Nobody consumes the in-memory queue, so only the user message exists
+        self.assertEqual(list(ChatMessage.objects.values_list('sender', flat=True)), ['user'])
+
+    def test_eager_task_writes_the_reply(self):
+        engine = mock.Mock()
+        engine.generate_response.return_value = engine_result()
+
+        with loadtest.eager_tasks(), mock.patch('core.chat.get_engine', return_value=engine):
+            response = self.client.post(self.url, {'message': 'I get fever'}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            list(ChatMessage.objects.order_by('id').values_list('sender', 'message')),
+            [('user', 'I get fever'), ('ai', 'Na malaria be this')]
+        )
+        self.assertTrue(HealthReport.objects.filter(session=self.chat_session).exists())
+
+    def test_status_only_shows_the_owners_result(self):
+        task = mock.Mock()
+        task.failed.return_value = False
+        task.successful.return_value = True
+        task.result = {'user_id': self.user.id, 'health_data': engine_result()}
+        other = User.objects.create_user('other@example.com', 'Other', '+2348000000061', is_active=True)
+
+        with mock.patch('core.views.AsyncResult', return_value=task):
+            own = self.client.get('/api/chat-tasks/abc/')
+            self.client.force_authenticate(other)
+            foreign = self.client.get('/api/chat-tasks/abc/')
+
+        self.assertEqual(own.json()['status'], 'completed')
+        self.assertEqual(foreign.status_code, 404)
+
+
+class MessageCatalogTests(TestCase):
+
+    def setUp(self):
+        self.catalog = MessageCatalog()
+
+    def test_every_language_has_every_message_with_the_same_fields(self):
+        import json
+        import string
+
+        def fields(template):
+            return {field for _, field, _, _ in string.Formatter().parse(template) if field is not None}
+
+        def load(language):
+            with open(os.path.join(MESSAGES_DIR, f'{language}.json'), encoding='utf-8') as f:
+                return json.load(f)
+
+        english = load('english')
+        for language in self.catalog.languages():
+            messages = load(language)
+            self.assertEqual(set(messages), set(english), language)
+            for key, template in messages.items():
+                self.assertEqual(fields(template), fields(english[key]), f'{language}: {key}')
+
+    def test_unknown_languages_fall_back(self):
+        english = self.catalog.render('rate_limited', 'english', seconds=3)
+        self.assertIn('3', english)
+        self.assertEqual(self.catalog.render('rate_limited', 'klingon', seconds=3), english)
+        self.assertEqual(self.catalog.render('rate_limited', '../english', seconds=3), english)
+        self.assertEqual(
+            self.catalog.render('rate_limited', 'klingon', fallback='pidgin', seconds=3),
+            self.catalog.render('rate_limited', 'pidgin', seconds=3)
+        )
+
+    def test_unknown_key(self):
+        with self.assertRaises(KeyError):
+            self.catalog.render('no_such_message', 'english')
+
+
+class RescoreCommandTests(TestCase):
+
+    def test_stdout_is_only_json_lines(self):
+        user = User.objects.create_user('rescore@example.com', 'Rescore', '+2348000000070')
+        chat_session = ChatSession.objects.create(user=user)
+        for text in ['body dey hot and head dey pain me', 'I dey cough well well']:
+            ChatMessage.objects.create(session=chat_session, sender='user', message=text)
+
+        # Anything the engine prints while it's built would land here too
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            call_command('rescore_chat_messages', '--language', 'english', stderr=io.StringIO())
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertIn('fever', rows[0]['symptoms_detected'])
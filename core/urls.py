@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import *
@@ -6,7 +7,14 @@ router = DefaultRouter()
 
 router.register(r'chat-sessions', ChatSessionViewSet, basename='chatsession')
 
+quick_chat_view = AsyncQuickChatView if settings.LIFELYNX_ASYNC_VIEWS else QuickChatView
+
 urlpatterns = [
     path('notifications/', NotificationListView.as_view(), name='notifications'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('quick-chat/', quick_chat_view.as_view(), name='quick_chat'),
+    path('rate-limits/', RateLimitStatsView.as_view(), name='rate_limit_stats'),
+    path('ai-cache/', AICacheStatsView.as_view(), name='ai_cache_stats'),
+    path('chat-tasks/<str:task_id>/', ChatTaskStatusView.as_view(), name='chat_task_status'),
     path('', include(router.urls)),
 ]
@@ -1,6 +1,9 @@
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
-import math
+# haversine_distance moved to core.geo; still importable from here
+from .geo import haversine_distance
+
+__all__ = ['geocode_address', 'haversine_distance']
 
 def geocode_address(address, city, state):
     if not address or not city or not state:
@@ -17,13 +20,3 @@ def geocode_address(address, city, state):
         pass
 
     return None, None
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-
-    dlat = lat2 - lat1 
-    dlon = lon2 - lon1 
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a)) 
-    r = 6371
-    return c * r
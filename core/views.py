@@ -1,21 +1,61 @@
 from .models import Notification
 from .serializers import NotificationSerializer
-from .pagination import StandardResultsSetPagination
+from .pagination import StandardResultsSetPagination, MessageKeysetPagination
 from rest_framework import viewsets, status, generics, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.urls import reverse
+from celery.result import AsyncResult
 from .models import *
 from .serializers import *
-from ai.chatbot_simple import LifelynxAISimple
+from .chat import build_user_context, generate_reply, record_chat_turn
+from .tasks import run_chat_inference, run_quick_chat_inference
+from .search import search
+from .ratelimit import get_rate_limiter, retry_after_seconds
+from ai.catalog import render
+from ai.engine import cache_stats, get_engine
+from ai.executor import run_inference
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from .middleware import get_user_for_token
+import json
 import logging
-from client.models import HealthProfile
+from client.archive import session_messages
 
 logger = logging.getLogger(__name__)
 
+def rate_limited_response(scope, user, language):
+    """429 with a localized "slow down" reply when the user is over their limit, else None"""
+    decision = get_rate_limiter().check(scope, user.id)
+    if decision.allowed:
+        return None
+    seconds = retry_after_seconds(decision)
+    return Response(
+        {'error': render('rate_limited', language, seconds=seconds), 'retry_after': seconds},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(seconds)}
+    )
+
 # Create your views here.
 
+class SearchView(generics.ListAPIView):
+    """Ranked full-text search over the user's chat messages and health reports"""
+    serializer_class = SearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        kind = self.request.query_params.get('kind')
+        if kind not in dict(SearchDocument.KIND_CHOICES):
+            kind = None
+        return search(self.request.user, self.request.query_params.get('q', ''), kind)
+
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -38,7 +78,16 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
     serializer_class = ChatSessionSerializer
     
     def get_queryset(self):
-        return ChatSession.objects.filter(user=self.request.user).order_by('-last_activity')
+        queryset = ChatSession.objects.filter(user=self.request.user).order_by('-last_activity')
+        
+        # Without the denormalized counters, compute them in the same query
+        if self.action == 'list' and not settings.LIFELYNX_CHAT_COUNTERS:
+            latest = ChatMessage.objects.filter(session=OuterRef('pk')).order_by('-created_at', '-id')
+            queryset = queryset.annotate(
+                annotated_message_count=Count('messages'),
+                annotated_last_message=Subquery(latest.values('message')[:1])
+            )
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -56,48 +105,30 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
         if not message_text:
             return Response({'error': 'Message cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Save user message
-        user_message = ChatMessage.objects.create(
-            session=chat_session,
-            sender='user',
-            message=message_text
-        )
+        limited = rate_limited_response('send_message', request.user, request.user.preferred_language)
+        if limited:
+            return limited
         
-        # Process with AI
-        ai_bot = LifelynxAISimple()
-        try:
-            result = ai_bot.generate_response(
-                message_text, 
-                request.user.preferred_language,
-                {
-                    'blood_type': request.user.blood_type,
-                    'genotype': request.user.genotype,
-                    'allergies': request.user.allergies
-                }
-            )
-            
-            # Save AI response
-            ai_message = ChatMessage.objects.create(
+        # Async mode: the worker writes the AI reply, the client polls for it
+        if settings.LIFELYNX_AI_ASYNC:
+            user_message = ChatMessage.objects.create(
                 session=chat_session,
-                sender='ai',
-                message=result['response']
+                sender='user',
+                message=message_text
             )
+            task = run_chat_inference.delay(user_message.id, request.user.preferred_language)
+            return Response({
+                'user_message': ChatMessageSerializer(user_message).data,
+                'task_id': task.id,
+                'status_url': reverse('chat_task_status', args=[task.id])
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        # Process with AI
+        try:
+            result = generate_reply(chat_session.id, request.user.id, message_text, request.user.preferred_language)
             
-            # Update session title if it's the first message
-            if not chat_session.title:
-                chat_session.title = message_text[:50] + "..." if len(message_text) > 50 else message_text
-                chat_session.save()
-            
-            # Create health record if symptoms detected
-            if result['symptoms_detected']:
-                HealthRecord.objects.create(
-                    user=request.user,
-                    chat_session=chat_session,
-                    symptoms=', '.join(result['symptoms_detected']),
-                    diagnosis=', '.join([d['disease'] for d in result['diagnosis']]),
-                    confidence_score=result['diagnosis'][0]['confidence'] if result['diagnosis'] else 0,
-                    is_emergency=result['is_emergency']
-                )
+            # Save both messages, session update and health record in one transaction
+            user_message, ai_message = record_chat_turn(chat_session.id, request.user.id, message_text, result)
             
             return Response({
                 'user_message': ChatMessageSerializer(user_message).data,
@@ -112,6 +143,14 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=True, methods=['get'])
+    def messages(self, request, pk=None):
+        """Page backwards through a session's messages with a keyset cursor"""
+        chat_session = self.get_object()
+        paginator = MessageKeysetPagination()
+        page = paginator.paginate_queryset(session_messages(chat_session), request, view=self)
+        return paginator.get_paginated_response(ChatMessageSerializer(page, many=True).data)
+    
     @action(detail=True, methods=['post'])
     def book_okada(self, request, pk=None):
         chat_session = self.get_object()
@@ -160,10 +199,6 @@ class QuickChatView(APIView):
     """
     For quick chat without session management (like WhatsApp)
     """
-    def __init__(self):
-        super().__init__()
-        self.ai_bot = LifelynxAISimple()
-    
     def post(self, request):
         user = request.user
         message = request.data.get('message', '')
@@ -172,27 +207,25 @@ class QuickChatView(APIView):
         if not message:
             return Response({'error': 'Message cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
         
+        limited = rate_limited_response('quick_chat', user, language)
+        if limited:
+            return limited
+        
+        if settings.LIFELYNX_AI_ASYNC:
+            task = run_quick_chat_inference.delay(user.id, message, language)
+            return Response({
+                'task_id': task.id,
+                'status_url': reverse('chat_task_status', args=[task.id])
+            }, status=status.HTTP_202_ACCEPTED)
+        
         try:
-            result = self.ai_bot.generate_response(
+            # No session, so there's no HealthReport to attach the result to
+            result = get_engine().generate_response(
                 message, 
                 language,
-                {
-                    'blood_type': user.blood_type,
-                    'genotype': user.genotype,
-                    'allergies': user.allergies
-                }
+                build_user_context(user.id)
             )
             
-            # Create health record if symptoms detected
-            if result['symptoms_detected']:
-                HealthProfile.objects.create(
-                    user=user,
-                    symptoms=', '.join(result['symptoms_detected']),
-                    diagnosis=', '.join([d['disease'] for d in result['diagnosis']]),
-                    confidence_score=result['diagnosis'][0]['confidence'] if result['diagnosis'] else 0,
-                    is_emergency=result['is_emergency']
-                )
-            
             return Response(result)
             
         except Exception as e:
@@ -200,4 +233,102 @@ class QuickChatView(APIView):
             return Response(
                 {'error': 'System dey busy now. Try again small time.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+def _quick_chat_inference(message, language, user_context):
+    return get_engine().generate_response(message, language, user_context)
+
+class AsyncQuickChatView(View):
+    """
+    QuickChatView for ASGI. Plain async Django view (DRF views are sync only),
+    authenticated with the same Bearer access token of an active user.
+    Inference runs on the bounded AI thread pool and the rate limiter and
+    database calls on threads, so the event loop is never blocked.
+    """
+
+    @csrf_exempt
+    def dispatch(self, *args, **kwargs):
+        return super().dispatch(*args, **kwargs)
+
+    async def post(self, request):
+        auth = request.headers.get('Authorization', '')
+        user = await get_user_for_token(auth[len('Bearer '):]) if auth.startswith('Bearer ') else None
+        if user is None or not user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        message = data.get('message', '')
+        language = data.get('language', user.preferred_language)
+
+        if not message:
+            return JsonResponse({'error': 'Message cannot be empty'}, status=400)
+
+        # The shared bucket store does cache I/O
+        decision = await sync_to_async(get_rate_limiter().check, thread_sensitive=False)('quick_chat', user.id)
+        if not decision.allowed:
+            seconds = retry_after_seconds(decision)
+            response = JsonResponse(
+                {'error': render('rate_limited', language, seconds=seconds), 'retry_after': seconds},
+                status=429
+            )
+            response['Retry-After'] = str(seconds)
+            return response
+
+        if settings.LIFELYNX_AI_ASYNC:
+            task = await sync_to_async(run_quick_chat_inference.delay, thread_sensitive=False)(user.id, message, language)
+            return JsonResponse({
+                'task_id': task.id,
+                'status_url': reverse('chat_task_status', args=[task.id])
+            }, status=202)
+
+        try:
+            user_context = await sync_to_async(build_user_context)(user.id)
+            result = await run_inference(_quick_chat_inference, message, language, user_context)
+            return JsonResponse(result)
+
+        except Exception as e:
+            logger.error(f"Quick chat error: {str(e)}")
+            return JsonResponse({'error': 'System dey busy now. Try again small time.'}, status=500)
+
+class RateLimitStatsView(APIView):
+    """
+    Allowed and shed request counts per rate-limited endpoint, for this process
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_rate_limiter().stats())
+
+class AICacheStatsView(APIView):
+    """
+    Hit, miss and eviction counts of the chatbot result cache, for this process
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+class ChatTaskStatusView(APIView):
+    """
+    Poll the result of a chat message queued in async mode
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, task_id):
+        task = AsyncResult(task_id)
+
+        if task.failed():
+            return Response({'task_id': task_id, 'status': 'failed'})
+
+        if not task.successful():
+            # Unknown ids also report as pending
+            return Response({'task_id': task_id, 'status': 'pending'})
+
+        result = task.result
+        if result.get('user_id') != request.user.id:
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({'task_id': task_id, 'status': 'completed', **result})
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hospital', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hospital',
+            index=models.Index(fields=['latitude', 'longitude'], name='hospital_lat_lon'),
+        ),
+    ]
@@ -69,3 +69,7 @@ class Hospital(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Bounding-box prefilter for nearby-hospital searches
+            models.Index(fields=['latitude', 'longitude'], name='hospital_lat_lon'),
+        ]
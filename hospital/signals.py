@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Hospital
+
+
+@receiver(post_save, sender=Hospital)
+@receiver(post_delete, sender=Hospital)
+def refresh_hospital_index(sender, **kwargs):
+    # Imported here so app loading doesn't pull in numpy
+    from .spatial import hospital_index
+    hospital_index.mark_stale()
@@ -0,0 +1,175 @@
+import logging
+import math
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+
+from core.geo import EARTH_RADIUS_KM, k_nearest
+from .models import Hospital
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'lifelynx:hospital-index:version'
+
+
+def listed_hospitals():
+    """Hospitals shown to patients: verified, approved and geocoded"""
+    return Hospital.objects.filter(
+        verified=True,
+        approved_by_admin=True,
+        latitude__isnull=False,
+        longitude__isnull=False
+    )
+
+
+def bounding_box(lat, lon, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a radius_km circle.
+
+    The longitude bounds are None when the box would cross a pole or the
+    antimeridian, in which case only latitude can be filtered on.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def within_box(queryset, lat, lon, radius_km):
+    """SQL prefilter on the indexed latitude/longitude columns"""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    queryset = queryset.filter(latitude__range=(min_lat, max_lat))
+    if min_lon is not None:
+        queryset = queryset.filter(longitude__range=(min_lon, max_lon))
+    return queryset
+
+
+class HospitalIndex:
+    """In-memory BallTree (haversine metric) over listed hospitals.
+
+    Built lazily and rebuilt on the next query after a Hospital is saved or
+    deleted (see signals). Changes made by other processes reach this one
+    through a version token kept in the cache_alias Django cache, read
+    before each query; if that cache isn't shared between processes, or is
+    unavailable, the index is also rebuilt once it is max_age seconds old.
+    Queries are O(log n) in the number of hospitals.
+    """
+
+    def __init__(self, max_age=60, cache_alias=None):
+        self.max_age = max_age
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self._tree = None
+        self._ids = None
+        self._built_at = 0.0
+        self._stale = True
+        self._version = None
+
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.cache_alias]
+
+    def shared_version(self):
+        if self.cache_alias is None:
+            return None
+        try:
+            return self._cache().get(VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Hospital index version unavailable: {e}")
+            return self._version
+
+    def mark_stale(self):
+        self._stale = True
+        if self.cache_alias is None:
+            return
+        try:
+            self._cache().set(VERSION_KEY, uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"Hospital index version unavailable: {e}")
+
+    def _current(self):
+        version = self.shared_version()
+        with self._lock:
+            if (self._stale or version != self._version
+                    or time.monotonic() - self._built_at > self.max_age):
+                # Imported here so the hospital app loads without scikit-learn
+                from sklearn.neighbors import BallTree
+
+                # Cleared first so a change made during the rebuild triggers another
+                self._stale = False
+                self._version = version
+                rows = list(listed_hospitals().values_list('id', 'latitude', 'longitude'))
+                self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+                coords = np.radians(np.array([[float(row[1]), float(row[2])] for row in rows], dtype=np.float64).reshape(-1, 2))
+                self._tree = BallTree(coords, metric='haversine') if rows else None
+                self._built_at = time.monotonic()
+            return self._tree, self._ids
+
+    def nearest(self, lat, lon, limit=None, radius_km=None):
+        """[(hospital_id, distance_km)] nearest first, at most limit, within radius_km"""
+        tree, ids = self._current()
+        if tree is None:
+            return []
+        point = np.radians([[lat, lon]])
+
+        if radius_km is not None:
+            indices, distances = tree.query_radius(
+                point, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+            )
+            indices, distances = indices[0], distances[0]
+            if limit is not None:
+                indices, distances = indices[:limit], distances[:limit]
+        else:
+            k = len(ids) if limit is None else min(limit, len(ids))
+            distances, indices = tree.query(point, k=k)
+            indices, distances = indices[0], distances[0]
+
+        return [(int(ids[i]), float(d) * EARTH_RADIUS_KM) for i, d in zip(indices, distances)]
+
+
+hospital_index = HospitalIndex(
+    getattr(settings, 'HOSPITAL_INDEX_MAX_AGE', 60),
+    getattr(settings, 'HOSPITAL_INDEX_SHARED_BACKEND', 'default')
+)
+
+
+def nearby_hospitals(lat, lon, limit=None, radius_km=None):
+    """
+    Listed hospitals nearest to (lat, lon), nearest first, each with a
+    distance_km attribute. Uses the BallTree unless HOSPITAL_SPATIAL_INDEX is
+    off, in which case a radius search is prefiltered in SQL.
+    """
+    if getattr(settings, 'HOSPITAL_SPATIAL_INDEX', True):
+        matches = hospital_index.nearest(lat, lon, limit, radius_km)
+        hospitals = listed_hospitals().in_bulk([hospital_id for hospital_id, _ in matches])
+        result = []
+        for hospital_id, distance in matches:
+            # Skip hospitals unlisted since the index was built
+            hospital = hospitals.get(hospital_id)
+            if hospital is not None:
+                hospital.distance_km = round(distance, 2)
+                result.append(hospital)
+        return result
+
+    queryset = listed_hospitals()
+    if radius_km is not None:
+        queryset = within_box(queryset, lat, lon, radius_km)
+
+    candidates = list(queryset)
+    points = [(float(h.latitude), float(h.longitude)) for h in candidates]
+    indices, distances = k_nearest((lat, lon), points, len(candidates) if limit is None else limit, radius_km)
+
+    result = []
+    for i, distance in zip(indices, distances):
+        hospital = candidates[i]
+        hospital.distance_km = round(float(distance), 2)
+        result.append(hospital)
+    return result
@@ -1,3 +1,128 @@
-from django.test import TestCase
+from itertools import count
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from core.geo import haversine_distance
+from .models import Hospital
+from .spatial import VERSION_KEY, HospitalIndex, bounding_box, hospital_index, nearby_hospitals
+
+numbers = count(1)
+
+# (name, latitude, longitude) around Lagos, plus one far away in Abuja
+LAGOS = (6.5244, 3.3792)
+PLACES = [
+    ('Ikeja', 6.6018, 3.3515),
+    ('Yaba', 6.5095, 3.3711),
+    ('Lekki', 6.4698, 3.5852),
+    ('Abuja', 9.0765, 7.3986),
+]
+
+
+def make_hospital(name, latitude, longitude, listed=True):
+    n = next(numbers)
+    owner = User.objects.create_user(f'owner{n}@example.com', f'Owner {n}', f'+23480000{n:05d}')
+    return Hospital.objects.create(
+        name=name,
+        email=f'hospital{n}@example.com',
+        phone_number=f'+23481000{n:05d}',
+        hospital_id=f'HMB{n}',
+        address='1 Hospital Road',
+        city='Lagos',
+        state='Lagos',
+        latitude=latitude,
+        longitude=longitude,
+        verified=listed,
+        approved_by_admin=listed,
+        owner=owner
+    )
+
+
+class BoundingBoxTests(TestCase):
+
+    def test_box_contains_the_circle(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(*LAGOS, 10)
+        self.assertLess(min_lat, LAGOS[0])
+        self.assertGreater(max_lat, LAGOS[0])
+        # The box's edges are at least the radius away from its centre
+        self.assertGreaterEqual(haversine_distance(*LAGOS, max_lat, LAGOS[1]), 9.99)
+        self.assertGreaterEqual(haversine_distance(*LAGOS, LAGOS[0], max_lon), 9.99)
+        self.assertLess(min_lon, LAGOS[1])
+
+    def test_longitude_unbounded_across_the_antimeridian(self):
+        self.assertEqual(bounding_box(0.0, 179.99, 50)[2:], (None, None))
+
+    def test_longitude_unbounded_near_a_pole(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(89.9, 0.0, 50)
+        self.assertEqual((max_lat, min_lon, max_lon), (90.0, None, None))
+
+
+class NearbyHospitalsTests(TestCase):
+
+    def setUp(self):
+        hospital_index.mark_stale()
+        self.hospitals = {name: make_hospital(name, lat, lon) for name, lat, lon in PLACES}
+        make_hospital('Unlisted', 6.5244, 3.3792, listed=False)
+
+    def names(self, hospitals):
+        return [h.name for h in hospitals]
+
+    def test_nearest_first_with_distances(self):
+        result = nearby_hospitals(*LAGOS, limit=3)
+
+        self.assertEqual(self.names(result), ['Yaba', 'Ikeja', 'Lekki'])
+        yaba = self.hospitals['Yaba']
+        expected = haversine_distance(*LAGOS, float(yaba.latitude), float(yaba.longitude))
+        self.assertAlmostEqual(result[0].distance_km, expected, places=1)
+
+    def test_radius_excludes_far_hospitals(self):
+        self.assertEqual(self.names(nearby_hospitals(*LAGOS, radius_km=50)), ['Yaba', 'Ikeja', 'Lekki'])
+
+    def test_index_and_sql_fallback_agree(self):
+        for kwargs in [{'limit': 2}, {'radius_km': 15}, {}]:
+            indexed = nearby_hospitals(*LAGOS, **kwargs)
+            with override_settings(HOSPITAL_SPATIAL_INDEX=False):
+                fallback = nearby_hospitals(*LAGOS, **kwargs)
+            self.assertEqual(self.names(indexed), self.names(fallback))
+            self.assertEqual([h.distance_km for h in indexed], [h.distance_km for h in fallback])
+
+    def test_saving_a_hospital_refreshes_the_index(self):
+        nearby_hospitals(*LAGOS)
+        make_hospital('Surulere', 6.5000, 3.3500)
+        self.assertIn('Surulere', self.names(nearby_hospitals(*LAGOS)))
+
+        Hospital.objects.get(name='Surulere').delete()
+        self.assertNotIn('Surulere', self.names(nearby_hospitals(*LAGOS)))
+
+    def test_hospitals_unlisted_since_the_build_are_skipped(self):
+        nearby_hospitals(*LAGOS)
+        # update() sends no signal, so the index still has Yaba
+        Hospital.objects.filter(name='Yaba').update(verified=False)
+        self.assertNotIn('Yaba', self.names(nearby_hospitals(*LAGOS)))
+
+
+class HospitalIndexVersionTests(TestCase):
+
+    def setUp(self):
+        caches['default'].delete(VERSION_KEY)
+        self.index = HospitalIndex(max_age=3600, cache_alias='default')
+        self.hospital = make_hospital('Yaba', 6.5095, 3.3711)
+
+    def ids(self):
+        return [hospital_id for hospital_id, _ in self.index.nearest(*LAGOS)]
+
+    def test_change_from_another_process_rebuilds(self):
+        self.assertEqual(self.ids(), [self.hospital.id])
+
+        # Another process listed a hospital: its signal only changed the version
+        other = make_hospital('Ikeja', 6.6018, 3.3515)
+        self.assertEqual(self.ids(), [self.hospital.id, other.id])
+
+    def test_unchanged_version_keeps_the_index(self):
+        self.ids()
+        Hospital.objects.filter(pk=self.hospital.pk).update(verified=False)
+        self.assertEqual(self.ids(), [self.hospital.id])
+
+        caches['default'].set(VERSION_KEY, 'elsewhere')
+        self.assertEqual(self.ids(), [])
@@ -13,4 +13,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
-application = get_asgi_application()
+# Initialise Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+
+from ai.engine import warm_up
+from core.middleware import JWTAuthMiddleware
+from core.routing import websocket_urlpatterns
+
+# WebSockets authenticate with a JWT rather than cookies, so no origin check
+# is needed (and mobile clients don't send an Origin header).
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+})
+
+warm_up()
@@ -0,0 +1,19 @@
+import os
+
+from celery import Celery
+from celery.signals import worker_process_init
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+
+app = Celery('project')
+
+# Read CELERY_* settings from Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def warm_up_engine(**kwargs):
+    # Each prefork child loads its own engine before taking tasks
+    from ai.engine import warm_up
+    warm_up()
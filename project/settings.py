@@ -48,8 +48,10 @@ INSTALLED_APPS = [
     'client',
     'hospital',
     'core',
+    'whatsapp',
     'corsheaders',
     'drf_spectacular',
+    'channels',
 ]
 
 MIDDLEWARE = [
@@ -81,6 +83,21 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'project.wsgi.application'
+ASGI_APPLICATION = 'project.asgi.application'
+
+# Channel layer for WebSocket chat. The in-memory layer only works within one
+# process (fine for development and tests); use Redis in production:
+# CHANNEL_LAYERS = {
+#     'default': {
+#         'BACKEND': 'channels_redis.core.RedisChannelLayer',
+#         'CONFIG': {'hosts': [('127.0.0.1', 6379)]},
+#     }
+# }
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    }
+}
 
 
 # Database
@@ -189,3 +206,108 @@ EMAIL_HOST_PASSWORD = 'zxyvotzqvgbtqvza'
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
 FRONTEND_URL = "http://localhost:3000"
+
+# Lifelynx AI
+# Load the chatbot engine when a WSGI/ASGI server or Celery worker process
+# starts, instead of on the first chat message. Management commands never
+# warm up.
+LIFELYNX_AI_WARMUP = True
+
+# Cache of chatbot results keyed on (normalized message, language, model version).
+# SHARED_BACKEND is an optional Django cache alias shared between workers.
+LIFELYNX_AI_CACHE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 2048,
+    'TTL': 600,
+    'SHARED_BACKEND': None,
+}
+
+# Running symptom set per chat session, so later messages are diagnosed
+# together with earlier ones. SHARED_BACKEND is an optional Django cache
+# alias shared by web and Celery processes; LOCAL_TTL then bounds how long
+# the in-process copy is trusted (None: 5 seconds with a shared backend,
+# TTL without one).
+LIFELYNX_AI_SESSION_STATE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 4096,
+    'TTL': 86400,
+    'LOCAL_TTL': None,
+    'SHARED_BACKEND': None,
+}
+
+# WhatsApp webhook. Replies go out through WHATSAPP_SENDER, chosen like
+# EMAIL_BACKEND; use 'whatsapp.senders.TwilioSender' in production.
+WHATSAPP_SENDER = 'whatsapp.senders.ConsoleSender'
+TWILIO_ACCOUNT_SID = config('TWILIO_ACCOUNT_SID', default='')
+TWILIO_AUTH_TOKEN = config('TWILIO_AUTH_TOKEN', default='')
+TWILIO_WHATSAPP_NUMBER = config('TWILIO_WHATSAPP_NUMBER', default='')
+
+# Provider message IDs already accepted, so retried deliveries are dropped.
+# SHARED_BACKEND is an optional Django cache alias shared between workers.
+WHATSAPP_DEDUPE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 86400,
+    'SHARED_BACKEND': None,
+}
+
+# Token-bucket limits on the AI endpoints, per user (per phone number for
+# WhatsApp). BURST is the bucket size, REFILL_PER_MINUTE the sustained rate.
+# Buckets live in each process unless SHARED_BACKEND names a Django cache
+# alias. django-ratelimit (in requirements) only offers fixed windows.
+LIFELYNX_RATE_LIMITS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 10000,
+    'SHARED_BACKEND': None,
+    'RULES': {
+        'send_message': {'BURST': 10, 'REFILL_PER_MINUTE': 12},
+        'quick_chat': {'BURST': 10, 'REFILL_PER_MINUTE': 12},
+        'whatsapp': {'BURST': 5, 'REFILL_PER_MINUTE': 6},
+    },
+}
+
+# Phone number -> (user, active session, language) cache for inbound WhatsApp
+WHATSAPP_RESOLVER = {
+    'MAX_ENTRIES': 50000,
+    'TTL': 300,
+}
+
+# Serve the WhatsApp webhook and quick-chat with their async views. Only
+# worth it under an ASGI server (daphne/uvicorn); under WSGI each async view
+# gets its own event loop. LIFELYNX_AI_THREADS sizes the inference thread
+# pool the async views use (default: one per CPU).
+LIFELYNX_ASYNC_VIEWS = False
+LIFELYNX_AI_THREADS = None
+
+# Nearby-hospital search: in-memory BallTree over listed hospitals, rebuilt
+# after hospital changes or once it is HOSPITAL_INDEX_MAX_AGE seconds old.
+# Changes reach other processes through a version key in the
+# HOSPITAL_INDEX_SHARED_BACKEND cache alias, which only works across
+# processes if that cache is shared (not the default local-memory cache).
+# With the index off, radius searches use an SQL bounding-box prefilter.
+HOSPITAL_SPATIAL_INDEX = True
+HOSPITAL_INDEX_MAX_AGE = 60
+HOSPITAL_INDEX_SHARED_BACKEND = 'default'
+
+# Queue chat inference on Celery instead of running it in the request.
+# Endpoints return 202 with a task id; poll /api/chat-tasks/<task_id>/.
+# The WhatsApp webhook then only stores and acknowledges each message;
+# without it the webhook answers inside the request.
+LIFELYNX_AI_ASYNC = False
+
+# Celery
+# For tests use CELERY_TASK_ALWAYS_EAGER = True, or
+# CELERY_BROKER_URL = 'memory://' with CELERY_RESULT_BACKEND = 'cache+memory://'
+CELERY_BROKER_URL = 'redis://localhost:6379/0'
+CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TASK_ALWAYS_EAGER = False
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_STORE_EAGER_RESULT = True
+CELERY_RESULT_EXPIRES = 3600
+
+# ChatSession.message_count / last_message_* are kept up to date on every
+# ChatMessage write. Set to False to compute them with Count/Subquery instead
+# (e.g. before running the backfill_chat_counters command).
+LIFELYNX_CHAT_COUNTERS = True
@@ -0,0 +1,93 @@
+# whatsapp/dedupe.py
+import logging
+
+from django.conf import settings
+
+from ai.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class DedupeStore:
+    """Bounded TTL record of provider message IDs already accepted.
+
+    The in-process LRU answers most retries without touching anything
+    else; the optional Django cache alias catches retries that land on a
+    different worker. The unique InboundMessage.provider_message_id is the
+    durable backstop behind both.
+    """
+
+    def __init__(self, max_entries=10000, ttl=86400, shared_backend=None, key_prefix='lifelynx:wa:seen:'):
+        self.local = LRUCache(max_entries, ttl)
+        self.ttl = ttl
+        self.shared_backend = shared_backend
+        self.key_prefix = key_prefix
+
+    def _shared(self):
+        if not self.shared_backend:
+            return None
+        from django.core.cache import caches
+        return caches[self.shared_backend]
+
+    def claim(self, message_id):
+        """Mark message_id as seen. Returns False if it already was."""
+        if not self.local.add(message_id, True):
+            return False
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                if not shared.add(self.key_prefix + message_id, True, self.ttl):
+                    return False
+            except Exception as e:
+                logger.warning(f"Shared dedupe store unavailable: {e}")
+        return True
+
+    async def aclaim(self, message_id):
+        """claim() for async views"""
+        if not self.local.add(message_id, True):
+            return False
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                if not await shared.aadd(self.key_prefix + message_id, True, self.ttl):
+                    return False
+            except Exception as e:
+                logger.warning(f"Shared dedupe store unavailable: {e}")
+        return True
+
+    def release(self, message_id):
+        """Forget message_id, so a retry of a delivery we failed to store is accepted"""
+        self.local.delete(message_id)
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                shared.delete(self.key_prefix + message_id)
+            except Exception as e:
+                logger.warning(f"Shared dedupe store unavailable: {e}")
+
+
+    async def arelease(self, message_id):
+        """release() for async views"""
+        self.local.delete(message_id)
+
+        shared = self._shared()
+        if shared is not None:
+            try:
+                await shared.adelete(self.key_prefix + message_id)
+            except Exception as e:
+                logger.warning(f"Shared dedupe store unavailable: {e}")
+
+
+def build_dedupe_store():
+    options = getattr(settings, 'WHATSAPP_DEDUPE', {})
+    return DedupeStore(
+        max_entries=options.get('MAX_ENTRIES', 10000),
+        ttl=options.get('TTL', 86400),
+        shared_backend=options.get('SHARED_BACKEND'),
+    )
+
+
+dedupe_store = build_dedupe_store()
@@ -0,0 +1,82 @@
+# whatsapp/handlers.py
+import logging
+
+from ai.catalog import render
+from client.models import ChatMessage
+from core.chat import generate_reply, record_chat_turn
+from core.ratelimit import get_rate_limiter, retry_after_seconds
+from .resolver import resolver
+
+logger = logging.getLogger(__name__)
+
+
+def handle_message(from_number, message):
+    """Run one inbound WhatsApp message through the chatbot and return the reply text,
+    or None when nothing should be sent back"""
+    # Cached phone -> user/session lookup; no queries once the sender is known
+    resolution = resolver.resolve(from_number)
+    language = resolution.language
+    
+    # Handle special commands
+    if message.upper() == 'OKADA':
+        return handle_okada_booking(resolution.user_id, resolution.session_id)
+    
+    if message.upper() in ['HI', 'HELLO', 'HELLO O']:
+        response = render('whatsapp_welcome', language, fallback='pidgin')
+        
+        # Save welcome message
+        ChatMessage.objects.create(
+            session_id=resolution.session_id,
+            sender='ai',
+            message=response
+        )
+        return response
+    
+    # Shed chatty senders before running the model; only the first
+    # message over the limit in each window gets a "slow down" reply
+    limiter = get_rate_limiter()
+    decision = limiter.check('whatsapp', from_number)
+    if not decision.allowed:
+        if not limiter.first_denial('whatsapp', from_number, decision):
+            return None
+        return render('rate_limited', language, fallback='pidgin', seconds=retry_after_seconds(decision))
+    
+    # Process with AI
+    result = generate_reply(resolution.session_id, resolution.user_id, message, language)
+    
+    # Save both messages and the session update in one transaction
+    record_chat_turn(resolution.session_id, resolution.user_id, message, result)
+    return result['response']
+
+
+def handle_okada_booking(user_id, session_id):
+    from client.models import PHC, OkadaBooking
+    
+    nearest_phc = PHC.objects.filter(is_active=True).first()
+    if nearest_phc:
+        # Create booking
+        booking = OkadaBooking.objects.create(
+            user_id=user_id,
+            chat_session_id=session_id,
+            phc=nearest_phc,
+            driver_name="Available Driver",
+            driver_phone="+234800000000",
+            vehicle_plate="LAG123XYZ",
+            fare=400.00,
+            estimated_arrival=7
+        )
+        
+        response = f"Okada don dey come! Driver {booking.driver_name} go reach you for {booking.estimated_arrival} minutes. " \
+                  f"Plate number: {booking.vehicle_plate}. Total fare: N{booking.fare}. " \
+                  f"Driver go call you for {booking.driver_phone}."
+        
+        # Save booking message
+        ChatMessage.objects.create(
+            session_id=session_id,
+            sender='ai',
+            message=response
+        )
+        
+        return response
+    else:
+        return "Sorry, no PHC dey available for your area now. Try again later."
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from whatsapp.models import InboundMessage
+from whatsapp.tasks import process_inbound_message
+
+
+class Command(BaseCommand):
+    help = "Re-enqueue stored WhatsApp deliveries that were never processed (e.g. the broker was down)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=5, help="Minutes a message must have waited")
+        parser.add_argument('--include-failed', action='store_true', help="Also retry messages that failed")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        pending = InboundMessage.objects.filter(received_at__lt=cutoff, status='received')
+        if options['include_failed']:
+            failed = InboundMessage.objects.filter(received_at__lt=cutoff, status='failed')
+            failed.update(status='received', error='')
+
+        count = 0
+        for inbound_id in pending.values_list('id', flat=True).iterator():
+            process_inbound_message.delay(inbound_id)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Re-enqueued {count} WhatsApp messages"))
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class InboundMessage(models.Model):
+    """Raw webhook delivery, stored before any processing happens"""
+
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+
+    provider_message_id = models.CharField(max_length=64, unique=True)
+    from_number = models.CharField(max_length=32)
+    body = models.TextField(blank=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='inbound_status_received'),
+        ]
+
+    def __str__(self):
+        return f"WhatsApp {self.provider_message_id} from {self.from_number} ({self.status})"
@@ -0,0 +1,91 @@
+# whatsapp/resolver.py
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from ai.cache import LRUCache
+from accounts.models import User
+from client.models import ChatSession
+
+Resolution = namedtuple('Resolution', ['user_id', 'session_id', 'language'])
+
+
+def whatsapp_user_defaults(phone_number):
+    """Fields for a User first seen on WhatsApp. It has no email or password
+    of its own, and stays inactive until the number registers for the app."""
+    digits = ''.join(c for c in phone_number if c.isdigit())
+    return {
+        'email': f"whatsapp-{digits}@lifelynx.invalid",
+        'full_name': phone_number,
+        'password': make_password(None),
+        'is_patient': True,
+        'preferred_language': 'pidgin',
+    }
+
+
+class PhoneResolver:
+    """Bounded phone number -> (user, active session, language) cache.
+
+    A hit needs no queries. Entries are dropped by signals when the user
+    changes or the session is closed or deleted; the TTL bounds how long
+    another process can keep serving an entry it wasn't told about.
+    """
+
+    def __init__(self, max_entries=50000, ttl=300):
+        self.entries = LRUCache(max_entries, ttl)
+        # user id -> phone, so a user change can find the entry even if
+        # the phone number itself changed
+        self.phones = LRUCache(max_entries, ttl)
+        self._lock = threading.Lock()
+
+    def resolve(self, phone_number):
+        resolution = self.entries.get(phone_number)
+        if resolution is None:
+            resolution = self._load(phone_number)
+            with self._lock:
+                self.entries.set(phone_number, resolution)
+                self.phones.set(resolution.user_id, phone_number)
+        return resolution
+
+    def _load(self, phone_number):
+        # First contact creates the user and the session together
+        with transaction.atomic():
+            user, created = User.objects.get_or_create(
+                phone_number=phone_number,
+                defaults=whatsapp_user_defaults(phone_number)
+            )
+            chat_session = (
+                ChatSession.objects.filter(user=user, is_active=True).order_by('-last_activity').only('id').first()
+                or ChatSession.objects.create(user=user, title='WhatsApp Chat')
+            )
+        return Resolution(user.id, chat_session.id, user.preferred_language)
+
+    def forget_phone(self, phone_number):
+        resolution = self.entries.get(phone_number)
+        self.entries.delete(phone_number)
+        if resolution is not None:
+            self.phones.delete(resolution.user_id)
+
+    def forget_user(self, user_id):
+        phone_number = self.phones.get(user_id)
+        if phone_number is not None:
+            self.entries.delete(phone_number)
+        self.phones.delete(user_id)
+
+    def clear(self):
+        self.entries.clear()
+        self.phones.clear()
+
+
+def build_resolver():
+    options = getattr(settings, 'WHATSAPP_RESOLVER', {})
+    return PhoneResolver(
+        max_entries=options.get('MAX_ENTRIES', 50000),
+        ttl=options.get('TTL', 300),
+    )
+
+
+resolver = build_resolver()
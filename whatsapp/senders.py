@@ -0,0 +1,56 @@
+# whatsapp/senders.py
+import base64
+import json
+import logging
+import urllib.parse
+import urllib.request
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class BaseSender:
+    """Delivers outbound WhatsApp replies. Chosen with WHATSAPP_SENDER, like EMAIL_BACKEND."""
+
+    def send(self, to_number, body):
+        raise NotImplementedError
+
+
+class ConsoleSender(BaseSender):
+    """Logs replies instead of sending them; for development"""
+
+    def send(self, to_number, body):
+        logger.info(f"WhatsApp reply to {to_number}: {body}")
+
+
+class TwilioSender(BaseSender):
+    """Sends replies through the Twilio Messages API"""
+
+    API_URL = 'https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json'
+
+    def __init__(self, account_sid=None, auth_token=None, from_number=None, timeout=10):
+        self.account_sid = account_sid or settings.TWILIO_ACCOUNT_SID
+        self.auth_token = auth_token or settings.TWILIO_AUTH_TOKEN
+        self.from_number = from_number or settings.TWILIO_WHATSAPP_NUMBER
+        self.timeout = timeout
+
+    def send(self, to_number, body):
+        data = urllib.parse.urlencode({
+            'From': f"whatsapp:{self.from_number}",
+            'To': f"whatsapp:{to_number}",
+            'Body': body,
+        }).encode('utf-8')
+        credentials = base64.b64encode(f"{self.account_sid}:{self.auth_token}".encode('utf-8')).decode('ascii')
+        request = urllib.request.Request(
+            self.API_URL.format(sid=self.account_sid),
+            data=data,
+            headers={'Authorization': f"Basic {credentials}"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read()).get('sid')
+
+
+def get_sender():
+    return import_string(getattr(settings, 'WHATSAPP_SENDER', 'whatsapp.senders.ConsoleSender'))()
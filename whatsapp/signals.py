@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from client.models import ChatSession
+from client.signals import sessions_closed
+from .resolver import resolver
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    resolver.forget_user(instance.id)
+    resolver.forget_phone(instance.phone_number)
+
+
+@receiver(post_save, sender=ChatSession)
+def forget_closed_session(sender, instance, created, **kwargs):
+    if not created and not instance.is_active:
+        resolver.forget_user(instance.user_id)
+
+
+@receiver(post_delete, sender=ChatSession)
+def forget_deleted_session(sender, instance, **kwargs):
+    resolver.forget_user(instance.user_id)
+
+
+@receiver(sessions_closed)
+def forget_bulk_closed_sessions(sender, user_ids, **kwargs):
+    for user_id in user_ids:
+        resolver.forget_user(user_id)
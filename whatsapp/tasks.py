@@ -0,0 +1,43 @@
+import logging
+
+from celery import shared_task
+from django.db.models import F
+from django.utils import timezone
+
+from .handlers import handle_message
+from .models import InboundMessage
+from .senders import get_sender
+
+logger = logging.getLogger(__name__)
+
+BUSY_REPLY = 'System dey busy now. Try again small time.'
+
+
+@shared_task
+def process_inbound_message(inbound_id):
+    """Answer a stored webhook delivery and send the reply"""
+    # Claim the row; a second task for the same delivery finds nothing to do
+    claimed = InboundMessage.objects.filter(pk=inbound_id, status='received').update(
+        status='processing',
+        attempts=F('attempts') + 1
+    )
+    if not claimed:
+        return None
+    inbound = InboundMessage.objects.get(pk=inbound_id)
+
+    try:
+        reply = handle_message(inbound.from_number, inbound.body)
+    except Exception as e:
+        logger.error(f"WhatsApp processing error for {inbound.provider_message_id}: {str(e)}")
+        InboundMessage.objects.filter(pk=inbound_id).update(status='failed', error=str(e))
+        reply = BUSY_REPLY
+    else:
+        InboundMessage.objects.filter(pk=inbound_id).update(status='processed', processed_at=timezone.now())
+
+    if reply is None:
+        return None
+    try:
+        get_sender().send(inbound.from_number, reply)
+    except Exception as e:
+        logger.error(f"WhatsApp reply to {inbound.from_number} failed: {str(e)}")
+    return reply
@@ -0,0 +1,144 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from client.models import ChatSession
+from core.ratelimit import LocalBucketStore, RateLimiter
+from .dedupe import dedupe_store
+from .handlers import handle_message
+from .models import InboundMessage
+from .resolver import PhoneResolver, resolver
+
+PHONE = '+2348012345678'
+
+
+class PhoneResolverTests(TestCase):
+
+    def setUp(self):
+        self.resolver = PhoneResolver(max_entries=10, ttl=300)
+
+    def test_first_contact_creates_user_and_session(self):
+        resolution = self.resolver.resolve(PHONE)
+
+        user = User.objects.get(pk=resolution.user_id)
+        self.assertEqual(user.phone_number, PHONE)
+        self.assertEqual(user.preferred_language, 'pidgin')
+        self.assertFalse(user.is_active)
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(resolution.language, 'pidgin')
+        self.assertTrue(ChatSession.objects.filter(pk=resolution.session_id, user=user, is_active=True).exists())
+
+    def test_distinct_numbers_get_distinct_users(self):
+        first = self.resolver.resolve(PHONE)
+        second = self.resolver.resolve('+2348098765432')
+        self.assertNotEqual(first.user_id, second.user_id)
+
+    def test_known_sender_needs_no_queries(self):
+        resolution = self.resolver.resolve(PHONE)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolver.resolve(PHONE), resolution)
+
+    def test_existing_user_keeps_their_language(self):
+        user = User.objects.create_user('ada@example.com', 'Ada', PHONE, preferred_language='yoruba')
+        resolution = self.resolver.resolve(PHONE)
+        self.assertEqual((resolution.user_id, resolution.language), (user.id, 'yoruba'))
+
+
+class ResolverInvalidationTests(TestCase):
+
+    def setUp(self):
+        resolver.clear()
+        self.addCleanup(resolver.clear)
+
+    def test_bulk_closed_session_is_forgotten(self):
+        resolution = resolver.resolve(PHONE)
+
+        self.assertEqual(ChatSession.objects.filter(user_id=resolution.user_id).close(), 1)
+
+        fresh = resolver.resolve(PHONE)
+        self.assertEqual(fresh.user_id, resolution.user_id)
+        self.assertNotEqual(fresh.session_id, resolution.session_id)
+
+    def test_language_change_is_picked_up(self):
+        resolution = resolver.resolve(PHONE)
+        user = User.objects.get(pk=resolution.user_id)
+        user.preferred_language = 'hausa'
+        user.save()
+
+        self.assertEqual(resolver.resolve(PHONE).language, 'hausa')
+
+
+class WebhookTests(TestCase):
+    url = '/api/whatsapp/webhook/'
+
+    def setUp(self):
+        dedupe_store.local.clear()
+        self.addCleanup(dedupe_store.local.clear)
+
+    def deliver(self, message_id='SM0001', body='I get fever'):
+        return self.client.post(self.url, {'MessageSid': message_id, 'From': f"whatsapp:{PHONE}", 'Body': body})
+
+    @override_settings(LIFELYNX_AI_ASYNC=True)
+    def test_acknowledges_and_enqueues(self):
+        with mock.patch('whatsapp.views.process_inbound_message') as task:
+            response = self.deliver()
+
+        self.assertEqual(response.json(), {'status': 'received'})
+        inbound = InboundMessage.objects.get(provider_message_id='SM0001')
+        task.delay.assert_called_once_with(inbound.id)
+
+    @override_settings(LIFELYNX_AI_ASYNC=True)
+    def test_retried_delivery_is_dropped(self):
+        with mock.patch('whatsapp.views.process_inbound_message') as task:
+            self.deliver()
+            response = self.deliver()
+
+        self.assertEqual(response.json(), {'status': 'duplicate'})
+        self.assertEqual(task.delay.call_count, 1)
+
+    @override_settings(LIFELYNX_AI_ASYNC=True)
+    def test_broker_failure_lets_the_provider_retry(self):
+        with mock.patch('whatsapp.views.process_inbound_message') as task:
+            task.delay.side_effect = ConnectionError('broker down')
+            self.assertEqual(self.deliver().status_code, 503)
+            self.assertFalse(InboundMessage.objects.exists())
+
+            task.delay.side_effect = None
+            self.assertEqual(self.deliver().json(), {'status': 'received'})
+        self.assertEqual(InboundMessage.objects.get().status, 'received')
+
+    @override_settings(LIFELYNX_AI_ASYNC=False)
+    def test_answers_inline_without_celery(self):
+        sender = mock.Mock()
+        with mock.patch('whatsapp.tasks.handle_message', return_value='Na malaria be this'), \
+                mock.patch('whatsapp.tasks.get_sender', return_value=sender):
+            response = self.deliver()
+
+        # Delivered through the sender only, not echoed in the response
+        self.assertEqual(response.json(), {'status': 'processed'})
+        self.assertEqual(InboundMessage.objects.get().status, 'processed')
+        sender.send.assert_called_once_with(PHONE, 'Na malaria be this')
+
+
+class HandlerRateLimitTests(TestCase):
+
+    def setUp(self):
+        resolver.clear()
+        self.addCleanup(resolver.clear)
+        limiter = RateLimiter(LocalBucketStore(), {'whatsapp': {'BURST': 1, 'REFILL_PER_MINUTE': 1}})
+        patcher = mock.patch('whatsapp.handlers.get_rate_limiter', return_value=limiter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_the_first_throttled_message_gets_a_reply(self):
+        result = {
+            'symptoms_detected': [], 'session_symptoms': [], 'diagnosis': [],
+            'response': 'Tell me more', 'is_emergency': False,
+        }
+        with mock.patch('whatsapp.handlers.generate_reply', return_value=result):
+            replies = [handle_message(PHONE, 'my head dey pain me') for _ in range(3)]
+
+        self.assertEqual(replies[0], 'Tell me more')
+        self.assertIsNotNone(replies[1])
+        self.assertIsNone(replies[2])
@@ -0,0 +1,9 @@
+from django.conf import settings
+from django.urls import path
+from .views import AsyncWhatsAppWebhook, WhatsAppWebhook
+
+webhook_view = AsyncWhatsAppWebhook if settings.LIFELYNX_ASYNC_VIEWS else WhatsAppWebhook
+
+urlpatterns = [
+    path('webhook/', webhook_view.as_view(), name='whatsapp_webhook'),
+]
@@ -1,146 +1,142 @@
 # whatsapp/views.py
 from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
 from django.http import JsonResponse
 from django.views import View
+from django.db import IntegrityError, transaction
+from asgiref.sync import sync_to_async
 import json
-from ai.chatbot_simple import LifelynxAISimple
-from accounts.models import User
-from client.models import ChatSession, ChatMessage
-from client.models import HealthProfile as HealthRecord
+from .dedupe import dedupe_store
+from .models import InboundMessage
+from .tasks import process_inbound_message
 import logging
 
 logger = logging.getLogger(__name__)
 
-class WhatsAppWebhook(View):
-    def __init__(self):
-        super().__init__()
-        self.ai_bot = LifelynxAISimple()
+def parse_delivery(request):
+    """
+    Pull (message_id, from_number, body, payload) out of a webhook request.
+    Returns (None, error response) if the delivery is unusable.
+    """
+    try:
+        if request.content_type == 'application/json':
+            data = json.loads(request.body)
+        else:
+            data = request.POST.dict()
+    except (ValueError, UnicodeDecodeError):
+        return None, JsonResponse({'error': 'Invalid payload'}, status=400)
     
+    message_id = data.get('MessageSid') or data.get('SmsMessageSid') or data.get('id')
+    message = data.get('Body', '').strip()
+    from_number = data.get('From', '').replace('whatsapp:', '')
+    if not message_id or not from_number:
+        return None, JsonResponse({'error': 'MessageSid and From are required'}, status=400)
+    return (message_id, from_number, message, data), None
+
+def enqueue_failed(inbound, error):
+    """
+    The broker didn't take the task. Forget the delivery entirely, so the
+    provider's retry is accepted instead of being dropped as a duplicate.
+    """
+    logger.error(f"WhatsApp enqueue failed for {inbound.provider_message_id}: {error}")
+    InboundMessage.objects.filter(pk=inbound.pk).delete()
+    dedupe_store.release(inbound.provider_message_id)
+    return JsonResponse({'error': 'Try again'}, status=503)
+
+class WhatsAppWebhook(View):
+    """
+    Acknowledge deliveries immediately. The raw message is stored keyed on
+    the provider's message ID and answered by a Celery worker, so a slow
+    reply never makes the provider retry, and retries are dropped here.
+
+    Without LIFELYNX_AI_ASYNC there's no worker to hand off to, and the
+    stored message is answered inside the request instead. The reply still
+    goes out only through the sender, never in the response body, so the
+    user gets it once.
+    """
+
     @csrf_exempt
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
     
     def post(self, request):
+        delivery, error = parse_delivery(request)
+        if error:
+            return error
+        message_id, from_number, message, data = delivery
+        
+        if not dedupe_store.claim(message_id):
+            return JsonResponse({'status': 'duplicate'})
+        
         try:
-            data = json.loads(request.body)
-            message = data.get('Body', '').strip()
-            from_number = data.get('From', '').replace('whatsapp:', '')
-            
-            logger.info(f"Received WhatsApp message from {from_number}: {message}")
-            
-            # Get or create user
-            user, created = User.objects.get_or_create(
-                phone_number=from_number,
-                defaults={
-                    'username': from_number, 
-                    'preferred_language': 'pidgin'
-                }
-            )
-            
-            # Get or create active chat session for WhatsApp
-            chat_session, created = ChatSession.objects.get_or_create(
-                user=user,
-                is_active=True,
-                defaults={'title': 'WhatsApp Chat'}
-            )
-            
-            # Handle special commands
-            if message.upper() == 'OKADA':
-                response = self._handle_okada_booking(user, chat_session)
-            elif message.upper() in ['HI', 'HELLO', 'HELLO O']:
-                response = self._get_welcome_message(user.preferred_language)
-                
-                # Save welcome message
-                ChatMessage.objects.create(
-                    session=chat_session,
-                    sender='ai',
-                    message=response
-                )
-            else:
-                # Save user message
-                ChatMessage.objects.create(
-                    session=chat_session,
-                    sender='user',
-                    message=message
+            with transaction.atomic():
+                inbound = InboundMessage.objects.create(
+                    provider_message_id=message_id,
+                    from_number=from_number,
+                    body=message,
+                    payload=data
                 )
-                
-                # Process with AI
-                result = self.ai_bot.generate_response(
-                    message, 
-                    user.preferred_language,
-                    {
-                        'blood_type': user.blood_type,
-                        'genotype': user.genotype,
-                        'allergies': user.allergies
-                    }
-                )
-                
-                response = result['response']
-                
-                # Save AI response
-                ChatMessage.objects.create(
-                    session=chat_session,
-                    sender='ai',
-                    message=response
-                )
-                
-                # Create health record if symptoms detected
-                if result['symptoms_detected']:
-                    HealthRecord.objects.create(
-                        user=user,
-                        chat_session=chat_session,
-                        symptoms=', '.join(result['symptoms_detected']),
-                        diagnosis=', '.join([d['disease'] for d in result['diagnosis']]),
-                        confidence_score=result['diagnosis'][0]['confidence'] if result['diagnosis'] else 0,
-                        is_emergency=result['is_emergency']
-                    )
-            
-            return JsonResponse({'response': response})
-            
+        except IntegrityError:
+            # Seen before by a worker whose dedupe entry has expired or never reached us
+            return JsonResponse({'status': 'duplicate'})
         except Exception as e:
+            dedupe_store.release(message_id)
             logger.error(f"WhatsApp webhook error: {str(e)}")
-            return JsonResponse({
-                'response': 'System dey busy now. Try again small time.'
-            })
-    
-    def _get_welcome_message(self, language):
-        welcome_messages = {
-            'pidgin': "Welcome to Lifelynx! I be your village doctor for pocket. Tell me how you dey feel or wetin dey worry you.",
-            'yoruba': "Kaabo si Lifelynx! Emi ni dokita ilu re ninu apo re. So fun mi bi o se n wa tabi kini o n wahala.",
-            'igbo': "Nnọọ na Lifelynx! Abụ m dọkịta obodo gị n'akpa gị. Gwa m otú ị na-adị ma ọ bụ ihe na-enye gị nsogbu.",
-            'hausa': "Barka da zuwa Lifelynx! Ni ne likitan ƙauyenka a cikin aljihunka. Faɗa mini yadda kake ji ko abin da ke damunka.",
-            'english': "Welcome to Lifelynx! I'm your village doctor in your pocket. Tell me how you're feeling or what's bothering you."
-        }
-        return welcome_messages.get(language, welcome_messages['pidgin'])
+            return JsonResponse({'error': 'Try again'}, status=503)
+        
+        logger.info(f"Received WhatsApp message {message_id} from {from_number}")
+        if not settings.LIFELYNX_AI_ASYNC:
+            process_inbound_message(inbound.id)
+            return JsonResponse({'status': 'processed'})
+        
+        try:
+            process_inbound_message.delay(inbound.id)
+        except Exception as e:
+            return enqueue_failed(inbound, e)
+        return JsonResponse({'status': 'received'})
+
+class AsyncWhatsAppWebhook(View):
+    """
+    WhatsAppWebhook for ASGI: the same fast acknowledgement, but waiting on
+    the database and the broker doesn't hold a thread, so one worker can
+    keep thousands of slow provider connections open.
+    """
+
+    @csrf_exempt
+    def dispatch(self, *args, **kwargs):
+        return super().dispatch(*args, **kwargs)
     
-    def _handle_okada_booking(self, user, chat_session):
-        from client.models import PHC, OkadaBooking, ChatMessage
+    async def post(self, request):
+        delivery, error = parse_delivery(request)
+        if error:
+            return error
+        message_id, from_number, message, data = delivery
         
-        nearest_phc = PHC.objects.filter(is_active=True).first()
-        if nearest_phc:
-            # Create booking
-            booking = OkadaBooking.objects.create(
-                user=user,
-                chat_session=chat_session,
-                phc=nearest_phc,
-                driver_name="Available Driver",
-                driver_phone="+234800000000",
-                vehicle_plate="LAG123XYZ",
-                fare=400.00,
-                estimated_arrival=7
-            )
-            
-            response = f"Okada don dey come! Driver {booking.driver_name} go reach you for {booking.estimated_arrival} minutes. " \
-                      f"Plate number: {booking.vehicle_plate}. Total fare: N{booking.fare}. " \
-                      f"Driver go call you for {booking.driver_phone}."
-            
-            # Save booking message
-            ChatMessage.objects.create(
-                session=chat_session,
-                sender='ai',
-                message=response
+        if not await dedupe_store.aclaim(message_id):
+            return JsonResponse({'status': 'duplicate'})
+        
+        try:
+            inbound = await InboundMessage.objects.acreate(
+                provider_message_id=message_id,
+                from_number=from_number,
+                body=message,
+                payload=data
             )
-            
-            return response
-        else:
-            return "Sorry, no PHC dey available for your area now. Try again later."
\ No newline at end of file
+        except IntegrityError:
+            return JsonResponse({'status': 'duplicate'})
+        except Exception as e:
+            await dedupe_store.arelease(message_id)
+            logger.error(f"WhatsApp webhook error: {str(e)}")
+            return JsonResponse({'error': 'Try again'}, status=503)
+        
+        logger.info(f"Received WhatsApp message {message_id} from {from_number}")
+        if not settings.LIFELYNX_AI_ASYNC:
+            await sync_to_async(process_inbound_message)(inbound.id)
+            return JsonResponse({'status': 'processed'})
+        
+        try:
+            # Publishing to the broker is blocking network I/O
+            await sync_to_async(process_inbound_message.delay, thread_sensitive=False)(inbound.id)
+        except Exception as e:
+            return await sync_to_async(enqueue_failed)(inbound, e)
+        return JsonResponse({'status': 'received'})